@@ -59,8 +59,7 @@ class LUIInputField(LUIObject):
             center_vertical=True, alpha=0.2)
 
         # Various states
-        self._tickrate = 1.0
-        self._tickstart = 0.0
+        self._cursor_visible = True
 
         self._render_text()
 
@@ -100,11 +99,14 @@ class LUIInputField(LUIObject):
         self._reset_cursor_tick()
         self._render_text()
 
-    def on_tick(self, event):
-        """ Tick handler, gets executed every frame """
-        frame_time = globalClock.get_frame_time() - self._tickstart
-        show_cursor = frame_time % self._tickrate < 0.5 * self._tickrate
-        if show_cursor:
+    def on_cursor_blink(self, event):
+        """ Timer handler, toggles the cursor every half second while focused """
+        self._set_cursor_visible(not self._cursor_visible)
+
+    def _set_cursor_visible(self, visible):
+        """ Internal method to show or hide the blinking cursor """
+        self._cursor_visible = visible
+        if visible:
             self._cursor.color = (0.5, 0.5, 0.5, 1)
         else:
             self._cursor.color = (1, 1, 1, 0)
@@ -120,7 +122,9 @@ class LUIInputField(LUIObject):
 
     def _reset_cursor_tick(self):
         """ Internal method to reset the cursor tick """
-        self._tickstart = globalClock.get_frame_time()
+        self._set_cursor_visible(True)
+        if self.focused:
+            self.set_interval("cursor_blink", 0.5)
 
     def on_focus(self, event):
         """ Internal focus handler """
@@ -174,6 +178,7 @@ class LUIInputField(LUIObject):
 
     def on_blur(self, event):
         """ Internal blur handler """
+        self.clear_timer("cursor_blink")
         self._cursor.hide()
         if len(self._value) < 1:
             self._placeholder.show()
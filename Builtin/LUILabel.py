@@ -66,6 +66,24 @@ class LUILabel(LUIObject):
 
     text = property(get_text, set_text)
 
+    def append_text(self, text):
+        """ Appends text to the label, only laying out the appended characters """
+        self._text.append_text(text)
+        if self._have_shadow:
+            self._shadow_text.append_text(text)
+
+    def insert_text(self, index, text):
+        """ Inserts text in front of the character at the given index """
+        self._text.insert_text(index, text)
+        if self._have_shadow:
+            self._shadow_text.insert_text(index, text)
+
+    def erase_text(self, index, count):
+        """ Removes count characters, starting at the given index """
+        self._text.erase_text(index, count)
+        if self._have_shadow:
+            self._shadow_text.erase_text(index, count)
+
     def get_color(self):
         """ Returns the current color of the label's text """
         return self._text.color
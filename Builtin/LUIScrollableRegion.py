@@ -58,13 +58,14 @@ class LUIScrollableRegion(LUIObject):
         self._scroll_shadow_bottom.bottom = 0
 
         self._handle_height = 100
+        self._delayed_scroll_percentage = 0.0
 
         if parent is not None:
             self.parent = parent
 
         LUIInitialState.init(self, kwargs)
         self.content_node = self._content_scroller
-        taskMgr.doMethodLater(0.05, lambda task: self._update(), "update_scrollbar")
+        self.set_timeout("update_scrollbar", 0.05)
 
     def _on_bar_click(self, event):
         """ Internal handler when the user clicks on the scroll bar """
@@ -129,8 +130,13 @@ class LUIScrollableRegion(LUIObject):
         else:
             self._scrollbar_handle.show()
 
+    def on_update_scrollbar(self, event):
+        """ Internal timer handler to update the scroll bar once the content
+        got layouted """
+        self._update()
+
     def on_element_added(self):
-        taskMgr.doMethodLater(0.05, lambda task: self._update(), "update_layout")
+        self.set_timeout("update_scrollbar", 0.05)
 
     def get_scroll_percentage(self):
         """ Returns the current scroll height in percentage from 0 to 1 """
@@ -147,9 +153,15 @@ class LUIScrollableRegion(LUIObject):
 
     def scroll_to_bottom(self):
         """ Scrolls to the bottom of the frame """
-        taskMgr.doMethodLater(0.07, lambda task: self.set_scroll_percentage(1.0), "scroll_to_bottom")
+        self._delayed_scroll_percentage = 1.0
+        self.set_timeout("delayed_scroll", 0.07)
 
     def scroll_to_top(self):
         """ Scrolls to the top of the frame """
-        taskMgr.doMethodLater(0.07, lambda task: self.set_scroll_percentage(0.0), "scroll_to_top")
+        self._delayed_scroll_percentage = 0.0
+        self.set_timeout("delayed_scroll", 0.07)
+
+    def on_delayed_scroll(self, event):
+        """ Internal timer handler for scroll_to_bottom and scroll_to_top """
+        self.set_scroll_percentage(self._delayed_scroll_percentage)
 
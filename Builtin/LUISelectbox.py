@@ -5,8 +5,6 @@ from LUILabel import LUILabel
 from LUILayouts import LUICornerLayout, LUIHorizontalStretchedLayout
 from LUIInitialState import LUIInitialState
 
-from functools import partial
-
 __all__ = ["LUISelectbox"]
 
 class LUISelectbox(LUIObject):
@@ -153,23 +151,46 @@ class LUISelectdrop(LUIObject):
         self._container.clip_bounds = (0,0,0,0)
         self._container.left = 5
         self._container.solid = True
+        self._container.delegate_events = True
         self._container.bind("mousedown", lambda *args: self.request_focus())
+        self._container.bind("mouseover", self._on_opt_over)
+        self._container.bind("mouseout", self._on_opt_out)
+        self._container.bind("click", self._on_opt_click)
+        self._option_ids = []
+        self._option_bgs = []
+        self._option_indices = {}
 
         self._selectbox = parent
         self._option_focus = False
         self.parent = self._selectbox
 
+    def _get_option_index(self, event):
+        """ Internal method to find the index of the option containing the
+        target of an event, returns None if the event was not on an option """
+        target = event.target
+        while target is not None:
+            if target in self._option_indices:
+                return self._option_indices[target]
+            target = target.parent
+        return None
+
     def _on_opt_over(self, event):
         """ Inernal handler when an option got hovered """
-        event.sender.color = (0,0,0,0.1)
+        index = self._get_option_index(event)
+        if index is not None:
+            self._option_bgs[index].color = (0,0,0,0.1)
 
     def _on_opt_out(self, event):
         """ Inernal handler when an option got no longer hovered """
-        event.sender.color = (0,0,0,0)
+        index = self._get_option_index(event)
+        if index is not None:
+            self._option_bgs[index].color = (0,0,0,0)
 
-    def _on_opt_click(self, opt_id, event):
+    def _on_opt_click(self, event):
         """ Internal handler when an option got clicked """
-        self._selectbox._on_option_selected(opt_id)
+        index = self._get_option_index(event)
+        if index is not None:
+            self._selectbox._on_option_selected(self._option_ids[index])
 
     def _render_options(self, options):
         """ Internal method to update the options """
@@ -178,20 +199,22 @@ class LUISelectdrop(LUIObject):
         self._layout.height = num_visible_options * 30 + offset_top + 11
         self._container.height = num_visible_options * 30 + offset_top + 1
         self._container.remove_all_children()
+        self._option_ids = []
+        self._option_bgs = []
+        self._option_indices = {}
 
+        # The options are not solid, their events are handled by the container
         current_y = offset_top
-        for opt_id, opt_val in options:
+        for index, (opt_id, opt_val) in enumerate(options):
             opt_container = LUIObject(self._container, x=0, y=current_y, w=self._container.width - 30, h=30)
+            self._option_indices[opt_container] = index
 
             opt_bg = LUISprite(opt_container, "blank", "skin")
             opt_bg.width = self._container.width
             opt_bg.height = opt_container.height
             opt_bg.color = (0,0,0,0)
-            opt_bg.bind("mouseover", self._on_opt_over)
-            opt_bg.bind("mouseout", self._on_opt_out)
-            opt_bg.bind("mousedown", lambda *args: self.request_focus())
-            opt_bg.bind("click", partial(self._on_opt_click, opt_id))
-            opt_bg.solid = True
+            self._option_ids.append(opt_id)
+            self._option_bgs.append(opt_bg)
 
             opt_label = LUILabel(parent=opt_container, text=opt_val.encode('utf-8'))
             opt_label.top = 8
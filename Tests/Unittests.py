@@ -1,10 +1,60 @@
 
 from __future__ import print_function
 from common import *
+from LUIRoot import LUIRoot
+from LUILabel import LUILabel
+from panda3d.lui import LUIRect, LUIFontPool
 
+import math
 import unittest
 
 
+def make_input_frame(time, mouse_pos=None, buttons=0, key_events=()):
+    """ Constructs a frame of an input recording, see LUIInputHandler::record_frame.
+    key_events is a list of (button name, mode) tuples, mode being 0 for up,
+    1 for down and 2 for repeat """
+    datagram = Datagram()
+    datagram.add_float64(time)
+    datagram.add_uint8((1 if mouse_pos is not None else 0) | (buttons << 1))
+    if mouse_pos is not None:
+        datagram.add_float32(mouse_pos[0])
+        datagram.add_float32(mouse_pos[1])
+    datagram.add_uint8(0)
+    datagram.add_uint16(len(key_events))
+    for btn_name, mode in key_events:
+        datagram.add_string(btn_name)
+        datagram.add_uint8(mode)
+    datagram.add_uint16(0)
+    return datagram
+
+def load_input(frames):
+    """ Writes the given frames to a recording, and returns a handler with
+    the recording loaded """
+    filename = Filename.temporary("", "lui-input-", ".rec")
+    output = DatagramOutputFile()
+    output.open(filename)
+    output.write_header("LUIrec02")
+    for datagram in frames:
+        output.put_datagram(datagram)
+    output.close()
+
+    replay_handler = LUIInputHandler()
+    replay_handler.load_recording(filename)
+    filename.unlink()
+    return replay_handler
+
+def replay_input(root, frames):
+    """ Replays the given frames on the root """
+    replay_handler = load_input(frames)
+    while replay_handler.replay_frame(root):
+        pass
+
+def render_root(root, num_frames=1):
+    """ Processes the given amount of frames without input on a root which
+    is not attached to a region """
+    replay_input(root, [make_input_frame(i * 0.1) for i in range(num_frames)])
+
+
 class Test_FluidBox(unittest.TestCase):
 
     def test_box(self):
@@ -21,6 +71,676 @@ class Test_FluidBox(unittest.TestCase):
         render_frames()
         self.assertEqual(region.root.size, (512, 512))
 
+class Test_DirtyTracking(unittest.TestCase):
+
+    def test_idle_frame(self):
+        container = LUIObject(parent=region.root)
+        sprite = LUISprite(container, "blank", "skin")
+        render_frames()
+        self.assertEqual(region.lui_root.num_layout_visits, 0)
+
+        sprite.left = 20
+        base.graphicsEngine.render_frame()
+        self.assertGreater(region.lui_root.num_layout_visits, 0)
+        self.assertEqual(sprite.abs_pos.x, container.abs_pos.x + 20)
+        region.root.remove_all_children()
+
+    def test_dependent_layout_converges(self):
+        # A fit container with a chain of percentage sized descendants
+        outer = LUIObject(parent=region.root)
+        fixed = LUISprite(outer, "blank", "skin")
+        fixed.size = 100, 10
+        column = LUIObject(parent=outer, y=20)
+        column.width = "50%"
+        box = LUIObject(parent=column)
+        box.width = "50%"
+        bar = LUISprite(box, "blank", "skin")
+        bar.width = "100%"
+        render_frames()
+        self.assertEqual(bar.width, 25)
+
+        fixed.width = 200
+        render_frames()
+        self.assertEqual(outer.width, 200)
+        self.assertEqual(column.width, 100)
+        self.assertEqual(box.width, 50)
+        self.assertEqual(bar.width, 50)
+
+        # Once the layout converged, no further layout passes are required
+        base.graphicsEngine.render_frame()
+        self.assertEqual(region.lui_root.num_layout_visits, 0)
+        region.root.remove_all_children()
+
+    def test_scene_generation(self):
+        sprite = LUISprite(region.root, "blank", "skin")
+        render_frames()
+        generation = region.lui_root.scene_generation
+        render_frames()
+        self.assertEqual(region.lui_root.scene_generation, generation)
+
+        sprite.hide()
+        self.assertNotEqual(region.lui_root.scene_generation, generation)
+        region.root.remove_all_children()
+
+    def test_margin_access(self):
+        sprite = LUISprite(region.root, "blank", "skin")
+        render_frames()
+        generation = region.lui_root.scene_generation
+        self.assertEqual(sprite.margin.left, 0)
+        self.assertEqual(sprite.padding.top, 0)
+        self.assertEqual(region.lui_root.scene_generation, generation)
+
+        sprite.margin.left = 5
+        self.assertNotEqual(region.lui_root.scene_generation, generation)
+        render_frames()
+        self.assertEqual(sprite.abs_pos.x, 5)
+        region.root.remove_all_children()
+
+    def test_subtree_bounds(self):
+        container = LUIObject(parent=region.root, x=10, y=10, w=50, h=50)
+        sprite = LUISprite(container, "blank", "skin")
+        sprite.pos = 100, 20
+        sprite.size = 30, 30
+        render_frames()
+
+        bounds = container.get_subtree_bounds()
+        self.assertEqual((bounds.x, bounds.y), (10, 10))
+        self.assertEqual((bounds.w, bounds.h), (130, 50))
+        region.root.remove_all_children()
+
+    def test_topmost_in_culled_subtree(self):
+        container = LUIObject(parent=region.root, x=0, y=0, w=50, h=50)
+        container.clip_bounds = (0, 0, 0, 0)
+        inner = LUIObject(parent=container, x=100, y=100, w=10, h=10)
+        popup = LUISprite(inner, "blank", "skin")
+        popup.size = 10, 10
+        popup.topmost = True
+        render_frames()
+
+        elements = region.elements_at(105, 105)
+        self.assertTrue(any(element.topmost for element in elements))
+        region.root.remove_all_children()
+
+    def test_topmost_deferred_from_culled_subtree(self):
+        container = LUIObject(parent=region.root, x=0, y=0, w=50, h=50)
+        container.clip_bounds = (0, 0, 0, 0)
+        inner = LUIObject(parent=container, x=100, y=100, w=10, h=10)
+        popup = LUISprite(inner, "blank", "skin")
+        popup.size = 20, 20
+        popup.topmost = True
+
+        # Rendered after the container, but still below the topmost popup
+        cover = LUISprite(region.root, "blank", "skin")
+        cover.pos = 100, 100
+        cover.size = 10, 10
+        render_frames()
+
+        elements = region.elements_at(105, 105)
+        self.assertEqual(elements[len(elements) - 1].size, popup.size)
+        region.root.remove_all_children()
+
+class Test_SpatialQueries(unittest.TestCase):
+
+    def test_elements_at(self):
+        container = LUIObject(parent=region.root, x=10, y=10, w=50, h=50)
+        container.name = "container"
+        sprite = LUISprite(container, "blank", "skin")
+        sprite.name = "sprite"
+        sprite.pos = 10, 10
+        sprite.size = 20, 20
+        cover = LUIObject(parent=region.root, x=20, y=20, w=20, h=20)
+        cover.name = "cover"
+        hidden = LUIObject(parent=region.root, x=0, y=0, w=100, h=100)
+        hidden.hide()
+        render_frames()
+
+        names = lambda elements: [element.name for element in elements]
+        self.assertEqual(names(region.elements_at(25, 25)), ["container", "sprite", "cover"])
+        self.assertEqual(names(region.elements_at(15, 15)), ["container"])
+        self.assertEqual(names(region.elements_at(200, 200)), [])
+
+        # Raising the container moves it and its children to the front
+        container.z_offset = 5
+        render_frames()
+        self.assertEqual(names(region.elements_at(25, 25)), ["cover", "container", "sprite"])
+
+        self.assertEqual(names(region.elements_in_rect(LUIRect(0, 0, 100, 100))),
+                         ["cover", "container", "sprite"])
+        self.assertEqual(names(region.elements_in_rect(LUIRect(0, 0, 15, 15))), ["container"])
+        self.assertEqual(names(region.elements_in_rect(LUIRect(100, 100, 50, 50))), [])
+        region.root.remove_all_children()
+
+class Test_HitTesting(unittest.TestCase):
+
+    def test_query_before_render(self):
+        root = LUIRoot(512, 512)
+        target = LUIObject(parent=root.node(), x=0, y=0, w=10, h=10)
+        received = []
+        target.bind("mouseover", lambda event: received.append(event.name))
+
+        # The first frame processes the input before anything got rendered,
+        # so the index of the event objects is still empty
+        replay_handler = load_input([
+            make_input_frame(0.0, (0, 0)),
+            make_input_frame(0.1, (0, 0)),
+        ])
+        replay_handler.replay_frame(root)
+        self.assertEqual(received, [])
+        replay_handler.replay_frame(root)
+        self.assertEqual(received, ["mouseover"])
+
+    def test_moved_element(self):
+        root = LUIRoot(512, 512)
+        target = LUIObject(parent=root.node(), x=10, y=10, w=20, h=20)
+        received = []
+        target.bind("mouseover", lambda event: received.append(event.name))
+        target.bind("mouseout", lambda event: received.append(event.name))
+
+        replay_handler = load_input([
+            make_input_frame(0.0, (15, 15)),
+            make_input_frame(0.1, (15, 15)),
+            make_input_frame(0.2, (15, 15)),
+            make_input_frame(0.3, (15, 15)),
+            make_input_frame(0.4, (205, 205)),
+        ])
+        replay_handler.replay_frame(root)
+        replay_handler.replay_frame(root)
+        self.assertEqual(received, ["mouseover"])
+
+        # Moving the element to another cell of the index moves its hit area
+        target.pos = 200, 200
+        while replay_handler.replay_frame(root):
+            pass
+        self.assertEqual(received, ["mouseover", "mouseout", "mouseover"])
+
+    def test_element_spanning_cells(self):
+        root = LUIRoot(512, 512)
+        received = []
+        target = LUIObject(parent=root.node(), x=40, y=40, w=100, h=100)
+        target.bind("mouseover", lambda event: received.append(("target", event.name)))
+        target.bind("mouseout", lambda event: received.append(("target", event.name)))
+        other = LUIObject(parent=root.node(), x=300, y=300, w=10, h=10)
+        other.bind("mouseover", lambda event: received.append(("other", event.name)))
+        render_root(root)
+
+        # The target covers several cells of the index, and is found in each
+        # of them. Points outside of the index bounds hit nothing.
+        replay_input(root, [
+            make_input_frame(0.0, (45, 45)),
+            make_input_frame(0.1, (135, 135)),
+            make_input_frame(0.2, (135, 45)),
+            make_input_frame(0.3, (150, 150)),
+            make_input_frame(0.4, (-20, -20)),
+            make_input_frame(0.5, (600, 600)),
+        ])
+        self.assertEqual(received, [("target", "mouseover"), ("target", "mouseout")])
+
+class Test_Batching(unittest.TestCase):
+
+    def make_texture(self, name):
+        texture = Texture(name)
+        texture.setup_2d_texture(1, 1, Texture.T_unsigned_byte, Texture.F_rgba8)
+        return texture
+
+    def test_texture_groups(self):
+        # A batch binds 8 textures, so the ninth texture starts a second group
+        root = LUIRoot(512, 512)
+        textures = [self.make_texture("group-%d" % i) for i in range(9)]
+        for i, texture in enumerate(textures):
+            LUISprite(root.node(), texture, i * 10, 0, 10, 10)
+        render_root(root)
+        self.assertEqual(root.num_batches, 2)
+
+        # Sprites of the first group rendered after the second group need
+        # another batch
+        LUISprite(root.node(), textures[0], 0, 10, 10, 10)
+        LUISprite(root.node(), textures[7], 10, 10, 10, 10)
+        render_root(root)
+        self.assertEqual(root.num_batches, 3)
+
+    def test_interleaved_allocation(self):
+        fillers = LUIObject(parent=region.root)
+        sprites = [LUISprite(fillers, "blank", "skin") for i in range(2048)]
+        render_frames()
+
+        # Free the slots alternating between both vertex chunks, so the new
+        # sprites get slots of alternating chunks in render order
+        for i in range(1024):
+            fillers.remove_child(sprites[i])
+            fillers.remove_child(sprites[i + 1024])
+        items = LUIObject(parent=region.root)
+        for i in range(2048):
+            LUISprite(items, "blank", "skin")
+
+        base.graphicsEngine.renderFrame()
+        self.assertGreater(region.lui_root.num_batches, 1000)
+
+        # The sprites get reordered, so each chunk only needs a single batch
+        render_frames()
+        self.assertEqual(region.lui_root.num_vertex_chunks, 2)
+        self.assertEqual(region.lui_root.num_batches, 2)
+        region.root.remove_all_children()
+
+class Test_VertexPool(unittest.TestCase):
+
+    def test_unchanged_vertices(self):
+        root = LUIRoot(512, 512)
+        sprite = LUISprite(root.node(), "blank", "skin")
+        LUISprite(root.node(), "blank", "skin", 50, 50)
+        render_root(root, 3)
+
+        # The scene changes, but the inputs of the sprites stay the same
+        LUIObject(parent=root.node())
+        render_root(root)
+        self.assertEqual(root.num_modified_vertex_chunks, 0)
+
+        sprite.left = 30
+        render_root(root)
+        self.assertEqual(root.num_modified_vertex_chunks, 1)
+
+    def test_slot_reuse(self):
+        root = LUIRoot(512, 512)
+        sprites = [LUISprite(root.node(), "blank", "skin") for i in range(4)]
+        render_root(root)
+        self.assertEqual(root.num_sprite_slots, 4)
+
+        # New sprites take the slots of removed sprites
+        root.node().remove_child(sprites[1])
+        root.node().remove_child(sprites[2])
+        LUISprite(root.node(), "blank", "skin")
+        LUISprite(root.node(), "blank", "skin")
+        render_root(root)
+        self.assertEqual(root.num_sprite_slots, 4)
+
+    def test_compact_sprites(self):
+        root = LUIRoot(512, 512)
+        container = LUIObject(parent=root.node())
+        for i in range(2048):
+            LUISprite(container, "blank", "skin")
+        kept = LUISprite(root.node(), "blank", "skin", 20, 20, 10, 10)
+        kept.name = "kept"
+        render_root(root)
+        self.assertEqual(root.num_vertex_chunks, 3)
+
+        # After most sprites got removed, the pool shrinks to the remaining
+        # sprite, which still gets rendered
+        root.node().remove_child(container)
+        render_root(root)
+        self.assertEqual(root.num_sprite_slots, 1)
+        self.assertEqual(root.num_vertex_chunks, 1)
+        self.assertEqual(root.num_batches, 1)
+        self.assertEqual([e.name for e in root.elements_at(25, 25)], ["kept"])
+
+    def test_compact_rounding(self):
+        LUIRoot.set_use_compact_vertex_format(True)
+        root = LUIRoot(512, 512)
+        LUIRoot.set_use_compact_vertex_format(False)
+
+        # Glyphs are not snapped to whole pixels, so their positions have to
+        # be rounded to the nearest pixel
+        label = LUILabel(parent=root.node(), text=u"A", shadow=False)
+        label.pos = 20, 20
+        render_root(root, 3)
+        glyph = label.text_handle.get_child(0)
+
+        vertex_data = root.get_batch_geom(0).get_vertex_data()
+        vertex = GeomVertexReader(vertex_data, "vertex").get_data2i()
+        self.assertEqual(vertex.x, int(math.floor(glyph.abs_pos.x + 0.5)))
+        self.assertEqual(vertex.y, int(math.floor(glyph.abs_pos.y + 0.5)))
+
+        # Texcoords are stored as unorm16, sprites keep a margin of 0.0001
+        # to their uv range
+        texcoord = GeomVertexReader(vertex_data, "lui_texcoord").get_data2i()
+        uv_begin = glyph.get_uv_begin()
+        self.assertAlmostEqual(texcoord.x, (uv_begin.x + 0.0001) * 65535, delta=1)
+        self.assertAlmostEqual(texcoord.y, (1 - uv_begin.y - 0.0001) * 65535, delta=1)
+
+class Test_Text(unittest.TestCase):
+
+    def test_char_positions(self):
+        label = LUILabel(parent=region.root, text=u"Hello World")
+        text = label.text_handle
+        self.assertEqual(text.get_char_pos(0), 0)
+        self.assertEqual(text.get_char_pos(-1), 0)
+        self.assertEqual(text.get_char_pos(100), text.get_char_pos(11))
+        for i in range(11):
+            self.assertLess(text.get_char_pos(i), text.get_char_pos(i + 1))
+            self.assertEqual(text.get_char_index(text.get_char_pos(i) + 0.5), i)
+        self.assertEqual(text.get_char_index(-1), 0)
+        self.assertEqual(text.get_char_index(1e6), 11)
+        region.root.remove_all_children()
+
+    def test_incremental_edit(self):
+        label = LUILabel(parent=region.root, text=u"Hello")
+        reference = LUILabel(parent=region.root, text=u"Hi, World!")
+        label.append_text(u" World")
+        label.erase_text(1, 4)
+        label.insert_text(1, u"i,")
+        label.append_text(u"??")
+        label.erase_text(9, 100)
+        label.append_text(u"!")
+        self.assertEqual(label.text, reference.text)
+        self.assertEqual(label.text_handle.child_count, len(reference.text))
+        self.assertEqual(label.text_handle.width, reference.text_handle.width)
+
+        # The glyphs get the color of the text, no matter when they were laid out
+        render_frames()
+        self.assertGlyphColors(label.text_handle)
+        self.assertGlyphColors(label._shadow_text)
+        region.root.remove_all_children()
+
+    def test_incremental_edit_wrapped(self):
+        text = u"Short\nA second line, which is long enough to wrap"
+        label = LUILabel(parent=region.root, text=u"Short\nA line, which", wordwrap=True, width=100)
+        reference = LUILabel(parent=region.root, text=text, wordwrap=True, width=100)
+        label.insert_text(7, u" second")
+        label.append_text(u" is long enough to wrap")
+        self.assertEqual(label.text, text)
+        self.assertEqual(label.text_handle.height, reference.text_handle.height)
+
+        render_frames()
+        self.assertSameLayout(label.text_handle, reference.text_handle)
+        self.assertGlyphColors(label.text_handle)
+        region.root.remove_all_children()
+
+    def test_incremental_edit_paragraph(self):
+        words = [u"word%d" % i for i in range(40)]
+        text = u" ".join(words)
+        label = LUILabel(parent=region.root, text=text, wordwrap=True, width=120)
+
+        # Grow a word in the middle until it moves to the next line, then
+        # shrink it again, and replace a whole word
+        index = text.index(u"word20")
+        edits = [
+            lambda: label.insert_text(index, u"longer"),
+            lambda: label.insert_text(index, u"muchlongerprefix"),
+            lambda: label.erase_text(index, 22),
+            lambda: label.erase_text(index, 6),
+            lambda: label.insert_text(index, u"new"),
+            lambda: label.append_text(u" tail"),
+        ]
+        for edit in edits:
+            edit()
+            reference = LUILabel(parent=region.root, text=label.text, wordwrap=True, width=120)
+            self.assertEqual(label.text_handle.height, reference.text_handle.height)
+            render_frames()
+            self.assertSameLayout(label.text_handle, reference.text_handle)
+            reference.parent = None
+        region.root.remove_all_children()
+
+    def assertSameLayout(self, text, reference):
+        self.assertEqual(text.child_count, reference.child_count)
+        for i in range(reference.child_count):
+            glyph = text.get_child(i)
+            reference_glyph = reference.get_child(i)
+            self.assertEqual(glyph.visible, reference_glyph.visible)
+            if reference_glyph.visible:
+                self.assertEqual(glyph.pos, reference_glyph.pos)
+
+    def assertGlyphColors(self, text):
+        for i in range(text.child_count):
+            self.assertEqual(text.get_child(i).composed_color, text.composed_color)
+
+    def test_measure(self):
+        pool = LUIFontPool.get_global_ptr()
+        label = LUILabel(parent=region.root, text=u"Measure me", font_size=14)
+        metrics = pool.measure("label", 14, u"Measure me")
+        self.assertEqual(metrics.width, label.text_handle.width)
+        self.assertEqual(metrics.height, label.text_handle.height)
+        self.assertEqual(metrics.num_lines, 1)
+
+        wrapped = pool.measure("label", 14, u"one two three four five six", 40)
+        self.assertGreater(wrapped.num_lines, 1)
+        self.assertEqual(len(wrapped.get_line_breaks()), wrapped.num_lines - 1)
+
+        text = u"one two three four\nfive six"
+        wrapped_label = LUILabel(parent=region.root, text=text, wordwrap=True, width=40)
+        wrapped = pool.measure("label", 14, text, 40)
+        self.assertEqual(wrapped.height, wrapped_label.text_handle.height)
+
+        batch = pool.measure_batch("label", 14, [u"a", u"Measure me"])
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch[1].width, metrics.width)
+        region.root.remove_all_children()
+
+class Test_Events(unittest.TestCase):
+
+    def test_bind_by_name(self):
+        sprite = LUISprite(region.root, "blank", "skin")
+        received = []
+        sprite.bind("click", lambda event: received.append(event.name))
+        sprite.bind("custom_event", lambda event: received.append(event.name))
+        self.assertTrue(sprite.has_event("click"))
+        self.assertFalse(sprite.has_event("mouseover"))
+
+        sprite.trigger_event("click")
+        sprite.trigger_event("custom_event")
+        sprite.trigger_event("mouseover")
+        self.assertEqual(received, ["click", "custom_event"])
+
+        sprite.unbind("click")
+        self.assertFalse(sprite.has_event("click"))
+        region.root.remove_all_children()
+
+    def test_event_rates(self):
+        self.assertEqual(region.lui_root.mousemove_rate, 0)
+        region.lui_root.mousemove_rate = 30
+        region.lui_root.keyrepeat_rate = 10
+        self.assertEqual(region.lui_root.mousemove_rate, 30)
+        self.assertEqual(region.lui_root.keyrepeat_rate, 10)
+        region.lui_root.mousemove_rate = 0
+        region.lui_root.keyrepeat_rate = 0
+
+    def test_event_batch(self):
+        root = LUIRoot(512, 512)
+        target = LUIObject(parent=root.node(), x=10, y=10, w=50, h=50)
+        invoked = []
+        for event_name in ("mouseover", "mousemove", "mousedown", "mouseup", "click"):
+            target.bind(event_name, lambda event: invoked.append(event.name))
+
+        batches = []
+        def dispatch(batch):
+            batches.append([batch.get_event(i).name for i in range(batch.num_events)])
+
+        replay_handler = load_input([
+            make_input_frame(0.0, (20, 20)),
+            make_input_frame(0.1, (20, 20)),
+            make_input_frame(0.2, (25, 25), buttons=1),
+            make_input_frame(0.3, (25, 25)),
+        ])
+        replay_handler.set_event_dispatcher(dispatch)
+        while replay_handler.replay_frame(root):
+            pass
+
+        # Each frame delivers its events in a single batch, in the order they
+        # were triggered, and the handlers are left to the dispatcher
+        self.assertEqual(batches, [
+            ["mouseover"],
+            ["mousemove", "mousedown"],
+            ["mouseup", "click"]
+        ])
+        self.assertEqual(invoked, [])
+
+    def test_mousemove_rate(self):
+        root = LUIRoot(512, 512)
+        root.mousemove_rate = 4
+        target = LUIObject(parent=root.node(), x=10, y=10, w=50, h=50)
+        deltas = []
+        target.bind("mousemove", lambda event: deltas.append(tuple(event.delta)))
+
+        # The first event after the mouse entered the window has no delta, and
+        # the moves within the rate window get merged into a single event.
+        # The replay starts at frame time 0 of the recording, so the rate
+        # windows don't depend on the global clock.
+        replay_input(root, [
+            make_input_frame(0.0),
+            make_input_frame(0.3, (20, 20)),
+            make_input_frame(0.6, (22, 20)),
+            make_input_frame(0.65, (24, 20)),
+            make_input_frame(0.7, (27, 21)),
+            make_input_frame(0.75, (30, 22)),
+            make_input_frame(0.9, (30, 22)),
+        ])
+        self.assertEqual(deltas, [(0, 0), (2, 0), (8, 2)])
+
+    def test_keyrepeat_rate(self):
+        root = LUIRoot(512, 512)
+        root.keyrepeat_rate = 4
+        target = LUIObject(parent=root.node())
+        received = []
+        target.bind("keyrepeat", lambda event: received.append(event.message))
+        target.request_focus()
+
+        # Repeats within the rate window are dropped
+        replay_input(root, [
+            make_input_frame(0.0, key_events=[("a", 1)]),
+            make_input_frame(0.3, key_events=[("a", 2)]),
+            make_input_frame(0.35, key_events=[("a", 2)]),
+            make_input_frame(0.4, key_events=[("a", 2)]),
+            make_input_frame(0.6, key_events=[("a", 2)]),
+        ])
+        self.assertEqual(received, ["a", "a"])
+
+class Test_Timers(unittest.TestCase):
+
+    def test_timeout(self):
+        sprite = LUISprite(region.root, "blank", "skin")
+        received = []
+        sprite.bind("ping", lambda event: received.append(event.name))
+        sprite.set_timeout("ping", 0.0)
+        self.assertTrue(sprite.has_timer("ping"))
+
+        render_frames()
+        self.assertEqual(received, ["ping"])
+        self.assertFalse(sprite.has_timer("ping"))
+        region.root.remove_all_children()
+
+    def test_detach_stops_interval(self):
+        sprite = LUISprite(region.root, "blank", "skin")
+        received = []
+        sprite.bind("ping", lambda event: received.append(event.name))
+        sprite.set_interval("ping", 0.0)
+        render_frames()
+        num_received = len(received)
+        self.assertGreater(num_received, 0)
+
+        region.root.remove_all_children()
+        render_frames()
+        self.assertEqual(len(received), num_received)
+        self.assertTrue(sprite.has_timer("ping"))
+
+class Test_FocusOrder(unittest.TestCase):
+
+    def test_focus_next(self):
+        first = LUIObject(parent=region.root)
+        second = LUIObject(parent=region.root)
+        last = LUIObject(parent=region.root)
+        LUIObject(parent=region.root)
+        last.tab_index = 1
+        first.tab_index = 0
+        second.tab_index = 0
+        self.assertEqual(region.lui_root.num_tab_stops, 3)
+
+        order = []
+        for i in range(4):
+            region.focus_next()
+            render_frames()
+            order.append([first.focused, second.focused, last.focused].index(True))
+        self.assertEqual(order, [0, 1, 2, 0])
+
+        region.focus_prev()
+        render_frames()
+        self.assertTrue(last.focused)
+
+        last.blur()
+        region.root.remove_all_children()
+        self.assertEqual(region.lui_root.num_tab_stops, 0)
+
+    def test_focus_skips_hidden(self):
+        first = LUIObject(parent=region.root)
+        container = LUIObject(parent=region.root)
+        second = LUIObject(parent=container)
+        last = LUIObject(parent=region.root)
+        for element in (first, second, last):
+            element.tab_index = 0
+
+        container.hide()
+        first.hide()
+        last.hide()
+        self.assertFalse(region.focus_next())
+
+        first.show()
+        last.show()
+        region.focus_next()
+        render_frames()
+        self.assertTrue(first.focused)
+        region.focus_next()
+        render_frames()
+        self.assertTrue(last.focused)
+        self.assertFalse(second.focused)
+
+        last.blur()
+        region.root.remove_all_children()
+
+class Test_InputRecording(unittest.TestCase):
+
+    def test_record_and_replay(self):
+        filename = Filename.temporary("", "lui-input-", ".rec")
+        self.assertTrue(handler.start_recording(filename))
+        render_frames()
+        handler.stop_recording()
+
+        replay_handler = LUIInputHandler()
+        self.assertTrue(replay_handler.load_recording(filename))
+        self.assertEqual(replay_handler.get_num_replay_frames(), 3)
+
+        root = LUIRoot(512, 512)
+        for i in range(3):
+            self.assertTrue(replay_handler.replay_frame(root))
+        self.assertFalse(replay_handler.replay_frame(root))
+        filename.unlink()
+
+    def test_replay_reaches_elements(self):
+        root = LUIRoot(512, 512)
+        target = LUIObject(parent=root.node(), x=10, y=10, w=50, h=50)
+        received = []
+        for event_name in ("mouseover", "mousemove", "click", "ping"):
+            target.bind(event_name, lambda event: received.append(event.name))
+        target.set_timeout("ping", 0.5)
+
+        replay_input(root, [
+            make_input_frame(0.0, (20, 20)),
+            make_input_frame(0.1, (20, 20)),
+            make_input_frame(0.2, (25, 25), buttons=1),
+            make_input_frame(0.3, (25, 25)),
+            make_input_frame(1.0, (25, 25)),
+        ])
+        self.assertEqual(received, ["mouseover", "mousemove", "click", "ping"])
+
+    def test_hidden_parent_ends_hover(self):
+        root = LUIRoot(512, 512)
+        container = LUIObject(parent=root.node())
+        target = LUIObject(parent=container, x=10, y=10, w=50, h=50)
+        received = []
+        for event_name in ("mouseover", "mouseout", "click"):
+            target.bind(event_name, lambda event: received.append(event.name))
+
+        replay_handler = load_input([
+            make_input_frame(0.0, (20, 20)),
+            make_input_frame(0.1, (20, 20)),
+            make_input_frame(0.2, (20, 20), buttons=1),
+            make_input_frame(0.3, (20, 20)),
+        ])
+        replay_handler.replay_frame(root)
+        replay_handler.replay_frame(root)
+        self.assertEqual(received, ["mouseover"])
+
+        # Hiding the parent in between frames must not leave the target hovered
+        container.hide()
+        replay_handler.replay_frame(root)
+        replay_handler.replay_frame(root)
+        self.assertEqual(received, ["mouseover", "mouseout"])
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -15,6 +15,7 @@
 #include "luiObject.h"
 #include "luiText.h"
 #include "luiEventData.h"
+#include "luiEventBatch.h"
 #include "luiBaseLayout.h"
 #include "luiVerticalLayout.h"
 #include "luiHorizontalLayout.h"
@@ -40,6 +41,7 @@ void init_lui() {
   LUIObject::init_type();
   LUIText::init_type();
   LUIEventData::init_type();
+  LUIEventBatch::init_type();
   LUIBaseLayout::init_type();
   LUIVerticalLayout::init_type();
   LUIHorizontalLayout::init_type();
@@ -26,26 +26,39 @@ LUIBaseElement::LUIBaseElement(PyObject* self) :
   _position(0.0f),
   _abs_position(0.0f),
   _effective_size(0.0f),
+  _layout_start_position(0.0f),
+  _layout_start_size(0.0f),
   _visible(true),
   _z_offset(0.0f),
   _events_registered(false),
+  _timers_registered(false),
+  _tab_stop_registered(false),
+  _tab_index(-1),
+  _sibling_index(0),
   _snap_position(true),
   _focused(false),
   _solid(false),
+  _delegate_events(false),
   _margin(0.0f),
   _padding(0.0f),
   _clip_bounds(0.0f, 0.0f, 1e6, 1e6),
   _have_clip_bounds(false),
   _abs_clip_bounds(0.0f, 0.0f, 1e6, 1e6),
+  _subtree_bounds(0.0f, 0.0f, 0.0f, 0.0f),
+  _subtree_has_topmost(false),
   _parent(nullptr),
   _root(nullptr),
   _last_frame_visible(-1),
   _last_render_index(-1),
   _topmost(false),
+  _dirty_flags(DF_layout),
   _debug_name("LUIBaseElement"),
   _name(""),
   LUIColorable()
 {
+ // Modifying the margin or padding in place marks the element dirty
+ _margin.set_owner(this);
+ _padding.set_owner(this);
  load_python_events(self);
 }
 
@@ -202,6 +215,128 @@ void LUIBaseElement::unregister_events() {
   }
 }
 
+/**
+ * @brief Internal method to start all timers
+ * @details This schedules all timers of the element at the current LUIRoot.
+ *   This gets called whenever the element recieves a new root.
+ */
+void LUIBaseElement::register_timers() {
+  if (_root && _parent && !_timers_registered) {
+    _timers_registered = true;
+    for (auto it = _timers.begin(); it != _timers.end(); ++it) {
+      _root->add_timer(this, it->first, it->second.interval, it->second.repeat);
+    }
+  }
+}
+
+/**
+ * @brief Internal method to stop all timers
+ * @details This removes all timers of the element from the current LUIRoot,
+ *   they get started again once the element is attached to a root. This gets
+ *   called when the element got detached.
+ */
+void LUIBaseElement::unregister_timers() {
+  if (_root && _timers_registered) {
+    if (!_timers.empty()) {
+      _root->remove_timers(this);
+    }
+    _timers_registered = false;
+  }
+}
+
+/**
+ * @brief Internal method to add the element to the tab order
+ * @details This adds the element to the tab order of the current LUIRoot, in
+ *   case it has a tab index. This gets called whenever the element recieves
+ *   a new root, or the tab index changed.
+ */
+void LUIBaseElement::register_tab_stop() {
+  if (_root && _parent && _tab_index >= 0 && !_tab_stop_registered) {
+    _root->register_tab_stop(this);
+    _tab_stop_registered = true;
+  }
+}
+
+/**
+ * @brief Internal method to remove the element from the tab order
+ * @details This removes the element from the tab order of the current LUIRoot.
+ *   This gets called when the element got detached, or the tab index changed.
+ */
+void LUIBaseElement::unregister_tab_stop() {
+  if (_root && _tab_stop_registered) {
+    _root->unregister_tab_stop(this);
+    _tab_stop_registered = false;
+  }
+}
+
+/**
+ * @brief Sets the tab index of the element
+ * @details This sets the position of the element in the tab order, which is
+ *   used by LUIRoot::focus_next() and LUIRoot::focus_prev(). Elements are
+ *   ordered by their tab index first, and elements with the same tab index
+ *   are ordered by their position in the element tree. A tab index of -1
+ *   removes the element from the tab order, which is the default.
+ *
+ * @param tab_index Tab index, or -1
+ */
+void LUIBaseElement::set_tab_index(int tab_index) {
+  if (tab_index < 0) {
+    tab_index = -1;
+  }
+
+  if (tab_index == _tab_index)
+    return;
+
+  unregister_tab_stop();
+  _tab_index = tab_index;
+  register_tab_stop();
+}
+
+/**
+ * @brief Compares the document order of two elements
+ * @details This returns whether the element a comes before element b in the
+ *   element tree, that is whether a gets visited first when walking the tree
+ *   depth first. Parents come before their children, and siblings are ordered
+ *   by their index in the children of the parent. Both elements have to be
+ *   part of the same tree.
+ *
+ * @param a First element
+ * @param b Second element
+ * @return true if a comes before b, false otherwise
+ */
+bool LUIBaseElement::compare_document_order(const LUIBaseElement* a, const LUIBaseElement* b) {
+  if (a == b)
+    return false;
+
+  int depth_a = 0, depth_b = 0;
+  for (const LUIBaseElement* elem = a->_parent; elem != nullptr; elem = elem->_parent)
+    ++depth_a;
+  for (const LUIBaseElement* elem = b->_parent; elem != nullptr; elem = elem->_parent)
+    ++depth_b;
+
+  // Move both elements to the same depth. If one element is an ancestor of
+  // the other one, it comes first.
+  for (; depth_a > depth_b; --depth_a) {
+    if (a->_parent == b)
+      return false;
+    a = a->_parent;
+  }
+
+  for (; depth_b > depth_a; --depth_b) {
+    if (b->_parent == a)
+      return true;
+    b = b->_parent;
+  }
+
+  // Find the children of the common ancestor
+  while (a->_parent != b->_parent) {
+    a = a->_parent;
+    b = b->_parent;
+  }
+
+  return a->_sibling_index < b->_sibling_index;
+}
+
 /**
  * @brief Sets the elements parent
  * @details This sets the parent of the element. This is equal to calling
@@ -259,6 +394,158 @@ void LUIBaseElement::fetch_render_index() {
   }
 }
 
+/**
+ * @brief Binds a new event handler for a given event
+ * @details This binds a given event handler (a function taking the event as the
+ *   first argument) to an event name. Whenever the event gets triggered, the
+ *   event handler will get invoked.
+ *
+ *   In case the event is already bound, a warning is printed.
+ *
+ * @param event_name Name of the event to bind to
+ * @param callback Event handler, a method taking only one argument (the event)
+ */
+void LUIBaseElement::bind(const string& event_name, CallbackObject* callback) {
+  int event_id = LUIEventData::lookup_event_id(event_name);
+  if (_events.count(event_id) != 0) {
+    lui_cat.warning() << "Overriding event handler for '" << event_name << "', target = " << _debug_name << endl;
+  }
+  _events[event_id] = callback;
+}
+
+/**
+ * @brief Unbinds an event handler
+ * @details Unbinds a event handler, in case one is bound to the given event.
+ *   If there was no event handler for the given event, a warning is printed, and
+ *   nothing happens.
+ *
+ * @param event_name Name of the event to unbind the handler for
+ */
+void LUIBaseElement::unbind(const string& event_name) {
+  const auto elem_it = _events.find(LUIEventData::lookup_event_id(event_name));
+  if (elem_it != _events.end()) {
+    _events.erase(elem_it);
+  } else {
+    lui_cat.warning() << "Unbinding event handler for '" << event_name << "', but none was ever set!" << endl;
+  }
+}
+
+/**
+ * @brief Checks whether an event handler is bound to the given event
+ * @details This checks whether there is a event handler for the event.
+ *   Returns true if there is a handler bound to the event, otherwise false.
+ *
+ * @param event_name Name of the evenet
+ * @return true if the event has an event handler, false otherwise
+ */
+bool LUIBaseElement::has_event(const string& event_name) const {
+  return _events.count(LUIEventData::lookup_event_id(event_name)) > 0;
+}
+
+/**
+ * @brief Triggers an event periodically
+ * @details This makes the element trigger the given event every interval
+ *   seconds, as long as it is attached to a root. An interval of 0 triggers the
+ *   event every frame. Only elements whose timers are due get woken up, so this
+ *   should be preferred over doing work in the tick event. In case the event
+ *   already had a timer, it gets replaced, and restarts.
+ *
+ *   Timers stop when the element gets detached, and start again once it gets
+ *   attached to a root.
+ *
+ * @param event_name Name of the event to trigger
+ * @param interval Interval in seconds
+ */
+void LUIBaseElement::set_interval(const string& event_name, float interval) {
+  add_timer(event_name, interval, true);
+}
+
+/**
+ * @brief Triggers an event once after a delay
+ * @details This makes the element trigger the given event once, after the given
+ *   delay in seconds. The delay starts when the element is attached to a root.
+ *   See LUIBaseElement::set_interval.
+ *
+ * @param event_name Name of the event to trigger
+ * @param delay Delay in seconds
+ */
+void LUIBaseElement::set_timeout(const string& event_name, float delay) {
+  add_timer(event_name, delay, false);
+}
+
+/**
+ * @brief Internal method to add a timer
+ * @details This adds or replaces the timer for the given event, and schedules
+ *   it in case the element is attached to a root.
+ *
+ * @param event_name Name of the event to trigger
+ * @param interval Interval or delay in seconds
+ * @param repeat Whether to trigger the event periodically
+ */
+void LUIBaseElement::add_timer(const string& event_name, float interval, bool repeat) {
+  nassertv(interval >= 0.0f);
+  int event_id = LUIEventData::lookup_event_id(event_name);
+
+  if (_timers_registered && _timers.count(event_id) > 0) {
+    _root->remove_timers(this, event_id);
+  }
+
+  LUITimerInfo& info = _timers[event_id];
+  info.interval = interval;
+  info.repeat = repeat;
+
+  if (_timers_registered) {
+    _root->add_timer(this, event_id, interval, repeat);
+  }
+}
+
+/**
+ * @brief Stops a timer
+ * @details This stops the timer of the given event, which was previously
+ *   started with set_interval() or set_timeout(). If there is no timer for the
+ *   event, nothing happens.
+ *
+ * @param event_name Name of the event
+ */
+void LUIBaseElement::clear_timer(const string& event_name) {
+  auto it = _timers.find(LUIEventData::lookup_event_id(event_name));
+  if (it != _timers.end()) {
+    if (_timers_registered) {
+      _root->remove_timers(this, it->first);
+    }
+    _timers.erase(it);
+  }
+}
+
+/**
+ * @brief Checks whether a timer is running for the given event
+ * @details This returns whether the given event has a timer, which was started
+ *   with set_interval() or set_timeout(). Timeouts which already expired don't
+ *   count.
+ *
+ * @param event_name Name of the event
+ * @return true if the event has a timer, false otherwise
+ */
+bool LUIBaseElement::has_timer(const string& event_name) const {
+  return _timers.count(LUIEventData::lookup_event_id(event_name)) > 0;
+}
+
+/**
+ * @brief Finds the element at the given point
+ * @details This returns the front-most element of the subtree of this element
+ *   which was visible in the given frame and contains the given absolute point,
+ *   or nullptr if there is none. Elements don't have to be solid to be found.
+ *   This is used to resolve the target of delegated events.
+ *
+ * @param x absolute x-coordinate in pixels
+ * @param y absolute y-coordinate in pixels
+ * @param frame_index Frame the elements have to be visible in
+ * @return Element at the point, or nullptr
+ */
+LUIBaseElement* LUIBaseElement::find_target(float x, float y, int frame_index) {
+  return intersects(x, y) ? this : nullptr;
+}
+
 /**
  * @brief Triggers an event
  * @details This triggers an event with the given name and a message. Optionally
@@ -271,7 +558,12 @@ void LUIBaseElement::fetch_render_index() {
  * @param coords Optional coordinates of the event
  */
 void LUIBaseElement::trigger_event(const string& event_name, const wstring& message, const LPoint2& coords) {
-  trigger_event(new LUIEventData(this, event_name, message, coords));
+  int event_id = LUIEventData::lookup_event_id(event_name);
+
+  // Don't construct the event data when nobody listens to the event
+  if (has_event(event_id)) {
+    trigger_event(new LUIEventData(this, event_id, message, coords));
+  }
 }
 
 /**
@@ -283,14 +575,91 @@ void LUIBaseElement::trigger_event(const string& event_name, const wstring& mess
  * @param data Event data
  */
 void LUIBaseElement::trigger_event(PT(LUIEventData) data) {
-  auto elem_it = _events.find(data->get_name());
+  auto elem_it = _events.find(data->get_event_id());
   if (elem_it != _events.end()) {
       elem_it->second->do_callback(data);
   }
 }
 
+/**
+ * @brief Marks the element dirty
+ * @details This marks the element dirty, so it gets updated in the next
+ *   frame. All ancestors get the DF_child flag, so the layout passes can skip
+ *   all subtrees which contain no dirty elements.
+ *
+ *   In case the layout changed, the parent gets layouted as well, since it
+ *   might fit its size to its children, or position its children based on their
+ *   size (like layouts do). This continues upwards as long as the size of the
+ *   parent depends on its children.
+ *
+ * @param flags Combination of LUIBaseElement::DirtyFlags
+ */
+void LUIBaseElement::mark_dirty(int flags) {
+  _dirty_flags |= flags;
+  notify_scene_changed();
+
+  bool propagate_layout = (flags & DF_layout) != 0;
+  for (LUIObject* parent = _parent; parent != nullptr; parent = parent->_parent) {
+    int parent_flags = DF_child;
+    if (propagate_layout) {
+      parent_flags |= DF_layout;
+      propagate_layout = !parent->has_size();
+    }
+
+    // When the parent already has the flags, so do all of its ancestors
+    if ((parent->_dirty_flags & parent_flags) == parent_flags)
+      break;
+
+    parent->_dirty_flags |= parent_flags;
+  }
+}
+
+/**
+ * @brief Returns whether the element and all of its parents are visible
+ * @details Unlike is_visible(), this also takes the parents into account, and
+ *   returns false for elements which are not attached to a root. Unlike
+ *   get_last_frame_visible(), this reflects changes made since the last frame
+ *   got rendered.
+ *
+ * @return Whether the element would be rendered in the next frame
+ */
+bool LUIBaseElement::is_visible_in_tree() const {
+  if (_root == nullptr)
+    return false;
+
+  for (const LUIBaseElement* elem = this; elem != nullptr; elem = elem->_parent) {
+    if (!elem->_visible)
+      return false;
+  }
+  return true;
+}
+
+/**
+ * @brief Notifies the root about a change
+ * @details This tells the LUIRoot that the scene changed, and thus has to be
+ *   rendered again. As long as nothing changes, the LUIRegion reuses the
+ *   results of the last frame.
+ */
+void LUIBaseElement::notify_scene_changed() {
+  if (_root != nullptr)
+    _root->mark_scene_changed();
+}
+
+/**
+ * @brief Internal method to handle color changes
+ * @details This gets called by LUIColorable whenever the color changed, and
+ *   marks the element dirty, so the composed color gets recomputed.
+ */
+void LUIBaseElement::on_color_changed() {
+  mark_dirty(DF_color);
+}
+
 void LUIBaseElement::set_z_offset(float z_offset) {
+  if (_z_offset == z_offset)
+    return;
+
   _z_offset = z_offset;
+  notify_scene_changed();
 
   // Notify parent about changed z-index - so the children can be re-sorted
   if (_parent)
@@ -356,7 +725,8 @@ void LUIBaseElement::update_dimensions() {
 }
 
 void LUIBaseElement::update_dimensions_upstream() {
-  update_dimensions();
+  if (needs_layout())
+    update_dimensions();
 }
 
 void LUIBaseElement::update_position() {
@@ -393,6 +763,14 @@ void LUIBaseElement::update_position() {
 
 void LUIBaseElement::update_downstream() {
 
+  // Skip the element in case neither its layout nor its color changed
+  if (!(_dirty_flags & (DF_layout | DF_layout_settle | DF_color)))
+    return;
+
+  // Remember the layout of the last frame, to find out whether it changed
+  _layout_start_position = _abs_position;
+  _layout_start_size = _effective_size;
+
   // Reset temporary attributes
   // _abs_position.set(0, 0);
   // _effective_size.set(0, 0);
@@ -430,6 +808,9 @@ void LUIBaseElement::update_downstream() {
 
 void LUIBaseElement::update_upstream() {
 
+  if (!needs_layout())
+    return;
+
   // In the upstream pass, the following attributes are updated:
   // - absolute position for elements which are aligned right / bottom
   // - width/height for elements without explicit size
@@ -440,10 +821,23 @@ void LUIBaseElement::update_upstream() {
     // In case of no parent, we are the root element. In that case, we don't really
     // have to do anything.
   }
+
+  // The position is final now, so store the bounds of the element. Objects
+  // extend these by the bounds of their children.
+  _subtree_bounds.set_rect(_abs_position, _effective_size);
 }
 
 
 void LUIBaseElement::update_clip_bounds() {
+  if (_dirty_flags & (DF_layout | DF_layout_settle | DF_clip)) {
+    compute_clip_bounds();
+  }
+
+  // The clip pass is the last pass, so all changes are processed now
+  finish_dirty_flags(false, false);
+}
+
+void LUIBaseElement::compute_clip_bounds() {
 
   // In case we have no parent, we don't need bounds
   if (!_parent)
@@ -489,9 +883,14 @@ void LUIBaseElement::update_clip_bounds() {
     }
   }
 
+  // The position and clip bounds are final now, so update the hit testing index
+  if (_events_registered && _root != nullptr) {
+    _root->update_event_object(this);
+  }
 }
 
 void LUIBaseElement::move_by(const LVector2& offset) {
   _abs_position.add_x(offset.get_x());
   _abs_position.add_y(offset.get_y());
+  _subtree_bounds.set_rect(_subtree_bounds.get_xy() + offset, _subtree_bounds.get_wh());
 }
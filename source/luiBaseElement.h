@@ -37,21 +37,28 @@ class EXPCL_LUI LUIBaseElement : public TypedReferenceCount, public LUIColorable
 
   friend class LUIObject;
   friend class LUIText;
+  friend class LUIRoot;
 
 PUBLISHED:
   LUIBaseElement(PyObject* self);
   virtual ~LUIBaseElement();
 
   // Events
-  INLINE void bind(const string& event_name, CallbackObject* callback);
-  INLINE void unbind(const string& event_name);
+  void bind(const string& event_name, CallbackObject* callback);
+  void unbind(const string& event_name);
   INLINE void unbind_all();
 
-  INLINE bool has_event(const string& event_name);
+  bool has_event(const string& event_name) const;
   void trigger_event(const string& event_name, const wstring& message = wstring(),
                      const LPoint2& coords = LPoint2(0));
   void trigger_event(PT(LUIEventData) data);
 
+  // Timers
+  void set_interval(const string& event_name, float interval);
+  void set_timeout(const string& event_name, float delay);
+  void clear_timer(const string& event_name);
+  bool has_timer(const string& event_name) const;
+
   // NAME
   INLINE void set_name(const string& name);
   INLINE const string& get_name() const;
@@ -151,6 +158,10 @@ PUBLISHED:
   INLINE void set_solid(bool solid);
   INLINE bool get_solid() const;
 
+  // Event delegation
+  INLINE void set_delegate_events(bool delegate_events);
+  INLINE bool get_delegate_events() const;
+
   // Z-Index
   void set_z_offset(float z_offset);
   INLINE float get_z_offset() const;
@@ -160,18 +171,24 @@ PUBLISHED:
   bool request_focus();
   void blur();
 
+  // Tab order
+  void set_tab_index(int tab_index);
+  INLINE int get_tab_index() const;
+
   INLINE bool has_parent() const;
   void clear_parent();
   void set_parent(LUIObject* parent);
   INLINE LUIObject* get_parent() const;
 
   INLINE virtual bool intersects(float x, float y) const;
+  INLINE LUIRect get_hit_rect() const;
 
   INLINE void clear_clip_bounds();
   INLINE void set_clip_bounds(const LUIBounds& bounds);
   INLINE void set_clip_bounds(float top, float right, float bottom, float left);
   INLINE const LUIBounds& get_clip_bounds() const;
   INLINE const LUIRect& get_abs_clip_bounds() const;
+  INLINE const LUIRect& get_subtree_bounds() const;
 
   INLINE bool is_topmost() const;
   INLINE void set_topmost(bool topmost);
@@ -216,6 +233,8 @@ PUBLISHED:
   MAKE_PROPERTY(clip_bounds, get_clip_bounds, set_clip_bounds);
   MAKE_PROPERTY(topmost, is_topmost, set_topmost);
   MAKE_PROPERTY(solid, get_solid, set_solid);
+  MAKE_PROPERTY(delegate_events, get_delegate_events, set_delegate_events);
+  MAKE_PROPERTY(tab_index, get_tab_index, set_tab_index);
 
 public:
 
@@ -226,12 +245,45 @@ public:
 
   virtual void ls(int ident = 0) = 0;
 
+  INLINE bool has_event(int event_id) const;
+  virtual LUIBaseElement* find_target(float x, float y, int frame_index);
+  INLINE CallbackObject* get_event_handler(int event_id) const;
+
   INLINE void set_focus(bool focus);
+  static bool compare_document_order(const LUIBaseElement* a, const LUIBaseElement* b);
   INLINE int get_last_frame_visible() const;
   INLINE int get_last_render_index() const;
+  bool is_visible_in_tree() const;
 
   INLINE void do_set_z_offset(int z_offset);
 
+  // Dirty flags, used to skip clean subtrees while updating the layout
+  enum DirtyFlags {
+    DF_none = 0,
+
+    // Position, size, margin or padding changed
+    DF_layout = 1 << 0,
+
+    // Clip bounds or topmost state changed
+    DF_clip = 1 << 1,
+
+    // Color changed
+    DF_color = 1 << 2,
+
+    // Layout changed last frame, relayout once more so that
+    // expressions depending on other elements converge. This repeats
+    // until the layout stops changing.
+    DF_layout_settle = 1 << 3,
+
+    // Any of the elements descendants is dirty
+    DF_child = 1 << 4
+  };
+
+  void mark_dirty(int flags);
+  void notify_scene_changed();
+  INLINE int get_dirty_flags() const;
+  INLINE bool needs_layout() const;
+
   virtual void update_dimensions_upstream();
   virtual void update_downstream();
   virtual void update_upstream();
@@ -244,6 +296,10 @@ protected:
   virtual void update_dimensions();
   virtual void update_position();
   LVector2 get_available_dimensions() const;
+  void compute_clip_bounds();
+  INLINE bool has_layout_changed() const;
+  INLINE void finish_dirty_flags(bool child_dirty, bool child_changed);
+  virtual void on_color_changed();
 
   void load_python_events(PyObject* self);
 
@@ -263,14 +319,22 @@ protected:
     M_center
   };
 
+  INLINE void set_placement(LUIPlacementMode x, LUIPlacementMode y, const LPoint2& pos);
+  INLINE void set_bounds(LUIBounds& target, const LUIBounds& bounds);
+  INLINE void set_size_expression(LUIExpression& target, const LUIExpression& expression);
+
   // Interface
   virtual void set_root(LUIRoot* root) = 0;
   virtual void on_detached() = 0;
 
-  virtual void render_recursive(bool is_topmost_pass, bool render_anyway) = 0;
+  virtual void render_recursive(bool is_topmost_pass) = 0;
 
   void register_events();
   void unregister_events();
+  void register_timers();
+  void unregister_timers();
+  void register_tab_stop();
+  void unregister_tab_stop();
 
   // Relative position
   LPoint2 _position;
@@ -279,6 +343,10 @@ protected:
   LPoint2 _abs_position;
   LVector2 _effective_size;
 
+  // Absolute position and size before the layout of the current frame
+  LPoint2 _layout_start_position;
+  LVector2 _layout_start_size;
+
   // Placement modes
   struct {
     LUIPlacementMode x, y;
@@ -294,9 +362,29 @@ protected:
   float _z_offset;
 
   bool _events_registered;
+  bool _timers_registered;
+  bool _tab_stop_registered;
+
+  // Position in the tab order, or -1 if the element is not part of it
+  int _tab_index;
+
+  // Index of the element in the children of its parent, used to compare the
+  // document order of elements
+  int _sibling_index;
+
+  // Timers of the element, keyed by event id. They only run while the element
+  // is attached to a root.
+  struct LUITimerInfo {
+    float interval;
+    bool repeat;
+  };
+  pmap<int, LUITimerInfo> _timers;
+
+  void add_timer(const string& event_name, float interval, bool repeat);
   bool _snap_position;
   bool _focused;
   bool _solid;
+  bool _delegate_events;
 
   // Margin and padding, relative to the element bounds
   LUIBounds _margin;
@@ -309,7 +397,15 @@ protected:
   // Clip bounds, in absolute space
   LUIRect _abs_clip_bounds;
 
-  pmap<string, PT(CallbackObject)> _events;
+  // Bounds of the element and all of its descendants, in absolute space
+  LUIRect _subtree_bounds;
+
+  // Whether any descendant is topmost. Such subtrees are never culled, since
+  // topmost elements ignore the clip bounds of their parents.
+  bool _subtree_has_topmost;
+
+  // Event handlers, keyed by the id from LUIEventData::lookup_event_id
+  pmap<int, PT(CallbackObject)> _events;
 
   LUIObject* _parent;
   LUIRoot* _root;
@@ -318,6 +414,8 @@ protected:
   int _last_render_index;
   bool _topmost;
 
+  int _dirty_flags;
+
   string _debug_name;
   string _name;
 
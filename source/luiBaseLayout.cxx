@@ -187,13 +187,17 @@ void LUIBaseLayout::update_layout() {
 }
 
 void LUIBaseLayout::update_dimensions_upstream() {
+  int inherited_flags = _dirty_flags & (DF_layout | DF_layout_settle);
   for (auto it = _children.begin(); it!= _children.end(); ++it) {
-    (*it)->update_dimensions_upstream();
+    if (visit_child(*it, inherited_flags))
+      (*it)->update_dimensions_upstream();
   }
 
-  update_dimensions();
-  update_layout();
-  fit_dimensions();
+  if (needs_layout()) {
+    update_dimensions();
+    update_layout();
+    fit_dimensions();
+  }
 }
 
 void LUIBaseLayout::reset() {
@@ -204,17 +208,19 @@ void LUIBaseLayout::reset() {
 
 void LUIBaseLayout::update_downstream() {
 
-  update_layout();
+  if (needs_layout()) {
+    update_layout();
 
-  bool fill_children = has_space(this);
+    bool fill_children = has_space(this);
 
-  for (auto it = _children.begin(); it != _children.end(); ++it) {
-    if (fill_children)
-      // Layout has either fixed width/height assigned, make all containers resize
-      set_full_metric(*it);
-    else
-      // Layout has no fixed size, fit the children
-      clear_metric(*it);
+    for (auto it = _children.begin(); it != _children.end(); ++it) {
+      if (fill_children)
+        // Layout has either fixed width/height assigned, make all containers resize
+        set_full_metric(*it);
+      else
+        // Layout has no fixed size, fit the children
+        clear_metric(*it);
+    }
   }
 
   LUIObject::update_downstream();
@@ -1,2 +1,12 @@
 
 #include "luiBounds.h"
+#include "luiBaseElement.h"
+
+/**
+ * @brief Internal method to mark the owner dirty
+ * @details This marks the layout of the owning element dirty. This is not inline,
+ *   since the element is not known in the header.
+ */
+void LUIBounds::notify_owner() {
+  _owner->mark_dirty(LUIBaseElement::DF_layout);
+}
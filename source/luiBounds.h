@@ -11,15 +11,18 @@
 #include "luse.h"
 #include "referenceCount.h"
 
+class LUIBaseElement;
+
 class EXPCL_LUI LUIBounds {
 
 PUBLISHED:
 
-  LUIBounds() : _bounds(-1) {};
-  explicit LUIBounds(float fill_value) : _bounds(fill_value) {};
-  explicit LUIBounds(const LVector4& bounds) : _bounds(bounds) {};
+  LUIBounds() : _bounds(-1), _owner(nullptr) {};
+  explicit LUIBounds(float fill_value) : _bounds(fill_value), _owner(nullptr) {};
+  explicit LUIBounds(const LVector4& bounds) : _bounds(bounds), _owner(nullptr) {};
   LUIBounds(float top, float right, float bottom, float left)
-    : _bounds(top, right, bottom, left) {};
+    : _bounds(top, right, bottom, left), _owner(nullptr) {};
+  LUIBounds(const LUIBounds& other) : _bounds(other._bounds), _owner(nullptr) {};
 
   INLINE float get_top() const;
   INLINE float get_right() const;
@@ -45,9 +48,21 @@ PUBLISHED:
     return stream << "Bounds[" << bounds.get_top() << ", " << bounds.get_right() << ", "
                   << bounds.get_bottom() << ", " << bounds.get_left() << "]";
   }
+public:
+
+  INLINE LUIBounds& operator = (const LUIBounds& other);
+  INLINE void set_owner(LUIBaseElement* owner);
+
 protected:
 
+  INLINE void notify_changed();
+  void notify_owner();
+
   LVector4 _bounds;
+
+  // Element which gets marked dirty when the bounds are modified, this is
+  // not copied along with the bounds
+  LUIBaseElement* _owner;
 };
 
 
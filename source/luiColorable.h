@@ -47,6 +47,9 @@ protected:
 
   INLINE void compose_color(const LColor& parent_color = LColor(1));
 
+  // Gets called whenever the color was modified
+  virtual void on_color_changed() {};
+
   LColor _color;
   LColor _composed_color;
 };
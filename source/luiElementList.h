@@ -0,0 +1,46 @@
+// Filename: luiElementList.h
+//
+
+#ifndef LUI_ELEMENT_LIST_H
+#define LUI_ELEMENT_LIST_H
+
+#include "pandabase.h"
+#include "pandasymbols.h"
+#include "referenceCount.h"
+#include "config_lui.h"
+#include "luiBaseElement.h"
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUIElementList
+// Description : List of elements, returned by queries like
+//               LUIRoot::elements_at. In contrast to the
+//               LUIElementIterator, the list keeps its own copy of
+//               the elements, so it stays valid when the scene
+//               changes.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUIElementList : public ReferenceCount {
+
+PUBLISHED:
+
+  INLINE size_t get_num_elements() const;
+  INLINE LUIBaseElement* get_element(size_t n) const;
+  MAKE_SEQ(get_elements, get_num_elements, get_element);
+
+  INLINE size_t size() const;
+  INLINE LUIBaseElement* operator [] (size_t n) const;
+
+  MAKE_PROPERTY(num_elements, get_num_elements);
+
+public:
+
+  INLINE void add_element(LUIBaseElement* elem);
+
+private:
+
+  pvector<PT(LUIBaseElement)> _elements;
+
+};
+
+#include "luiElementList.I"
+
+#endif
@@ -0,0 +1,10 @@
+
+#include "luiEventBatch.h"
+
+TypeHandle LUIEventBatch::_type_handle;
+
+LUIEventBatch::LUIEventBatch() : CallbackData() {
+}
+
+LUIEventBatch::~LUIEventBatch() {
+}
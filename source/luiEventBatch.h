@@ -0,0 +1,65 @@
+// Filename: luiEventBatch.h
+//
+
+#ifndef LUI_EVENT_BATCH_H
+#define LUI_EVENT_BATCH_H
+
+#include "config_lui.h"
+#include "pandabase.h"
+#include "pandasymbols.h"
+#include "referenceCount.h"
+#include "callbackData.h"
+#include "callbackObject.h"
+#include "luiEventData.h"
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUIEventBatch
+// Description : All events of a frame, together with the handlers
+//               they would have been delivered to. This is passed
+//               to the event dispatcher of the LUIInputHandler, so
+//               a whole frame of events only needs a single call
+//               into python.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUIEventBatch : public CallbackData, public ReferenceCount {
+
+PUBLISHED:
+
+  INLINE size_t get_num_events() const;
+  INLINE LUIEventData* get_event(size_t n) const;
+  INLINE CallbackObject* get_handler(size_t n) const;
+  MAKE_PROPERTY(num_events, get_num_events);
+
+public:
+
+  LUIEventBatch();
+  ~LUIEventBatch();
+
+  INLINE void add_event(LUIEventData* data, CallbackObject* handler);
+  INLINE void take_events(pvector<PT(LUIEventData)>& events);
+
+protected:
+
+  pvector<PT(LUIEventData)> _events;
+  pvector<PT(CallbackObject)> _handlers;
+
+public:
+  static TypeHandle get_class_type() {
+    return _type_handle;
+  }
+  static void init_type() {
+    CallbackData::init_type();
+    register_type(_type_handle, "LUIEventBatch", CallbackData::get_class_type());
+  }
+  virtual TypeHandle get_type() const {
+    return get_class_type();
+  }
+  virtual TypeHandle force_init_type() {init_type(); return get_class_type();}
+
+private:
+  static TypeHandle _type_handle;
+
+};
+
+#include "luiEventBatch.I"
+
+#endif
@@ -7,12 +7,139 @@ LUIEventData::LUIEventData(LUIBaseElement* sender, const string& event_name,
                            const wstring& message, const LPoint2& coordinates,
                            size_t key_modifiers)
   : CallbackData(),
-  _event_name(event_name),
+  _event_id(lookup_event_id(event_name)),
   _sender(sender),
   _coordinates(coordinates),
+  _delta(0),
   _message(message),
   _key_modifiers(key_modifiers) {
 }
 
+LUIEventData::LUIEventData(LUIBaseElement* sender, int event_id,
+                           const wstring& message, const LPoint2& coordinates,
+                           size_t key_modifiers)
+  : CallbackData(),
+  _event_id(event_id),
+  _sender(sender),
+  _coordinates(coordinates),
+  _delta(0),
+  _message(message),
+  _key_modifiers(key_modifiers) {
+}
+
+/**
+ * @brief Returns the id of an event name
+ * @details Event names are interned, so events can be dispatched by comparing
+ *   integers instead of strings. This returns the id of the given event name,
+ *   and assigns a new id in case the name was never used before. Builtin events
+ *   always have the ids from LUIEventData::BuiltinEvent.
+ *
+ * @param event_name Name of the event
+ * @return Id of the event
+ */
+int LUIEventData::lookup_event_id(const string& event_name) {
+  pmap<string, int>& event_ids = get_event_ids();
+  auto it = event_ids.find(event_name);
+  if (it != event_ids.end()) {
+    return it->second;
+  }
+
+  pvector<string>& event_names = get_event_names();
+  int event_id = event_names.size();
+  event_names.push_back(event_name);
+  event_ids[event_name] = event_id;
+  return event_id;
+}
+
+/**
+ * @brief Returns the name of an event id
+ * @details This returns the event name which was assigned the given id by
+ *   LUIEventData::lookup_event_id.
+ *
+ * @param event_id Id of the event
+ * @return Name of the event
+ */
+const string& LUIEventData::get_event_name(int event_id) {
+  pvector<string>& event_names = get_event_names();
+  nassertr(event_id >= 0 && event_id < event_names.size(), event_names[0]);
+  return event_names[event_id];
+}
+
+/**
+ * @brief Internal method to construct event data
+ * @details This returns event data with the given attributes. Event data
+ *   previously passed to LUIEventData::recycle_event_data is reused if
+ *   possible, so triggering events does not have to allocate every time.
+ *
+ * @param sender Element which triggered the event
+ * @param event_id Event id
+ * @param message Message of the event
+ * @param coordinates Mouse position
+ * @param key_modifiers Active key modifiers
+ * @return Event data
+ */
+PT(LUIEventData) LUIEventData::make_event_data(LUIBaseElement* sender, int event_id,
+                                               const wstring& message,
+                                               const LPoint2& coordinates,
+                                               size_t key_modifiers) {
+  pvector<PT(LUIEventData)>& event_pool = get_event_pool();
+  if (event_pool.empty()) {
+    return new LUIEventData(sender, event_id, message, coordinates, key_modifiers);
+  }
+
+  PT(LUIEventData) data = event_pool.back();
+  event_pool.pop_back();
+  data->set_event(sender, event_id, message, coordinates, key_modifiers);
+  return data;
+}
+
+/**
+ * @brief Internal method to return event data to the pool
+ * @details This puts the event data back into the pool, unless anything else
+ *   than the caller still references it, e.g. because an event handler stored
+ *   the event.
+ *
+ * @param data Event data, which was constructed by make_event_data
+ */
+void LUIEventData::recycle_event_data(LUIEventData* data) {
+  // The pool is bounded by the amount of events per frame, but a single frame
+  // with lots of events should not keep its event data alive forever
+  pvector<PT(LUIEventData)>& event_pool = get_event_pool();
+  if (data->get_ref_count() == 1 && event_pool.size() < 256) {
+    data->clear_sender();
+    event_pool.push_back(data);
+  }
+}
+
+pvector<string>& LUIEventData::get_event_names() {
+  // The builtin events are registered first, in the order of BuiltinEvent
+  static pvector<string> event_names;
+  if (event_names.empty()) {
+    const char* builtin_events[E_num_builtin_events] = {
+      "mouseover", "mouseout", "mousemove", "mousedown", "mouseup", "click",
+      "focus", "blur", "keydown", "keyup", "keyrepeat", "textinput", "tick"
+    };
+    event_names.assign(builtin_events, builtin_events + E_num_builtin_events);
+  }
+  return event_names;
+}
+
+pmap<string, int>& LUIEventData::get_event_ids() {
+  static pmap<string, int> event_ids;
+  if (event_ids.empty()) {
+    const pvector<string>& event_names = get_event_names();
+    for (size_t i = 0; i < event_names.size(); ++i) {
+      event_ids[event_names[i]] = i;
+    }
+  }
+  return event_ids;
+}
+
+pvector<PT(LUIEventData)>& LUIEventData::get_event_pool() {
+  // Event data which is no longer referenced, and can be reused
+  static pvector<PT(LUIEventData)> event_pool;
+  return event_pool;
+}
+
 LUIEventData::~LUIEventData() {
 }
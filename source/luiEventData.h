@@ -25,9 +25,12 @@ PUBLISHED:
   };
 
 
-  INLINE string get_name() const;
+  INLINE const string& get_name() const;
+  INLINE int get_event_id() const;
   INLINE PT(LUIBaseElement) get_sender() const;
+  INLINE PT(LUIBaseElement) get_target() const;
   INLINE LPoint2 get_coordinates() const;
+  INLINE LVector2 get_delta() const;
   INLINE wstring get_message() const;
   INLINE size_t get_key_modifiers() const;
 
@@ -37,26 +40,73 @@ PUBLISHED:
 
   MAKE_PROPERTY(name, get_name);
   MAKE_PROPERTY(sender, get_sender);
+  MAKE_PROPERTY(target, get_target);
   MAKE_PROPERTY(coordinates, get_coordinates);
+  MAKE_PROPERTY(delta, get_delta);
   MAKE_PROPERTY(message, get_message);
   MAKE_PROPERTY(key_modifiers, get_key_modifiers);
 
+  static int lookup_event_id(const string& event_name);
+  static const string& get_event_name(int event_id);
+
 public:
 
+  // Events triggered by the input handler. Their ids are fixed, so they don't
+  // have to be looked up by name.
+  enum BuiltinEvent {
+    E_mouseover = 0,
+    E_mouseout,
+    E_mousemove,
+    E_mousedown,
+    E_mouseup,
+    E_click,
+    E_focus,
+    E_blur,
+    E_keydown,
+    E_keyup,
+    E_keyrepeat,
+    E_textinput,
+    E_tick,
+    E_num_builtin_events
+  };
+
   LUIEventData(LUIBaseElement* sender,
                const string& event_name,
                const wstring& message,
                const LPoint2& coordinates = LPoint2(0),
                size_t key_modifiers = 0);
+  LUIEventData(LUIBaseElement* sender,
+               int event_id,
+               const wstring& message,
+               const LPoint2& coordinates = LPoint2(0),
+               size_t key_modifiers = 0);
   ~LUIEventData();
 
+  INLINE void set_event(LUIBaseElement* sender, int event_id, const wstring& message,
+                        const LPoint2& coordinates, size_t key_modifiers);
+  INLINE void set_target(LUIBaseElement* target);
+  INLINE void set_delta(const LVector2& delta);
+  INLINE void clear_sender();
+
+  static PT(LUIEventData) make_event_data(LUIBaseElement* sender, int event_id,
+                                          const wstring& message,
+                                          const LPoint2& coordinates = LPoint2(0),
+                                          size_t key_modifiers = 0);
+  static void recycle_event_data(LUIEventData* data);
+
 protected:
 
-  string _event_name;
+  static pvector<string>& get_event_names();
+  static pmap<string, int>& get_event_ids();
+  static pvector<PT(LUIEventData)>& get_event_pool();
+
+  int _event_id;
   size_t _key_modifiers;
   wstring _message;
   PT(LUIBaseElement) _sender;
+  PT(LUIBaseElement) _target;
   LPoint2 _coordinates;
+  LVector2 _delta;
 
 public:
   static TypeHandle get_class_type() {
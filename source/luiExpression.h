@@ -28,6 +28,9 @@ public:
   INLINE bool has_fixed_expression() const;
   INLINE bool has_parent_dependent_expression() const;
 
+  INLINE bool operator==(const LUIExpression& other) const;
+  INLINE bool operator!=(const LUIExpression& other) const;
+
 private:
   ExpressionType _type;
   float _value;
@@ -0,0 +1,210 @@
+
+#include "luiFontMetrics.h"
+#include "dynamicTextPage.h"
+#include "pandaVersion.h"
+
+LUIFontMetrics::LUIFontMetrics(DynamicTextFont* font) : _font(font) {
+  for (int i = 0; i < LUI_DENSE_GLYPH_COUNT; ++i) {
+    _dense_glyphs[i].loaded = false;
+    _dense_glyphs[i].supported = false;
+  }
+}
+
+LUIFontMetrics::~LUIFontMetrics() {
+}
+
+/**
+ * @brief Internal method to fetch a glyph
+ * @details This fetches the glyph of the given character from the font and
+ *   stores its metrics in the entry. If the font does not support the
+ *   character, the entry is marked as unsupported.
+ *
+ * @param char_code Code of the character
+ * @param entry Entry to store the metrics in
+ */
+void LUIFontMetrics::load_glyph(int char_code, LUIGlyphEntry& entry) {
+  entry.loaded = true;
+  entry.supported = false;
+
+#if PANDA_MAJOR_VERSION > 1 || PANDA_MINOR_VERSION >= 10
+  CPT(TextGlyph) const_glyph;
+#else
+  const TextGlyph* const_glyph;
+#endif
+
+  if (!_font->get_glyph(char_code, const_glyph)) {
+    return;
+  }
+
+  CPT(DynamicTextGlyph) dynamic_glyph = DCAST(DynamicTextGlyph, const_glyph);
+
+  // If this gets executed, a non-dynamic font got loaded.
+  nassertv(dynamic_glyph != nullptr);
+
+  LUIGlyphMetrics& metrics = entry.metrics;
+  metrics.advance = dynamic_glyph->get_advance();
+  metrics.left = dynamic_glyph->get_left();
+  metrics.right = dynamic_glyph->get_right();
+  metrics.top = dynamic_glyph->get_top();
+  metrics.bottom = dynamic_glyph->get_bottom();
+  metrics.uv_left = dynamic_glyph->get_uv_left();
+  metrics.uv_right = dynamic_glyph->get_uv_right();
+  metrics.uv_top = dynamic_glyph->get_uv_top();
+  metrics.uv_bottom = dynamic_glyph->get_uv_bottom();
+  metrics.page = dynamic_glyph->get_page();
+
+  _glyphs.push_back(dynamic_glyph);
+  entry.supported = true;
+}
+
+/**
+ * @brief Lays out a text
+ * @details This computes the line and cursor position of every character of
+ *   the text, starting at the given index. This is the layout used by LUIText
+ *   and LUIFontPool::measure, so both always agree on the size of a text.
+ *
+ *   When wrapping, lines break in front of the word which exceeds the wrap
+ *   width, and at newlines. The layout in front of a word start (see
+ *   is_word_start) does not depend on any character behind it, so the layout
+ *   can be continued there, using the cursor stored in the placement of that
+ *   character. Without wrapping, it can be continued at any character.
+ *
+ * @param text Text to lay out
+ * @param start Index of the first character to lay out
+ * @param font_size Font size in pixels
+ * @param wordwrap Whether to wrap the text
+ * @param wrap_width Width to wrap the text at, in pixels
+ * @param cursor Cursor in front of the first character, receives the cursor
+ *   behind the last character
+ * @param placements Receives the layout of every character from start on, the
+ *   placements in front of start are kept
+ */
+void LUIFontMetrics::layout_text(const wstring& text, int start, float font_size,
+                                 bool wordwrap, float wrap_width, LUITextCursor& cursor,
+                                 pvector<LUIGlyphPlacement>& placements) {
+  int len = text.size();
+  float ppu = font_size;
+  placements.resize(len);
+
+  // Look up the glyph of every character once, and find the characters which
+  // start a new line when wrapping. Only the width of the current line
+  // matters, so positions are relative to the start of the line.
+  int word_start = max(0, start - 1);
+  float word_start_pos = 0.0f;
+  float future_x_pos = cursor.wrap_pos;
+  float line_start = 0.0f;
+
+  for (int char_idx = start; char_idx < len; ++char_idx) {
+    LUIGlyphPlacement& placement = placements[char_idx];
+    placement.glyph = nullptr;
+    placement.line_break = false;
+    placement.cursor.wrap_pos = future_x_pos - line_start;
+
+    // Character is a newline, the next word starts after it
+    if (wordwrap && text[char_idx] == 10) {
+      word_start = char_idx;
+      word_start_pos = future_x_pos;
+      line_start = future_x_pos;
+      continue;
+    }
+
+    const LUIGlyphMetrics* glyph = get_glyph(text[char_idx]);
+    if (glyph == nullptr) {
+      continue;
+    }
+
+    placement.glyph = glyph;
+
+    if (wordwrap) {
+      float advance = glyph->advance * ppu;
+
+      // If a space, lets mark this as the start of the word.
+      if (glyph->page == nullptr) {
+        word_start = char_idx;
+        word_start_pos = future_x_pos + advance;
+      }
+
+      // If adding the glyph to the current line would exceed the width of the
+      // text, the line breaks at the start of the word.
+      if ((future_x_pos - line_start) + advance > wrap_width) {
+        if (word_start >= start) {
+          placements[word_start].line_break = true;
+        }
+        line_start = word_start_pos;
+      }
+
+      future_x_pos += advance;
+    }
+  }
+
+  // Move the cursor along the glyphs
+  int line = cursor.line;
+  float x_pos = cursor.x_pos;
+
+  for (int char_idx = start; char_idx < len; ++char_idx) {
+    LUIGlyphPlacement& placement = placements[char_idx];
+    placement.cursor.line = line;
+    placement.cursor.x_pos = x_pos;
+
+    // Newline
+    if (wordwrap && text[char_idx] == 10) {
+      x_pos = 0;
+      placement.x_pos = x_pos;
+      placement.line = ++line;
+      continue;
+    }
+
+    if (placement.line_break) {
+      x_pos = 0;
+      ++line;
+    }
+
+    placement.x_pos = x_pos;
+    placement.line = line;
+
+    const LUIGlyphMetrics* glyph = placement.glyph;
+    if (glyph == nullptr) {
+      continue;
+    }
+
+    if (wordwrap && x_pos + glyph->advance * ppu > wrap_width) {
+      // Glyph length longer then width, force the next glyph to the next line
+      x_pos = 0;
+      ++line;
+    } else {
+
+      // Trim left
+      if (wordwrap && x_pos == 0 && glyph->page == nullptr) {
+        continue;
+      }
+
+      // Move *cursor* by glyph length
+      x_pos += glyph->advance * ppu;
+    }
+  }
+
+  cursor.line = line;
+  cursor.x_pos = x_pos;
+  cursor.wrap_pos = future_x_pos - line_start;
+}
+
+/**
+ * @brief Returns whether the layout can be continued at a character
+ * @details This returns whether the character with the given index starts a
+ *   new word for the line breaking of wrapped text, which is the case for
+ *   spaces and newlines. The layout in front of such a character only depends
+ *   on the characters in front of it, so layout_text can continue there.
+ *
+ * @param text Text which was laid out
+ * @param index Index of the character
+ * @param placements Placements computed by layout_text
+ * @return Whether the layout can be continued at the character
+ */
+bool LUIFontMetrics::is_word_start(const wstring& text, int index,
+                                   const pvector<LUIGlyphPlacement>& placements) {
+  if (text[index] == 10) {
+    return true;
+  }
+  const LUIGlyphMetrics* glyph = placements[index].glyph;
+  return glyph != nullptr && glyph->page == nullptr;
+}
@@ -0,0 +1,112 @@
+// Filename: luiFontMetrics.h
+//
+
+#ifndef LUI_FONT_METRICS_H
+#define LUI_FONT_METRICS_H
+
+#include "pandabase.h"
+#include "pandasymbols.h"
+#include "referenceCount.h"
+#include "config_lui.h"
+#include "dynamicTextFont.h"
+#include "dynamicTextGlyph.h"
+#include "texture.h"
+#include "dcast.h"
+#include "pvector.h"
+
+// Amount of characters stored in the dense table, which covers Latin-1.
+// Metrics of all other characters are stored in a map.
+#define LUI_DENSE_GLYPH_COUNT 256
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUIGlyphMetrics
+// Description : Layout data of a single glyph, in font units. The
+//               page is the texture the glyph is stored on, or
+//               nullptr if the glyph has no image, like a space.
+////////////////////////////////////////////////////////////////////
+struct LUIGlyphMetrics {
+  float advance;
+  float left, right, top, bottom;
+  float uv_left, uv_right, uv_top, uv_bottom;
+  Texture* page;
+};
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUITextCursor
+// Description : State of LUIFontMetrics::layout_text in between two
+//               characters, which is enough to continue the layout
+//               there. The wrap position is the width of the current
+//               line as seen by the line breaking, which does not
+//               trim spaces.
+////////////////////////////////////////////////////////////////////
+struct LUITextCursor {
+  int line;
+  float x_pos;
+  float wrap_pos;
+};
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUIGlyphPlacement
+// Description : Layout of a single character, as computed by
+//               LUIFontMetrics::layout_text. The position is the
+//               cursor position in pixels in front of the glyph.
+//               Newlines and unsupported characters have no glyph.
+//               The cursor is the state of the layout in front of
+//               the character, before a line break.
+////////////////////////////////////////////////////////////////////
+struct LUIGlyphPlacement {
+  const LUIGlyphMetrics* glyph;
+  float x_pos;
+  int line;
+  bool line_break;
+  LUITextCursor cursor;
+};
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUIFontMetrics
+// Description : Glyph metrics of a font. The glyphs are fetched from
+//               the font once and then kept, so text layout can
+//               read plain structs instead of looking up and casting
+//               the glyphs for every character. Latin-1 characters
+//               are stored in a table indexed by the character code.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUIFontMetrics : public ReferenceCount {
+
+public:
+
+  LUIFontMetrics(DynamicTextFont* font);
+  ~LUIFontMetrics();
+
+  INLINE const LUIGlyphMetrics* get_glyph(int char_code);
+  INLINE DynamicTextFont* get_font() const;
+
+  void layout_text(const wstring& text, int start, float font_size,
+                   bool wordwrap, float wrap_width, LUITextCursor& cursor,
+                   pvector<LUIGlyphPlacement>& placements);
+  static bool is_word_start(const wstring& text, int index,
+                            const pvector<LUIGlyphPlacement>& placements);
+
+private:
+
+  struct LUIGlyphEntry {
+    LUIGlyphMetrics metrics;
+    bool loaded;
+    bool supported;
+  };
+
+  void load_glyph(int char_code, LUIGlyphEntry& entry);
+
+  PT(DynamicTextFont) _font;
+
+  LUIGlyphEntry _dense_glyphs[LUI_DENSE_GLYPH_COUNT];
+  pmap<int, LUIGlyphEntry> _sparse_glyphs;
+
+  // The glyphs are kept referenced, otherwise the font could release them
+  // and reuse their space on the texture pages
+  pvector<CPT(DynamicTextGlyph)> _glyphs;
+
+};
+
+#include "luiFontMetrics.I"
+
+#endif
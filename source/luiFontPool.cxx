@@ -1,6 +1,7 @@
 
 
 #include "luiFontPool.h"
+#include "py_panda.h"
 
 
 LUIFontPool* LUIFontPool::_global_ptr = nullptr;
@@ -33,8 +34,148 @@ void LUIFontPool::register_font(const string& name, PT(DynamicTextFont) font) {
     font->clear();
   }
   font->set_fg(LColor(0.99, 0.99, 0.99, 1.0));
+
+  // Metrics of a font previously registered with this name are outdated
+  _font_metrics[name] = new LUIFontMetrics(font);
 }
 
 void LUIFontPool::load_font(const string& name, const string&font_file) {
   lui_cat.error() << "Todo: LUIFontPool::load_font" << endl;
 }
+
+/**
+ * @brief Measures a text
+ * @details This computes the size and line breaks a LUIText with the given
+ *   text, font and font size would get, without creating any sprites. If a
+ *   wrap width is given, the text gets wrapped like a LUIText with word
+ *   wrapping enabled whose parent has that width.
+ *
+ * @param font_name Name of the font
+ * @param font_size Font size in pixels
+ * @param text Text to measure
+ * @param wrap_width Width to wrap the text at, or 0 to not wrap the text
+ *
+ * @return Metrics of the text
+ */
+PT(LUITextMetrics) LUIFontPool::measure(const string& font_name, float font_size,
+                                        const wstring& text, float wrap_width) {
+  nassertr(has_font(font_name), nullptr);
+  PT(LUITextMetrics) result = new LUITextMetrics();
+  measure_text(_font_metrics[font_name], font_size, text, wrap_width, result);
+  return result;
+}
+
+/**
+ * @brief Measures multiple texts
+ * @details This measures every text of the given sequence with the same font,
+ *   font size and wrap width. This is equal to calling measure() for every
+ *   text, but only crosses into C++ once, which is useful to size table
+ *   columns. See LUIFontPool::measure.
+ *
+ * @param font_name Name of the font
+ * @param font_size Font size in pixels
+ * @param texts Sequence of strings
+ * @param wrap_width Width to wrap the texts at, or 0 to not wrap the texts
+ *
+ * @return Metrics of the texts, in the same order as the texts
+ */
+PT(LUITextMetricsList) LUIFontPool::measure_batch(const string& font_name, float font_size,
+                                                  PyObject* texts, float wrap_width) {
+  nassertr(has_font(font_name), nullptr);
+  LUIFontMetrics* metrics = _font_metrics[font_name];
+
+  PyObject* sequence = PySequence_Fast(texts, "measure_batch expects a sequence of strings");
+  if (sequence == nullptr) {
+    return nullptr;
+  }
+
+  PT(LUITextMetricsList) result = new LUITextMetricsList();
+  Py_ssize_t num_texts = PySequence_Fast_GET_SIZE(sequence);
+  wstring text;
+
+  for (Py_ssize_t i = 0; i < num_texts; ++i) {
+    PyObject* item = PySequence_Fast_GET_ITEM(sequence, i);
+
+    // Get the text as wide string
+#if PY_MAJOR_VERSION >= 3
+    Py_ssize_t len;
+    wchar_t* str = PyUnicode_AsWideCharString(item, &len);
+    if (str == nullptr) {
+      Py_DECREF(sequence);
+      return nullptr;
+    }
+    text.assign(str, len);
+    PyMem_Free(str);
+#else
+    if (PyUnicode_Check(item)) {
+      Py_ssize_t len = PyUnicode_GET_SIZE(item);
+      text.resize(len);
+      if (len > 0) {
+        PyUnicode_AsWideChar((PyUnicodeObject*)item, &text[0], len);
+      }
+    } else {
+      char* str;
+      Py_ssize_t len;
+      if (PyString_AsStringAndSize(item, &str, &len) != 0) {
+        Py_DECREF(sequence);
+        return nullptr;
+      }
+      text.assign(str, str + len);
+    }
+#endif
+
+    PT(LUITextMetrics) text_metrics = new LUITextMetrics();
+    measure_text(metrics, font_size, text, wrap_width, text_metrics);
+    result->add_metrics(text_metrics);
+  }
+
+  Py_DECREF(sequence);
+  return result;
+}
+
+/**
+ * @brief Internal method to measure a text
+ * @details This lays out the text with LUIFontMetrics::layout_text, just like
+ *   LUIText::update_text, but only tracks the line breaks instead of placing
+ *   sprites.
+ *
+ * @param metrics Glyph metrics of the font
+ * @param font_size Font size in pixels
+ * @param text Text to measure
+ * @param wrap_width Width to wrap the text at, or 0 to not wrap the text
+ * @param result Metrics to store the size and line breaks in
+ */
+void LUIFontPool::measure_text(LUIFontMetrics* metrics, float font_size, const wstring& text,
+                               float wrap_width, LUITextMetrics* result) {
+  bool wordwrap = wrap_width > 0.0f;
+  int len = text.size();
+
+  float ppu = font_size;
+  float line_height = metrics->get_font()->get_line_height();
+  float line_step = floor(line_height * ppu);
+
+  LUITextCursor cursor = {0, 0.0f, 0.0f};
+  metrics->layout_text(text, 0, font_size, wordwrap, wrap_width, cursor, _placements);
+
+  // Every line starts at the first character placed on it. Newlines are
+  // placed on the line they start, which begins behind them.
+  int line = 0;
+  for (int char_idx = 0; char_idx < len; ++char_idx) {
+    int placement_line = _placements[char_idx].line;
+    for (; line < placement_line; ++line) {
+      bool is_newline = wordwrap && text[char_idx] == 10 && line + 1 == placement_line;
+      result->add_line_break(is_newline ? char_idx + 1 : char_idx);
+    }
+  }
+
+  // A glyph exceeding the last line still starts a new one
+  for (; line < cursor.line; ++line) {
+    result->add_line_break(len);
+  }
+
+  if (wordwrap) {
+    result->set_size(wrap_width, floor(cursor.line * line_step + line_height * ppu));
+  } else {
+    result->set_size(floor(cursor.x_pos), floor(line_height * ppu));
+  }
+}
@@ -14,6 +14,8 @@
 #include "textProperties.h"
 #include "dcast.h"
 #include "config_lui.h"
+#include "luiFontMetrics.h"
+#include "luiTextMetrics.h"
 
 class EXPCL_LUI LUIFontPool {
 
@@ -25,12 +27,28 @@ PUBLISHED:
   INLINE bool has_font(const string& name) const;
   INLINE DynamicTextFont* get_font(const string& name) const;
 
+  PT(LUITextMetrics) measure(const string& font_name, float font_size,
+                             const wstring& text, float wrap_width=0.0f);
+  PT(LUITextMetricsList) measure_batch(const string& font_name, float font_size,
+                                       PyObject* texts, float wrap_width=0.0f);
+
+public:
+
+  INLINE LUIFontMetrics* get_font_metrics(const string& name) const;
+
 private:
 
   LUIFontPool();
+
+  void measure_text(LUIFontMetrics* metrics, float font_size, const wstring& text,
+                    float wrap_width, LUITextMetrics* result);
   ~LUIFontPool();
 
   pmap<string, PT(DynamicTextFont)> _fonts;
+  pmap<string, PT(LUIFontMetrics)> _font_metrics;
+
+  // Layout of the last measured text, kept to reuse its memory
+  pvector<LUIGlyphPlacement> _placements;
 
   static LUIFontPool* _global_ptr;
 
@@ -6,31 +6,55 @@
 #include "linmath_events.h"
 #include "keyboardButton.h"
 #include "mouseButton.h"
+#include "datagramIterator.h"
+#include "datagramInputFile.h"
+
+// Written at the start of input recordings, the last two characters are the
+// version of the format
+#define LUI_RECORDING_HEADER "LUIrec02"
 
 TypeHandle LUIInputHandler::_type_handle;
 
 LUIInputHandler::LUIInputHandler(const string& name) :
   DataNode(name),
   _hover_element(nullptr),
-  _focused_element(nullptr)
+  _hover_valid(false),
+  _hover_root(nullptr),
+  _hover_frame_index(-1),
+  _hover_scene_generation(-1),
+  _focused_element(nullptr),
+  _mousemove_pending(false),
+  _mousemove_delivered(false),
+  _last_mousemove_time(0.0),
+  _last_mousemove_has_pos(false),
+  _mouse_delta(0),
+  _last_keyrepeat_time(0.0),
+  _last_keyrepeat_element(nullptr),
+  _recording(false),
+  _replay_position(0),
+  _replay_time_offset(0.0),
+  _replay_scene_generation(-1)
 {
   _mouse_down_elements.resize(5, nullptr);
+  _mouse_down_targets.resize(5);
   _mouse_pos_input = define_input("pixel_xy", EventStoreVec2::get_class_type());
   _buttons_input = define_input("button_events", ButtonEventList::get_class_type());
 
   for (int i = 0; i < 5; i++) {
     _current_state.mouse_buttons[i] = false;
+    _mouse_button_names[i] = wstring(L"mouse-") + std::to_wstring(static_cast<long long>(i));
   }
   _current_state.mouse_pos.set(-1, -1);
   _current_state.has_mouse_pos = false;
   _current_state.key_modifiers = 0;
 
   _last_state = _current_state;
+  _last_mousemove_pos = _current_state.mouse_pos;
 
 }
 
 LUIInputHandler::~LUIInputHandler() {
-
+  stop_recording();
 }
 
 // Inherited from DataNode
@@ -138,57 +162,79 @@ void LUIInputHandler::do_transmit_data(DataGraphTraverser* trav,
 }
 
 void LUIInputHandler::process(LUIRoot* root) {
-  LUIBaseElement* current_hover = nullptr;
-  int current_render_index = -1;
 
-  if (_current_state.has_mouse_pos) {
+  if (_recording) {
+    record_frame(root->get_frame_time());
+  }
 
-      // Iterate all event objects, and find the one with the highest z-index
-      // below the cursor
-      LUIEventObjectSet::iterator iter = root->get_event_objects_begin();
-      LUIEventObjectSet::iterator end = root->get_event_objects_end();
-      for (;iter != end; ++iter) {
-        LUIBaseElement* elem = *iter;
-        if (
-            // Visible
-            elem->get_last_frame_visible() >= root->get_frame_index() &&
-            // In front of the last element
-            elem->get_last_render_index() > current_render_index &&
-            // Under the mouse cursor
-            elem->intersects(
-              _current_state.mouse_pos.get_x(),
-              _current_state.mouse_pos.get_y()) &&
-            // Visible #2
-            elem->is_visible()) {
-          current_hover = elem;
-          current_render_index = elem->get_last_render_index();
-      }
-    }
+  // Searching the hovered element is only required if the cursor moved, or
+  // if the elements changed, which is the case when a new frame got prepared,
+  // or when an element got hidden or detached since then
+  bool hover_outdated = !_hover_valid ||
+    _hover_root != root ||
+    _hover_frame_index != root->get_frame_index() ||
+    _hover_scene_generation != root->get_scene_generation() ||
+    _hover_mouse_pos != _current_state.mouse_pos ||
+    _last_state.has_mouse_pos != _current_state.has_mouse_pos;
+
+  LUIBaseElement* current_hover = _hover_element;
+  LUIBaseElement* current_target = _hover_target;
+  if (hover_outdated) {
+    current_hover = find_hover_element(root);
+    current_target = find_hover_target(current_hover, root);
+    _hover_valid = true;
+    _hover_root = root;
+    _hover_frame_index = root->get_frame_index();
+    _hover_scene_generation = root->get_scene_generation();
+    _hover_mouse_pos = _current_state.mouse_pos;
   }
 
-  // Check for mouse over / out events
-  if (current_hover != _hover_element) {
+  // Check for mouse over / out events. When the hovered element delegates
+  // events, moving between its descendants counts as well
+  if (current_hover != _hover_element || current_target != _hover_target) {
     if (_hover_element != nullptr) {
 
-      trigger_event(_hover_element, "mouseout");
+      trigger_event(_hover_element, LUIEventData::E_mouseout, wstring(), _hover_target);
     }
 
     if (current_hover != nullptr) {
-      trigger_event(current_hover, "mouseover");
+      trigger_event(current_hover, LUIEventData::E_mouseover, wstring(), current_target);
     }
     _hover_element = current_hover;
+    _hover_target = current_target;
   }
 
-  // Check for mouse move
+  // Check for mouse move. In case the mousemove rate is limited, movements
+  // are merged until the next event can be delivered
+  double frame_time = root->get_frame_time();
   if (_current_state.mouse_pos != _last_state.mouse_pos) {
+    _mousemove_pending = true;
+  }
+
+  // The first event is never limited. Its delta is zero, just like the delta
+  // of the first event after the mouse entered the window, since there is no
+  // previous position to measure the movement from.
+  if (_mousemove_pending && (!_mousemove_delivered ||
+      rate_allows_event(root->get_mousemove_rate(), _last_mousemove_time, frame_time))) {
+    if (_last_mousemove_has_pos && _current_state.has_mouse_pos) {
+      _mouse_delta = LVector2(_current_state.mouse_pos - _last_mousemove_pos);
+    } else {
+      _mouse_delta.fill(0);
+    }
+    _last_mousemove_pos = _current_state.mouse_pos;
+    _last_mousemove_has_pos = _current_state.has_mouse_pos;
+    _last_mousemove_time = frame_time;
+    _mousemove_delivered = true;
+    _mousemove_pending = false;
+
     // Send a event to the hovered element
     if (_hover_element != nullptr) {
-      trigger_event(_hover_element, "mousemove");
+      trigger_event(_hover_element, LUIEventData::E_mousemove, wstring(), _hover_target);
     }
 
     // The focus element also recieves a mousemove element
     if (_focused_element != nullptr) {
-      trigger_event(_focused_element, "mousemove");
+      trigger_event(_focused_element, LUIEventData::E_mousemove);
     }
   }
 
@@ -200,8 +246,9 @@ void LUIInputHandler::process(LUIRoot* root) {
     if (mouse_key_pressed(mouse_button)) {
       if (_hover_element != nullptr && _hover_element->is_visible()) {
         _mouse_down_elements[mouse_button] = _hover_element;
+        _mouse_down_targets[mouse_button] = _hover_target;
 
-        trigger_event(_hover_element, "mousedown", get_mouse_button_name(mouse_button));
+        trigger_event(_hover_element, LUIEventData::E_mousedown, get_mouse_button_name(mouse_button), _hover_target);
 
         if (_focused_element != nullptr && _hover_element != _focused_element) {
           // When clicking somewhere, and the clicked element is not the focused one,
@@ -213,12 +260,19 @@ void LUIInputHandler::process(LUIRoot* root) {
 
     if (mouse_key_released(mouse_button)) {
       if (_mouse_down_elements[mouse_button] != nullptr) {
-        trigger_event(_mouse_down_elements[mouse_button], "mouseup", get_mouse_button_name(mouse_button));
+        trigger_event(_mouse_down_elements[mouse_button], LUIEventData::E_mouseup,
+                      get_mouse_button_name(mouse_button), _mouse_down_targets[mouse_button]);
       }
 
-      if (_mouse_down_elements[mouse_button] != nullptr && _mouse_down_elements[mouse_button] == _hover_element) {
-        trigger_event(_mouse_down_elements[mouse_button], "click", get_mouse_button_name(mouse_button));
+      // Only count as click if the mouse got released over the same element
+      // (and the same target) it was pressed on
+      if (_mouse_down_elements[mouse_button] != nullptr &&
+          _mouse_down_elements[mouse_button] == _hover_element &&
+          _mouse_down_targets[mouse_button] == _hover_target) {
+        trigger_event(_mouse_down_elements[mouse_button], LUIEventData::E_click,
+                      get_mouse_button_name(mouse_button), _hover_target);
       }
+      _mouse_down_targets[mouse_button] = nullptr;
     }
   }
 
@@ -234,7 +288,7 @@ void LUIInputHandler::process(LUIRoot* root) {
 
     if (_focused_element != nullptr && (lost_focus || root->get_explicit_blur())) {
       _focused_element->set_focus(false);
-      trigger_event(_focused_element, "blur");
+      trigger_event(_focused_element, LUIEventData::E_blur);
       _focused_element = nullptr;
     }
   } else {
@@ -244,18 +298,20 @@ void LUIInputHandler::process(LUIRoot* root) {
       // Tell the currently focused element its no longer focused
       if (_focused_element != nullptr) {
         _focused_element->set_focus(false);
-        trigger_event(_focused_element, "blur");
+        trigger_event(_focused_element, LUIEventData::E_blur);
         _focused_element = nullptr;
       }
 
       // Tell the new element its now focused
       requested_focus->set_focus(true);
-      trigger_event(requested_focus, "focus");
+      trigger_event(requested_focus, LUIEventData::E_focus);
 
       _focused_element = requested_focus;
     }
   }
 
+  // The root uses the focused element as starting point for the tab order
+  root->set_focused_element(_focused_element);
 
   // Reset any requested focus, since the element should be in focus now 
   if (root->get_requested_focus()) {
@@ -269,20 +325,25 @@ void LUIInputHandler::process(LUIRoot* root) {
     vector<LUIKeyEvent>::const_iterator it;
     for (it = _key_events.begin(); it != _key_events.end(); ++it) {
 
-      string btn_name((*it).btn_name);
-      wstring btn_name_w(btn_name.begin(), btn_name.end());
+      const wstring& btn_name_w = get_wide_key_name((*it).btn_name);
 
       switch ((*it).mode) {
       case M_down:
-        trigger_event(_focused_element, "keydown", btn_name_w);
+        trigger_event(_focused_element, LUIEventData::E_keydown, btn_name_w);
         break;
 
       case M_up:
-        trigger_event(_focused_element, "keyup", btn_name_w);
+        trigger_event(_focused_element, LUIEventData::E_keyup, btn_name_w);
         break;
 
       case M_repeat:
-        trigger_event(_focused_element, "keyrepeat", btn_name_w);
+        // Drop repeats exceeding the keyrepeat rate, unless the focus changed
+        if (_focused_element != _last_keyrepeat_element ||
+            rate_allows_event(root->get_keyrepeat_rate(), _last_keyrepeat_time, frame_time)) {
+          trigger_event(_focused_element, LUIEventData::E_keyrepeat, btn_name_w);
+          _last_keyrepeat_element = _focused_element;
+          _last_keyrepeat_time = frame_time;
+        }
         break;
 
       case M_press:
@@ -291,19 +352,403 @@ void LUIInputHandler::process(LUIRoot* root) {
     }
 
     for (vector<int>::iterator it = _text_events.begin(); it != _text_events.end(); ++it) {
-      trigger_event(_focused_element, "textinput", wstring(1, (unsigned short)(*it)));
+      trigger_event(_focused_element, LUIEventData::E_textinput, wstring(1, (unsigned short)(*it)));
     }
 
     // Focus tick, only on the focus element to save performance
-    trigger_event(_focused_element, "tick");
+    trigger_event(_focused_element, LUIEventData::E_tick);
+  }
+
+  if (_event_dispatcher != nullptr) {
+    dispatch_event_batch();
   }
 
   _last_state = _current_state;
 }
 
-INLINE void LUIInputHandler::trigger_event(LUIBaseElement* sender,
-    const string& name, const wstring& message) const {
-  sender->trigger_event(
-    new LUIEventData(sender, name, message, _current_state.mouse_pos, _current_state.key_modifiers));
+/**
+ * @brief Starts recording the input
+ * @details This starts writing the input of every processed frame to the given
+ *   file: the mouse position, the mouse buttons, the key modifiers as well as all
+ *   key and text events. The recording can be replayed later on with
+ *   load_recording() and replay_frame(), which makes it possible to benchmark
+ *   the UI with the same input over and over again. Any previous recording gets
+ *   stopped.
+ *
+ * @param filename File to write the recording to
+ * @return true if the file could be opened, false otherwise
+ */
+bool LUIInputHandler::start_recording(const Filename& filename) {
+  stop_recording();
+
+  if (!_record_file.open(filename)) {
+    lui_cat.error() << "Could not open " << filename << " for recording input" << endl;
+    return false;
+  }
+
+  if (!_record_file.write_header(LUI_RECORDING_HEADER)) {
+    lui_cat.error() << "Could not write to " << filename << endl;
+    _record_file.close();
+    return false;
+  }
+
+  _recording = true;
+  return true;
+}
+
+/**
+ * @brief Stops recording the input
+ * @details This stops a recording previously started with start_recording(),
+ *   and closes the file. If there is no recording, nothing happens.
+ */
+void LUIInputHandler::stop_recording() {
+  if (_recording) {
+    _record_file.close();
+    _recording = false;
+  }
+}
+
+/**
+ * @brief Internal method to write the current input to the recording
+ * @details This writes the frame time, the input state and the events of the
+ *   current frame as a single datagram. The mouse position is only stored
+ *   while the mouse is inside of the window.
+ *
+ * @param time Frame time in seconds
+ */
+void LUIInputHandler::record_frame(double time) {
+  Datagram datagram;
+  datagram.add_float64(time);
+
+  uint8_t flags = _current_state.has_mouse_pos ? 1 : 0;
+  for (int i = 0; i < 5; ++i) {
+    if (_current_state.mouse_buttons[i]) {
+      flags |= 2 << i;
+    }
+  }
+  datagram.add_uint8(flags);
+
+  if (_current_state.has_mouse_pos) {
+    datagram.add_float32(_current_state.mouse_pos.get_x());
+    datagram.add_float32(_current_state.mouse_pos.get_y());
+  }
+
+  datagram.add_uint8(_current_state.key_modifiers);
+
+  datagram.add_uint16(_key_events.size());
+  for (auto it = _key_events.begin(); it != _key_events.end(); ++it) {
+    datagram.add_string(it->btn_name);
+    datagram.add_uint8(it->mode);
+  }
+
+  datagram.add_uint16(_text_events.size());
+  for (auto it = _text_events.begin(); it != _text_events.end(); ++it) {
+    datagram.add_uint32(*it);
+  }
+
+  if (!_record_file.put_datagram(datagram)) {
+    lui_cat.error() << "Could not write input recording, stopping the recording" << endl;
+    stop_recording();
+  }
+}
+
+/**
+ * @brief Internal method to read a recorded frame
+ * @details This reads a frame written by record_frame() from the datagram.
+ *
+ * @param datagram Datagram containing the frame
+ * @param frame Frame to store the input in
+ * @return true if the frame could be read, false if the datagram is invalid
+ */
+bool LUIInputHandler::read_frame(Datagram& datagram, LUIInputFrame& frame) {
+  DatagramIterator scan(datagram);
+  frame.time = scan.get_float64();
+
+  uint8_t flags = scan.get_uint8();
+  frame.state.has_mouse_pos = (flags & 1) != 0;
+  for (int i = 0; i < 5; ++i) {
+    frame.state.mouse_buttons[i] = (flags & (2 << i)) != 0;
+  }
+
+  if (frame.state.has_mouse_pos) {
+    float x = scan.get_float32();
+    float y = scan.get_float32();
+    frame.state.mouse_pos.set(x, y);
+  } else {
+    frame.state.mouse_pos.set(0, 0);
+  }
+
+  frame.state.key_modifiers = scan.get_uint8();
+
+  size_t num_key_events = scan.get_uint16();
+  frame.key_events.resize(num_key_events);
+  for (size_t i = 0; i < num_key_events; ++i) {
+    frame.key_events[i].btn_name = scan.get_string();
+    uint8_t mode = scan.get_uint8();
+    if (mode > M_press) {
+      return false;
+    }
+    frame.key_events[i].mode = (LUIKeyEventMode)mode;
+  }
+
+  size_t num_text_events = scan.get_uint16();
+  frame.text_events.resize(num_text_events);
+  for (size_t i = 0; i < num_text_events; ++i) {
+    frame.text_events[i] = scan.get_uint32();
+  }
+
+  return scan.get_remaining_size() == 0;
+}
+
+/**
+ * @brief Loads a recording for replay
+ * @details This loads all frames of a recording written with start_recording(),
+ *   and rewinds the replay to the first frame. The frames can then be replayed
+ *   with replay_frame().
+ *
+ * @param filename File containing the recording
+ * @return true if the recording could be loaded, false otherwise
+ */
+bool LUIInputHandler::load_recording(const Filename& filename) {
+  _replay_frames.clear();
+  _replay_position = 0;
+
+  DatagramInputFile file;
+  if (!file.open(filename)) {
+    lui_cat.error() << "Could not open input recording " << filename << endl;
+    return false;
+  }
+
+  string header;
+  if (!file.read_header(header, strlen(LUI_RECORDING_HEADER)) || header != LUI_RECORDING_HEADER) {
+    lui_cat.error() << filename << " is not a supported input recording" << endl;
+    return false;
+  }
+
+  Datagram datagram;
+  while (file.get_datagram(datagram)) {
+    LUIInputFrame frame;
+    if (!read_frame(datagram, frame)) {
+      lui_cat.error() << "Invalid frame in input recording " << filename << endl;
+      _replay_frames.clear();
+      return false;
+    }
+    _replay_frames.push_back(frame);
+  }
+
+  if (file.is_error()) {
+    lui_cat.error() << "Error while reading input recording " << filename << endl;
+    _replay_frames.clear();
+    return false;
+  }
+
+  return true;
+}
+
+/**
+ * @brief Replays the next recorded frame
+ * @details This feeds the input of the next frame of the loaded recording into
+ *   the handler, and processes a whole frame of the given root, just like the
+ *   LUIRegion would do: the input gets processed, due timers get triggered, and
+ *   the render data gets prepared in case anything changed. This does not
+ *   require a window, so the root can be constructed on its own.
+ *
+ *   The recorded frame times are used for the rate limits and timers, offset
+ *   so that the first replayed frame starts at the current frame time of the
+ *   root. This way, replaying a recording always triggers the same events.
+ *
+ * @param root Root to replay the input on
+ * @return true if a frame was replayed, false if the end of the recording
+ *   was reached
+ */
+bool LUIInputHandler::replay_frame(LUIRoot* root) {
+  nassertr(root != nullptr, false);
+  if (_replay_position >= _replay_frames.size()) {
+    return false;
+  }
+
+  if (_replay_position == 0) {
+    _replay_time_offset = root->get_frame_time() - _replay_frames[0].time;
+  }
+
+  const LUIInputFrame& frame = _replay_frames[_replay_position++];
+  _current_state = frame.state;
+  _key_events = frame.key_events;
+  _text_events = frame.text_events;
+
+  root->set_frame_time(frame.time + _replay_time_offset);
+  process(root);
+  root->update_timers();
+
+  int scene_generation = root->get_scene_generation();
+  if (scene_generation != _replay_scene_generation) {
+    _replay_scene_generation = scene_generation;
+    root->prepare_render();
+  }
+  return true;
+}
+
+/**
+ * @brief Internal method to find the hovered element
+ * @details This finds the event object with the highest render index below
+ *   the cursor, which was visible in the last rendered frame.
+ *
+ * @param root Root to search the event objects of
+ * @return Hovered element, or nullptr if there is none
+ */
+LUIBaseElement* LUIInputHandler::find_hover_element(LUIRoot* root) const {
+  LUIBaseElement* current_hover = nullptr;
+  int current_render_index = -1;
+
+  if (_current_state.has_mouse_pos) {
+
+      // Iterate all event objects near the cursor, and find the one with the
+      // highest z-index below the cursor
+      const pvector<LUIBaseElement*>& candidates = root->get_event_objects_at(
+        _current_state.mouse_pos.get_x(), _current_state.mouse_pos.get_y());
+      for (auto iter = candidates.begin(); iter != candidates.end(); ++iter) {
+        LUIBaseElement* elem = *iter;
+        if (
+            // Visible
+            elem->get_last_frame_visible() >= root->get_frame_index() &&
+            // In front of the last element
+            elem->get_last_render_index() > current_render_index &&
+            // Under the mouse cursor
+            elem->intersects(
+              _current_state.mouse_pos.get_x(),
+              _current_state.mouse_pos.get_y()) &&
+            // Still visible and attached, the last frame might be outdated
+            elem->is_visible_in_tree()) {
+          current_hover = elem;
+          current_render_index = elem->get_last_render_index();
+      }
+    }
+  }
+
+  return current_hover;
+}
+
+/**
+ * @brief Internal method to find the target of the hovered element
+ * @details In case the hovered element delegates events, this returns its
+ *   descendant below the cursor.
+ *
+ * @param hover Hovered element, or nullptr
+ * @param root Root the element belongs to
+ * @return Target of the hovered element, or nullptr if the target is the
+ *   hovered element itself
+ */
+LUIBaseElement* LUIInputHandler::find_hover_target(LUIBaseElement* hover, LUIRoot* root) const {
+  if (hover == nullptr || !hover->get_delegate_events()) {
+    return nullptr;
+  }
+
+  LUIBaseElement* target = hover->find_target(
+    _current_state.mouse_pos.get_x(), _current_state.mouse_pos.get_y(),
+    root->get_frame_index());
+  return target != hover ? target : nullptr;
+}
+
+/**
+ * @brief Internal method to trigger an event
+ * @details This triggers the event with the given id on the sender, passing the
+ *   current mouse position and key modifiers. Nothing is constructed when the
+ *   sender has no handler for the event. The event data is taken from a pool,
+ *   and put back afterwards, unless the event handler kept a reference to it.
+ *
+ * @param sender Element to trigger the event on
+ * @param event_id Event id, usually one of LUIEventData::BuiltinEvent
+ * @param message Optional message of the event
+ * @param target Optional target of the event, in case the sender delegates events
+ */
+void LUIInputHandler::trigger_event(LUIBaseElement* sender, int event_id,
+                                    const wstring& message, LUIBaseElement* target) {
+  if (_event_dispatcher != nullptr) {
+    // Batched mode, just store the event and its handler
+    CallbackObject* handler = sender->get_event_handler(event_id);
+    if (handler != nullptr) {
+      if (_event_batch == nullptr) {
+        _event_batch = new LUIEventBatch();
+      }
+      _event_batch->add_event(make_event_data(sender, event_id, message, target), handler);
+    }
+    return;
+  }
+
+  if (!sender->has_event(event_id)) {
+    return;
+  }
+
+  PT(LUIEventData) data = make_event_data(sender, event_id, message, target);
+  sender->trigger_event(data);
+  LUIEventData::recycle_event_data(data);
+}
+
+/**
+ * @brief Internal method to construct event data
+ * @details This returns event data with the given attributes and the current
+ *   mouse position and key modifiers, see LUIEventData::make_event_data.
+ *
+ * @param sender Element which triggered the event
+ * @param event_id Event id
+ * @param message Message of the event
+ * @param target Target of the event, or nullptr if it equals the sender
+ * @return Event data
+ */
+PT(LUIEventData) LUIInputHandler::make_event_data(LUIBaseElement* sender, int event_id,
+                                                  const wstring& message, LUIBaseElement* target) {
+  PT(LUIEventData) data = LUIEventData::make_event_data(sender, event_id, message,
+                                                        _current_state.mouse_pos,
+                                                        _current_state.key_modifiers);
+  data->set_target(target);
+  if (event_id == LUIEventData::E_mousemove) {
+    data->set_delta(_mouse_delta);
+  }
+  return data;
+}
+
+/**
+ * @brief Internal method to pass the collected events to the dispatcher
+ * @details This calls the event dispatcher with all events which got collected
+ *   since the last call. Afterwards, the event data is recycled, unless the
+ *   dispatcher kept a reference to the batch or to single events.
+ */
+void LUIInputHandler::dispatch_event_batch() {
+  if (_event_batch == nullptr || _event_batch->get_num_events() == 0) {
+    return;
+  }
+
+  // Keep references, since the dispatcher might remove itself
+  PT(CallbackObject) dispatcher = _event_dispatcher;
+  PT(LUIEventBatch) batch = _event_batch;
+  dispatcher->do_callback(batch);
+
+  if (batch->get_ref_count() == 2) {
+    // Nobody else holds the batch, so the events and the batch can be reused
+    pvector<PT(LUIEventData)> events;
+    batch->take_events(events);
+    for (auto it = events.begin(); it != events.end(); ++it) {
+      LUIEventData::recycle_event_data(*it);
+    }
+  } else {
+    _event_batch = nullptr;
+  }
+}
+
+/**
+ * @brief Internal method to get the name of a key as wide string
+ * @details This converts the name of a key to a wide string, which gets passed
+ *   as message of key events. The converted names are cached, since key events
+ *   occur quite often.
+ *
+ * @param btn_name Name of the key
+ * @return Name of the key, as wide string
+ */
+const wstring& LUIInputHandler::get_wide_key_name(const string& btn_name) {
+  auto it = _wide_key_names.find(btn_name);
+  if (it == _wide_key_names.end()) {
+    it = _wide_key_names.insert(make_pair(btn_name, wstring(btn_name.begin(), btn_name.end()))).first;
+  }
+  return it->second;
 }
 
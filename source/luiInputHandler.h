@@ -8,8 +8,13 @@
 #include "config_lui.h"
 #include "dataNode.h"
 #include "buttonHandle.h"
+#include "filename.h"
+#include "datagram.h"
+#include "datagramOutputFile.h"
 #include "luiRoot.h"
 #include "luiBaseElement.h"
+#include "luiEventData.h"
+#include "luiEventBatch.h"
 
 class LUIBaseElement;
 
@@ -20,6 +25,21 @@ PUBLISHED:
   LUIInputHandler(const string& name = string());
   virtual ~LUIInputHandler();
 
+  INLINE void set_event_dispatcher(CallbackObject* dispatcher);
+  INLINE void clear_event_dispatcher();
+  INLINE bool has_event_dispatcher() const;
+
+  // Recording and replay
+  bool start_recording(const Filename& filename);
+  void stop_recording();
+  INLINE bool is_recording() const;
+
+  bool load_recording(const Filename& filename);
+  INLINE size_t get_num_replay_frames() const;
+  INLINE size_t get_replay_position() const;
+  INLINE void rewind_replay();
+  bool replay_frame(LUIRoot* root);
+
 public:
 
   // Inherited from DataNode
@@ -49,19 +69,71 @@ protected:
     LUIKeyEventMode mode;
   };
 
+  // All input of a single frame, used for recording and replay
+  struct LUIInputFrame {
+    double time;
+    LUIInputState state;
+    vector<LUIKeyEvent> key_events;
+    vector<int> text_events;
+  };
+
+  void record_frame(double time);
+  static bool read_frame(Datagram& datagram, LUIInputFrame& frame);
+
+  DatagramOutputFile _record_file;
+  bool _recording;
+  pvector<LUIInputFrame> _replay_frames;
+  size_t _replay_position;
+  double _replay_time_offset;
+  int _replay_scene_generation;
+
   INLINE string get_key_string(int key) const;
-  INLINE wstring get_mouse_button_name(size_t index) const;
+  INLINE const wstring& get_mouse_button_name(size_t index) const;
+  const wstring& get_wide_key_name(const string& btn_name);
 
-  void trigger_event(LUIBaseElement* sender, const string& name,
-                     const wstring& message = L"") const;
+  void trigger_event(LUIBaseElement* sender, int event_id,
+                     const wstring& message = wstring(),
+                     LUIBaseElement* target = nullptr);
+  PT(LUIEventData) make_event_data(LUIBaseElement* sender, int event_id,
+                                   const wstring& message, LUIBaseElement* target);
+  void dispatch_event_batch();
+
+  LUIBaseElement* find_hover_element(LUIRoot* root) const;
+  LUIBaseElement* find_hover_target(LUIBaseElement* hover, LUIRoot* root) const;
 
   LUIBaseElement* _hover_element;
+
+  // Descendant of the hovered element below the cursor, in case the hovered
+  // element delegates events
+  PT(LUIBaseElement) _hover_target;
+
+  // The hovered element only changes when the cursor moved, a new frame
+  // got prepared or the scene changed, so we store when it was last searched
+  bool _hover_valid;
+  LUIRoot* _hover_root;
+  int _hover_frame_index;
+  int _hover_scene_generation;
+  LVecBase2 _hover_mouse_pos;
   vector<LUIBaseElement*> _mouse_down_elements;
+  pvector<PT(LUIBaseElement)> _mouse_down_targets;
   LUIBaseElement* _focused_element;
 
   int _mouse_pos_input;
   int _buttons_input;
 
+  INLINE static bool rate_allows_event(float rate, double last_time, double time);
+
+  // State for limiting the rate of mousemove and keyrepeat events, see
+  // LUIRoot::set_mousemove_rate and LUIRoot::set_keyrepeat_rate
+  bool _mousemove_pending;
+  bool _mousemove_delivered;
+  double _last_mousemove_time;
+  LVecBase2 _last_mousemove_pos;
+  bool _last_mousemove_has_pos;
+  LVector2 _mouse_delta;
+  double _last_keyrepeat_time;
+  LUIBaseElement* _last_keyrepeat_element;
+
   INLINE bool mouse_key_pressed(int index) const;
   INLINE bool mouse_key_released(int index) const;
 
@@ -69,6 +141,15 @@ protected:
   LUIInputState _current_state;
 
   pmap<int, string> _keymap;
+
+  // Event names as passed to the event handlers, so they only get converted once
+  wstring _mouse_button_names[5];
+  pmap<string, wstring> _wide_key_names;
+
+  // When a dispatcher is set, the events of a frame are collected in the
+  // batch, and passed to the dispatcher at once
+  PT(CallbackObject) _event_dispatcher;
+  PT(LUIEventBatch) _event_batch;
   vector<LUIKeyEvent> _key_events;
   vector<int> _text_events;
 
@@ -49,10 +49,14 @@ void LUIObject::set_root(LUIRoot* root) {
   if (root != _root) {
     // Unregister from old root
     unregister_events();
+    unregister_timers();
+    unregister_tab_stop();
     _root = root;
 
     // Register to new root
     register_events();
+    register_timers();
+    register_tab_stop();
 
     for (auto it = _children.begin(); it!= _children.end(); ++it) {
       (*it)->set_root(_root);
@@ -60,6 +64,18 @@ void LUIObject::set_root(LUIRoot* root) {
   }
 }
 
+void LUIObject::on_child_z_offset_changed() {
+  if (!std::is_sorted(_children.cbegin(), _children.cend(), lui_compare_z_offset)) {
+    std::sort(_children.begin(), _children.end(), lui_compare_z_offset);
+    update_sibling_indices(0);
+
+    // The document order of the children changed
+    if (_root) {
+      _root->invalidate_tab_order();
+    }
+  }
+}
+
 void LUIObject::ls(int indent) {
   cout << string(indent, ' ')  << "[" << _debug_name << "] pos = " << get_abs_pos().get_x() << ", " << get_abs_pos().get_y() << "; size = "
        << get_width() << " x " << get_height() << "; z = " << _z_offset << endl;
@@ -69,35 +85,44 @@ void LUIObject::ls(int indent) {
   }
 }
 
-void LUIObject::render_recursive(bool is_topmost_pass, bool render_anyway) {
+void LUIObject::render_recursive(bool is_topmost_pass) {
   if (!_visible) return;
 
-  bool do_render = false;
-  bool do_render_children = false;
-  bool do_render_anyway = false;
+  nassertv(_root != nullptr);
 
-  if (!is_topmost_pass) {
-    do_render = is_topmost_pass == _topmost;
-    do_render_children = do_render;
-    do_render_anyway = false;
-  } else {
-    do_render = is_topmost_pass == _topmost || render_anyway;
-    do_render_children = true;
-    do_render_anyway = do_render_anyway || do_render;
+  // Topmost elements are rendered after all other elements, so we just
+  // remember them here and let the root render them afterwards
+  if (_topmost && !is_topmost_pass) {
+    _root->defer_topmost(this);
+    return;
   }
 
-  nassertv(_root != nullptr);
+  _last_frame_visible = _root->get_frame_index();
+  fetch_render_index();
 
-  if (do_render) {
-    _last_frame_visible = _root->get_frame_index();
-    fetch_render_index();
-  }
+  // Children outside of our clip bounds or the region are not visible, so
+  // their whole subtree can be skipped. Children are rendered sorted by
+  // their relative z-index.
+  LUIObject* region_node = _root->node();
+  LVector2 region_start = region_node->_abs_position;
+  LVector2 region_end = region_start + region_node->_effective_size;
 
-  // Render all children, sorted by their relative z-index
-  if (do_render_children) {
-    for (auto it = _children.begin(); it!= _children.end(); ++it) {
-      (*it)->render_recursive(is_topmost_pass, do_render_anyway);
-    }
+  float x1 = max(_abs_clip_bounds.get_x(), region_start.get_x());
+  float y1 = max(_abs_clip_bounds.get_y(), region_start.get_y());
+  float x2 = min(_abs_clip_bounds.get_x() + _abs_clip_bounds.get_w(), region_end.get_x());
+  float y2 = min(_abs_clip_bounds.get_y() + _abs_clip_bounds.get_h(), region_end.get_y());
+  LUIRect cull_bounds(x1, y1, x2 - x1, y2 - y1);
+
+  for (auto it = _children.begin(); it!= _children.end(); ++it) {
+    LUIBaseElement* child = *it;
+
+    // Topmost elements don't get clipped by our bounds, so neither topmost
+    // children nor subtrees containing topmost elements can be skipped
+    if (!child->_topmost && !child->_subtree_has_topmost &&
+        !child->_subtree_bounds.intersects(cull_bounds))
+      continue;
+
+    child->render_recursive(is_topmost_pass);
   }
 }
 
@@ -159,35 +184,149 @@ void LUIObject::fit_dimensions() {
 
 }
 
+/**
+ * @brief Internal method to check whether a child has to be visited
+ * @details This passes the given dirty flags down to the child, since for
+ *   example a changed position invalidates the whole subtree. Returns whether
+ *   the child (or any of its descendants) is dirty, and thus has to be visited
+ *   by the current pass. Clean subtrees are skipped.
+ *
+ * @param child Child to check
+ * @param inherited_flags Flags to pass down to the child
+ * @return true if the child has to be visited, false otherwise
+ */
+bool LUIObject::visit_child(LUIBaseElement* child, int inherited_flags) {
+  child->_dirty_flags |= inherited_flags;
+  if (child->_dirty_flags == DF_none)
+    return false;
+
+  if (_root != nullptr)
+    _root->count_layout_visit();
+  return true;
+}
+
 void LUIObject::update_dimensions_upstream() {
+  int inherited_flags = _dirty_flags & (DF_layout | DF_layout_settle);
 
   for (auto it = _children.begin(); it!= _children.end(); ++it) {
-    (*it)->update_dimensions_upstream();
+    if (visit_child(*it, inherited_flags))
+      (*it)->update_dimensions_upstream();
   }
 
-  fit_dimensions();
-  update_dimensions();
+  if (needs_layout()) {
+    fit_dimensions();
+    update_dimensions();
+  }
 }
 
 void LUIObject::update_downstream() {
   LUIBaseElement::update_downstream();
+
+  int inherited_flags = _dirty_flags & (DF_layout | DF_layout_settle | DF_color);
   for (auto it = _children.begin(); it != _children.end(); ++it) {
-    (*it)->update_downstream();
+    if (visit_child(*it, inherited_flags))
+      (*it)->update_downstream();
   }
 }
 
 void LUIObject::update_upstream() {
+  int inherited_flags = _dirty_flags & (DF_layout | DF_layout_settle);
+  bool child_visited = false;
   for (auto it = _children.begin(); it != _children.end(); ++it) {
-    (*it)->update_upstream();
+    if (visit_child(*it, inherited_flags)) {
+      (*it)->update_upstream();
+      child_visited = true;
+    }
   }
   LUIBaseElement::update_upstream();
+
+  // The bounds of our children might have changed
+  if (needs_layout() || child_visited) {
+    update_subtree_bounds();
+  }
+}
+
+/**
+ * @brief Internal method to update the subtree bounds
+ * @details This computes the rectangle enclosing the object and the subtree
+ *   bounds of all children. Hidden children are included as well, since
+ *   showing them does not trigger a layout update. This also stores whether
+ *   any descendant is topmost.
+ */
+void LUIObject::update_subtree_bounds() {
+  float x1 = _abs_position.get_x();
+  float y1 = _abs_position.get_y();
+  float x2 = x1 + _effective_size.get_x();
+  float y2 = y1 + _effective_size.get_y();
+  bool has_topmost = false;
+
+  for (auto it = _children.begin(); it != _children.end(); ++it) {
+    const LUIRect& bounds = (*it)->_subtree_bounds;
+    x1 = min(x1, bounds.get_x());
+    y1 = min(y1, bounds.get_y());
+    x2 = max(x2, bounds.get_x() + bounds.get_w());
+    y2 = max(y2, bounds.get_y() + bounds.get_h());
+    has_topmost |= (*it)->_topmost || (*it)->_subtree_has_topmost;
+  }
+
+  _subtree_bounds.set_rect(x1, y1, x2 - x1, y2 - y1);
+  _subtree_has_topmost = has_topmost;
+}
+
+/**
+ * @brief Finds the element at the given point
+ * @details This returns the front-most visible descendant containing the given
+ *   point, and falls back to the object itself. Children whose subtree bounds
+ *   don't contain the point are skipped. See LUIBaseElement::find_target.
+ *
+ * @param x absolute x-coordinate in pixels
+ * @param y absolute y-coordinate in pixels
+ * @param frame_index Frame the elements have to be visible in
+ * @return Element at the point, or nullptr
+ */
+LUIBaseElement* LUIObject::find_target(float x, float y, int frame_index) {
+  LUIBaseElement* target = nullptr;
+  for (auto it = _children.begin(); it != _children.end(); ++it) {
+    LUIBaseElement* child = *it;
+    if (!child->is_visible() || child->get_last_frame_visible() < frame_index ||
+        !child->_subtree_bounds.contains(x, y)) {
+      continue;
+    }
+
+    LUIBaseElement* candidate = child->find_target(x, y, frame_index);
+    if (candidate != nullptr && (target == nullptr ||
+        candidate->get_last_render_index() > target->get_last_render_index())) {
+      target = candidate;
+    }
+  }
+
+  if (target != nullptr) {
+    return target;
+  }
+  return LUIBaseElement::find_target(x, y, frame_index);
 }
 
 void LUIObject::update_clip_bounds() {
-  LUIBaseElement::update_clip_bounds();
+  int inherited_flags = _dirty_flags & (DF_layout | DF_layout_settle);
+  if (_dirty_flags & (DF_layout | DF_layout_settle | DF_clip)) {
+    compute_clip_bounds();
+
+    // When our clip bounds changed, so did the ones of our children
+    inherited_flags |= DF_clip;
+  }
+
+  bool child_dirty = false;
+  bool child_changed = false;
   for (auto it = _children.begin(); it != _children.end(); ++it) {
-    (*it)->update_clip_bounds();
+    if (visit_child(*it, inherited_flags)) {
+      child_changed = child_changed || ((*it)->needs_layout() && (*it)->has_layout_changed());
+      (*it)->update_clip_bounds();
+      child_dirty = child_dirty || (*it)->_dirty_flags != DF_none;
+    }
   }
+
+  // The clip pass is the last pass, so all changes are processed now
+  finish_dirty_flags(child_dirty, child_changed);
 }
 
 void LUIObject::move_by(const LVector2& offset) {
@@ -57,7 +57,7 @@ PUBLISHED:
 
 public:
 
-  INLINE void on_child_z_offset_changed();
+  void on_child_z_offset_changed();
   void update_downstream();
   void update_upstream();
   void update_clip_bounds();
@@ -66,15 +66,20 @@ public:
   void move_by(const LVector2& offset);
 
   void fit_dimensions();
+  void update_subtree_bounds();
+
+  virtual LUIBaseElement* find_target(float x, float y, int frame_index);
 
 protected:
   void update_dimensions();
   void init();
+  INLINE void update_sibling_indices(size_t first);
+  bool visit_child(LUIBaseElement* child, int inherited_flags);
 
   // Interface to LUIBaseElement
   INLINE virtual void on_detached();
   virtual void set_root(LUIRoot* root);
-  virtual void render_recursive(bool is_topmost_pass, bool render_anyway);
+  virtual void render_recursive(bool is_topmost_pass);
 
   pvector<PT(LUIBaseElement)> _children;
   PT(LUIObject) _content_node;
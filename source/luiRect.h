@@ -38,6 +38,9 @@ PUBLISHED:
 
   INLINE const LVector4& get_rect() const;
 
+  INLINE bool intersects(const LUIRect& other) const;
+  INLINE bool contains(float x, float y) const;
+
   MAKE_PROPERTY(x, get_x, set_x);
   MAKE_PROPERTY(y, get_y, set_y);
   MAKE_PROPERTY(w, get_w, set_w);
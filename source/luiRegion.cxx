@@ -5,6 +5,7 @@
 
 #include "graphicsOutput.h"
 #include "graphicsEngine.h"
+#include "clockObject.h"
 
 
 TypeHandle LUIRegion::_type_handle;
@@ -14,7 +15,9 @@ LUIRegion::
   const string& context_name) :
   DisplayRegion(window, dr_dimensions),
   _input_handler(nullptr),
-  _wireframe(false) {
+  _wireframe(false),
+  _render_state_num_textures(0),
+  _last_scene_generation(-1) {
 
   if (lui_cat.is_spam()) {
     lui_cat.spam() << "Constructing new LUIRegion .." << endl;
@@ -58,56 +61,104 @@ void LUIRegion::
       _lens->set_film_offset(_width * 0.5, _height * 0.5);
     }
 
+    _lui_root->set_frame_time(ClockObject::get_global_clock()->get_frame_time());
+
     if (_input_handler != nullptr) {
       _input_handler->process(_lui_root);
     }
 
+    _lui_root->update_timers();
+
     CullTraverser* trav = get_cull_traverser();
 
     trav->set_cull_handler(cull_handler);
     trav->set_scene(scene_setup, gsg, get_incomplete_render());
     trav->set_view_frustum(nullptr);
 
-    CPT(RenderAttrib) shaderAttrib = ShaderAttrib::make_default();
-
-    for (int i = 0; i < 8; i++) {
-      std::stringstream sstm;
-      sstm << "lui_texture_" << i;
-      if (i < _lui_root->get_num_textures()) {
-          shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader_input(
-            InternalName::make(sstm.str()), _lui_root->get_texture(i) );
-      } else {
-          shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader_input(
-            InternalName::make(sstm.str()), _empty_tex);
-      }
+    CPT(TransformState) net_transform = trav->get_world_transform();
+    CPT(TransformState) modelview_transform = trav->get_world_transform()->compose(net_transform);
+    CPT(TransformState) internal_transform = trav->get_scene()->get_cs_transform()->compose(modelview_transform);
 
+    // In case nothing changed since the last frame, the geoms still contain
+    // the correct vertices and indices, so we can skip preparing them.
+    int scene_generation = _lui_root->get_scene_generation();
+    if (scene_generation != _last_scene_generation) {
+      _last_scene_generation = scene_generation;
+      _lui_root->prepare_render();
+      _batch_states.clear();
     }
 
-    shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader(_object_shader);
+    // The texture inputs only change when new textures got allocated
+    if (_render_state_num_textures != _lui_root->get_num_textures()) {
+      _group_states.clear();
+      _batch_states.clear();
+      _render_state_num_textures = _lui_root->get_num_textures();
+    }
 
-    CPT(RenderState) state = RenderState::make(
-      // CullBinAttrib::make("unsorted", 0),
-      DepthTestAttrib::make(RenderAttrib::M_none),
-      DepthWriteAttrib::make(DepthWriteAttrib::M_off),
-      TransparencyAttrib::make(TransparencyAttrib::M_alpha),
-      shaderAttrib
-    );
+    // Each batch gets its own state, which binds the textures of the batch and
+    // makes sure the batches get drawn in the order they were generated
+    size_t num_batches = (size_t)_lui_root->get_num_batches();
+    if (_batch_states.size() != num_batches) {
+      _batch_states.clear();
+      for (size_t i = 0; i < num_batches; ++i) {
+        size_t texture_group = (size_t)_lui_root->get_batch_texture_group(i);
+        while (_group_states.size() <= texture_group) {
+          _group_states.push_back(make_render_state(_group_states.size()));
+        }
+        _batch_states.push_back(_group_states[texture_group]->set_attrib(
+          CullBinAttrib::make("fixed", (int)i)));
+      }
+    }
 
-    if (_wireframe) {
-      state = state->set_attrib(RenderModeAttrib::make(RenderModeAttrib::M_wireframe));
+    for (size_t i = 0; i < num_batches; ++i) {
+      CullableObject* object = new CullableObject(_lui_root->get_batch_geom(i),
+        _batch_states[i], internal_transform);
+      trav->get_cull_handler()->record_object(object, trav);
     }
 
-    CPT(TransformState) net_transform = trav->get_world_transform();
-    CPT(TransformState) modelview_transform = trav->get_world_transform()->compose(net_transform);
-    CPT(TransformState) internal_transform = trav->get_scene()->get_cs_transform()->compose(modelview_transform);
+    trav->end_traverse();
+}
+
+/**
+ * @brief Internal method to construct the render state
+ * @details This constructs the render state used to render the batches of the
+ *   LUIRoot which use the given texture group, including the shader and all
+ *   textures of that group.
+ *
+ * @param texture_group Texture group to bind the textures of
+ * @return Render state for the batch geoms
+ */
+CPT(RenderState) LUIRegion::make_render_state(int texture_group) {
+  CPT(RenderAttrib) shaderAttrib = ShaderAttrib::make_default();
+  int offset = texture_group * LUI_TEXTURES_PER_BATCH;
+
+  for (int i = 0; i < LUI_TEXTURES_PER_BATCH; i++) {
+    std::stringstream sstm;
+    sstm << "lui_texture_" << i;
+    if (offset + i < _lui_root->get_num_textures()) {
+        shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader_input(
+          InternalName::make(sstm.str()), _lui_root->get_texture(offset + i) );
+    } else {
+        shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader_input(
+          InternalName::make(sstm.str()), _empty_tex);
+    }
 
-    _lui_root->prepare_render();
+  }
 
-    Geom* geom = _lui_root->get_geom();
+  shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader_input(
+    InternalName::make("lui_texture_offset"), LVecBase4(offset, 0, 0, 0));
+  shaderAttrib = DCAST(ShaderAttrib, shaderAttrib)->set_shader(_object_shader);
 
-    CullableObject* object = new CullableObject(geom, state, internal_transform);
-    trav->get_cull_handler()->record_object(object, trav);
+  CPT(RenderState) state = RenderState::make(
+    DepthTestAttrib::make(RenderAttrib::M_none),
+    DepthWriteAttrib::make(DepthWriteAttrib::M_off),
+    TransparencyAttrib::make(TransparencyAttrib::M_alpha),
+    shaderAttrib
+  );
 
-    trav->end_traverse();
-}
+  if (_wireframe) {
+    state = state->set_attrib(RenderModeAttrib::make(RenderModeAttrib::M_wireframe));
+  }
 
+  return state;
+}
@@ -35,6 +35,8 @@ protected:
   virtual void do_cull(CullHandler* cull_handler, SceneSetup* scene_setup,
                        GraphicsStateGuardian* gsg, Thread* current_thread);
 
+  CPT(RenderState) make_render_state(int texture_group);
+
 PUBLISHED:
   virtual ~LUIRegion();
 
@@ -45,11 +47,20 @@ PUBLISHED:
                                    const LVecBase4& dimensions);
   INLINE LUIObject* get_root() const;
 
+  INLINE LUIRoot* get_lui_root() const;
+
   MAKE_PROPERTY(root, get_root);
+  MAKE_PROPERTY(lui_root, get_lui_root);
 
   INLINE void set_input_handler(LUIInputHandler* handler);
   INLINE LUIInputHandler* get_input_handler() const;
 
+  INLINE PT(LUIElementList) elements_at(float x, float y) const;
+  INLINE PT(LUIElementList) elements_in_rect(const LUIRect& rect) const;
+
+  INLINE bool focus_next();
+  INLINE bool focus_prev();
+
   INLINE void set_render_wireframe(bool wireframe);
   INLINE void toggle_render_wireframe();
 
@@ -64,6 +75,13 @@ private:
   PT(Shader) _object_shader;
   PT(Texture) _empty_tex;
 
+  // Results of the last frame, which are reused as long as the scene
+  // generation of the LUIRoot did not change
+  pvector<CPT(RenderState)> _group_states;
+  pvector<CPT(RenderState)> _batch_states;
+  int _render_state_num_textures;
+  int _last_scene_generation;
+
 public:
   static TypeHandle get_class_type() {
     return _type_handle;
@@ -1,19 +1,32 @@
 
 
 #include "luiRoot.h"
+#include "luiSprite.h"
+#include "luiEventData.h"
 #include "shader.h"
+#include "clockObject.h"
 
 bool LUIRoot::_use_glsl_130 = false;
+bool LUIRoot::_use_compact_vertex_format = false;
 
 
 LUIRoot::LUIRoot(float width, float height) : 
   _requested_focus(nullptr),
+  _tab_order_dirty(false),
   _explicit_blur(false),
+  _mousemove_rate(0.0f),
+  _keyrepeat_rate(0.0f),
+  _last_timer_update(-1.0),
+  _frame_time(ClockObject::get_global_clock()->get_frame_time()),
+  _chunk_switches(0),
+  _reorder_sprites(false),
   _sprites_rendered(0),
   _frame_count(0),
   _render_index(0),
-  _sprite_vertex_pointer(nullptr),
-  _index_buffer_size(1000000) {
+  _layout_visits(0),
+  _chunks_modified(0),
+  _scene_generation(0),
+  _compact_vertex_format(_use_compact_vertex_format) {
 
   if (lui_cat.is_spam()) {
     lui_cat.spam() << "Constructing new LUIRoot ..\n";
@@ -25,29 +38,28 @@ LUIRoot::LUIRoot(float width, float height) :
   // CPT(GeomVertexFormat) format = GeomVertexFormat::get_v3c4t2();
 
   PT(GeomVertexArrayFormat) array_format = new GeomVertexArrayFormat();
-  array_format->add_column(InternalName::make("vertex"), 3, Geom::NT_float32, Geom::C_point);
-  array_format->add_column(InternalName::make("color"), 4, Geom::NT_uint8, Geom::C_color);
-  array_format->add_column(InternalName::make("texcoord"), 2, Geom::NT_float32, Geom::C_texcoord);
-  array_format->add_column(InternalName::make("texindex"), 1, Geom::NT_uint16, Geom::C_other);
+
+  if (_compact_vertex_format) {
+    // Layout has to match LUICompactVertexData. The texcoords are stored in
+    // a custom column, so they don't get normalized, and get scaled in the
+    // shader instead.
+    array_format->add_column(InternalName::make("vertex"), 2, Geom::NT_int16, Geom::C_point, 0);
+    array_format->add_column(InternalName::make("color"), 4, Geom::NT_uint8, Geom::C_color, 4);
+    array_format->add_column(InternalName::make("lui_texcoord"), 2, Geom::NT_uint16, Geom::C_other, 8);
+    array_format->add_column(InternalName::make("texindex"), 1, Geom::NT_uint16, Geom::C_other, 12);
+    array_format->set_stride(sizeof(LUICompactVertexData));
+  } else {
+    array_format->add_column(InternalName::make("vertex"), 3, Geom::NT_float32, Geom::C_point);
+    array_format->add_column(InternalName::make("color"), 4, Geom::NT_uint8, Geom::C_color);
+    array_format->add_column(InternalName::make("texcoord"), 2, Geom::NT_float32, Geom::C_texcoord);
+    array_format->add_column(InternalName::make("texindex"), 1, Geom::NT_uint16, Geom::C_other);
+  }
 
 
   PT(GeomVertexFormat) unregistered_format = new GeomVertexFormat();
   unregistered_format->add_array(array_format);
 
-  CPT(GeomVertexFormat) format = GeomVertexFormat::register_format(unregistered_format);
-
-  _vertex_data = new GeomVertexData("VertexPool", format, Geom::UH_dynamic);
-  _vertex_data->reserve_num_rows(_index_buffer_size);
-
-  _triangles = new GeomTriangles(Geom::UH_dynamic);
-  _triangles->set_index_type(GeomEnums::NT_uint16);
-  _triangles->make_indexed();
-
-  _geom = new Geom(_vertex_data);
-  _geom->add_primitive(_triangles);
-  _geom->set_bounds(new OmniBoundingVolume());
-
-  _triangle_index_buffer = new LUITriangleIndex[_index_buffer_size];
+  _vertex_format = GeomVertexFormat::register_format(unregistered_format);
 }
 
 void LUIRoot::prepare_render() {
@@ -56,49 +68,432 @@ void LUIRoot::prepare_render() {
     lui_cat.spam() << "\nPreparing sprite render" << endl;
   }
 
-  PT(GeomVertexArrayDataHandle) array_data_handle = _vertex_data->modify_array(0)->modify_handle();
-  _sprite_vertex_pointer = array_data_handle->get_write_pointer();
+  // After many sprites got removed, move the remaining sprites together, so
+  // the vertex pool can shrink. When the sprites were scattered over the vertex
+  // chunks in the last frame, they get stored in render order again.
+  if (_reorder_sprites ||
+      (_free_sprite_slots.size() >= 1024 && _free_sprite_slots.size() * 2 >= _sprites.size())) {
+    compact_sprites();
+  }
 
-  _min_rendered_vertex = 999999999;
-  _max_rendered_vertex = 0;
   _render_index = 0;
   _frame_count += 1;
 
   // prepare the geom triangle
   _sprites_rendered = 0;
+  _chunk_switches = 0;
+  _render_order.clear();
+  _batches.clear();
+  _index_buffer.clear();
+
+  // Update lui elements graph, in case any element is dirty. The passes
+  // themselves skip all subtrees which contain no dirty elements.
+  _layout_visits = 0;
+  if (_root->get_dirty_flags() != LUIBaseElement::DF_none) {
+    _layout_visits = 4;
+    _root->update_downstream();
+    _root->update_dimensions_upstream();
+    // for (int i = 0; i < 20; ++i)
+      _root->update_upstream();
+    _root->update_clip_bounds();
+  }
 
-  _triangles->clear_vertices();
-  _triangles->make_indexed();
-  _triangles->set_index_type(GeomEnums::NT_uint16);
-
-  // Update lui elements graph
-  _root->update_downstream();
-  _root->update_dimensions_upstream();
-  // for (int i = 0; i < 20; ++i)
-    _root->update_upstream();
-  _root->update_clip_bounds();
 
+  // Event objects outside of the region can't be hit, so the index only has
+  // to cover the region
+  _event_index.set_bounds(_root->get_width(), _root->get_height());
 
-  // Render normal elements
-  _root->render_recursive(false, false);
+  // Render normal elements, this also collects all topmost elements
+  _topmost_elements.clear();
+  _root->render_recursive(false);
 
   // Render topmost elements
   int sprites_before = _sprites_rendered;
-  _root->render_recursive(true, false);
+  for (size_t i = 0; i < _topmost_elements.size(); ++i) {
+    _topmost_elements[i]->render_recursive(true);
+  }
+  _topmost_elements.clear();
   int sprites_topmost = _sprites_rendered - sprites_before;
 
-  if (_sprites_rendered > 0) {
-    _triangles->modify_vertices()->unclean_set_num_rows(_sprites_rendered * 2 * 3);
+  // Sprites in render order only switch chunks when a chunk is full. Switching
+  // more often means the sprites were allocated in another order, so they
+  // get reordered before the next frame.
+  _reorder_sprites = _chunk_switches > 2 * (int)_vertex_chunks.size();
 
-    memcpy(_triangles->modify_vertices()->modify_handle()->get_write_pointer(), _triangle_index_buffer, _sprites_rendered * sizeof(LUITriangleIndex) * 2);
+  // Elements which are still dirty (e.g. because their layout has to
+  // settle), or sprites which have to be reordered, have to be processed in
+  // the next frame, too
+  if (_root->get_dirty_flags() != LUIBaseElement::DF_none || _reorder_sprites) {
+    mark_scene_changed();
+  }
 
-    nassertv(_min_rendered_vertex < _max_rendered_vertex);
-    _triangles->set_minmax(_min_rendered_vertex, _max_rendered_vertex, nullptr, nullptr);
+  // All vertices are written now, so release the write handles. Chunks which
+  // were not modified keep their data, and don't have to be uploaded again.
+  _chunks_modified = 0;
+  for (size_t i = 0; i < _vertex_chunks.size(); ++i) {
+    if (_vertex_chunks[i].write_pointer != nullptr) {
+      _vertex_chunks[i].handle = nullptr;
+      _vertex_chunks[i].write_pointer = nullptr;
+      ++_chunks_modified;
+    }
+  }
+
+  // Create additional geoms in case there are more batches than before
+  while (_geoms.size() < _batches.size()) {
+    PT(GeomTriangles) triangles = new GeomTriangles(Geom::UH_dynamic);
+    triangles->set_index_type(GeomEnums::NT_uint16);
+    triangles->make_indexed();
+
+    PT(Geom) geom = new Geom(_vertex_chunks[_batches[_geoms.size()].vertex_chunk].vertex_data);
+    geom->add_primitive(triangles);
+    geom->set_bounds(new OmniBoundingVolume());
+
+    _triangles.push_back(triangles);
+    _geoms.push_back(geom);
+  }
+
+  // Copy the indices of each batch to the triangles of its geom
+  for (size_t i = 0; i < _batches.size(); ++i) {
+    const LUIRenderBatch& batch = _batches[i];
+    GeomTriangles* triangles = _triangles[i];
+
+    // Make sure the geom uses the vertex chunk of the batch
+    const GeomVertexData* vertex_data = _vertex_chunks[batch.vertex_chunk].vertex_data;
+    if (_geoms[i]->get_vertex_data() != vertex_data) {
+      _geoms[i]->set_vertex_data(vertex_data);
+    }
+
+    triangles->clear_vertices();
+    triangles->make_indexed();
+    triangles->set_index_type(GeomEnums::NT_uint16);
+
+    int num_indices = batch.num_sprites * 2 * 3;
+    triangles->modify_vertices()->unclean_set_num_rows(num_indices);
+    memcpy(triangles->modify_vertices()->modify_handle()->get_write_pointer(),
+      &_index_buffer[batch.first_sprite * 2 * 3], num_indices * sizeof(uint16_t));
+
+    nassertv(batch.min_vertex < batch.max_vertex);
+    triangles->set_minmax(batch.min_vertex, batch.max_vertex, nullptr, nullptr);
   }
 
   if (lui_cat.is_spam()) {
-    lui_cat.spam() << "Rendered " << _triangles->get_num_vertices() << " vertices (" << _sprites_rendered << " Sprites)" << endl;
+    lui_cat.spam() << "Rendered " << _sprites_rendered * 2 * 3 << " vertices (" << _sprites_rendered << " Sprites) in " << _batches.size() << " batches" << endl;
     lui_cat.spam() << sprites_topmost << " sprites rendered topmost vs " << sprites_before << " normal" << endl;
+    lui_cat.spam() << _chunks_modified << " of " << _vertex_chunks.size() << " vertex chunks modified" << endl;
+    lui_cat.spam() << "Visited " << _layout_visits << " elements during layout" << endl;
+  }
+}
+
+/**
+ * @brief Returns all elements at a point
+ * @details This returns all elements which were rendered in the last frame
+ *   and contain the given absolute point, taking their clip bounds into
+ *   account. In contrast to the hit testing of the input handler, elements
+ *   don't have to be solid. The elements are sorted in render order, so the
+ *   front-most element is the last one.
+ *
+ *   The query skips all subtrees whose bounds don't contain the point, so
+ *   it only visits the elements around the point.
+ *
+ * @param x Absolute x-coordinate in pixels
+ * @param y Absolute y-coordinate in pixels
+ * @return List of elements, back to front
+ */
+PT(LUIElementList) LUIRoot::elements_at(float x, float y) {
+  _query_elements.clear();
+  collect_elements_at(_root, x, y);
+  return make_element_list();
+}
+
+/**
+ * @brief Returns all elements overlapping a rect
+ * @details This returns all elements which were rendered in the last frame
+ *   and overlap the given absolute rect, taking their clip bounds into
+ *   account. The elements are sorted in render order. See
+ *   LUIRoot::elements_at.
+ *
+ * @param rect Absolute rect in pixels
+ * @return List of elements, back to front
+ */
+PT(LUIElementList) LUIRoot::elements_in_rect(const LUIRect& rect) {
+  _query_elements.clear();
+  collect_elements_in_rect(_root, rect);
+  return make_element_list();
+}
+
+/**
+ * @brief Internal method to find the elements at a point
+ * @details This recursively adds all children of the object which were
+ *   rendered in the last frame and contain the point to the queried elements.
+ *   Children which were not rendered, or whose subtree bounds don't contain
+ *   the point, are skipped including their subtree.
+ *
+ * @param parent Object to search the children of
+ * @param x Absolute x-coordinate in pixels
+ * @param y Absolute y-coordinate in pixels
+ */
+void LUIRoot::collect_elements_at(LUIObject* parent, float x, float y) {
+  for (auto it = parent->_children.begin(); it != parent->_children.end(); ++it) {
+    LUIBaseElement* child = *it;
+    if (child->get_last_frame_visible() != _frame_count ||
+        !child->_subtree_bounds.contains(x, y)) {
+      continue;
+    }
+
+    if (child->intersects(x, y)) {
+      _query_elements.push_back(child);
+    }
+    if (child->is_of_type(LUIObject::get_class_type())) {
+      collect_elements_at(DCAST(LUIObject, child), x, y);
+    }
+  }
+}
+
+/**
+ * @brief Internal method to find the elements overlapping a rect
+ * @details This works like LUIRoot::collect_elements_at, but checks for
+ *   overlap with the given rect instead.
+ *
+ * @param parent Object to search the children of
+ * @param rect Absolute rect in pixels
+ */
+void LUIRoot::collect_elements_in_rect(LUIObject* parent, const LUIRect& rect) {
+  for (auto it = parent->_children.begin(); it != parent->_children.end(); ++it) {
+    LUIBaseElement* child = *it;
+    if (child->get_last_frame_visible() != _frame_count ||
+        !child->_subtree_bounds.intersects(rect)) {
+      continue;
+    }
+
+    if (child->get_hit_rect().intersects(rect)) {
+      _query_elements.push_back(child);
+    }
+    if (child->is_of_type(LUIObject::get_class_type())) {
+      collect_elements_in_rect(DCAST(LUIObject, child), rect);
+    }
+  }
+}
+
+/**
+ * @brief Internal method to return the queried elements
+ * @details This sorts the elements collected by a query in render order, and
+ *   returns them as list.
+ *
+ * @return List of elements, back to front
+ */
+PT(LUIElementList) LUIRoot::make_element_list() {
+  sort_by_render_index(_query_elements);
+  PT(LUIElementList) result = new LUIElementList();
+  for (auto it = _query_elements.begin(); it != _query_elements.end(); ++it) {
+    result->add_element(*it);
+  }
+  return result;
+}
+
+/**
+ * @brief Internal method to sort elements in render order
+ * @details This sorts the elements by the render index they had in the last
+ *   frame, so the front-most element is the last one.
+ *
+ * @param elements Elements to sort
+ */
+void LUIRoot::sort_by_render_index(pvector<LUIBaseElement*>& elements) const {
+  std::sort(elements.begin(), elements.end(), [](LUIBaseElement* a, LUIBaseElement* b) {
+    return a->get_last_render_index() < b->get_last_render_index();
+  });
+}
+
+/**
+ * @brief Internal method to schedule a timer
+ * @details This schedules the given event of the element to get triggered
+ *   after interval seconds, and every interval seconds afterwards in case the
+ *   timer repeats. This gets called by the element, see
+ *   LUIBaseElement::set_interval.
+ *
+ * @param elem Element to trigger the event on
+ * @param event_id Id of the event
+ * @param interval Interval or delay in seconds
+ * @param repeat Whether the timer repeats
+ */
+void LUIRoot::add_timer(LUIBaseElement* elem, int event_id, float interval, bool repeat) {
+  LUITimer timer;
+  timer.due_time = _frame_time + interval;
+  timer.element = elem;
+  timer.event_id = event_id;
+  timer.interval = interval;
+  timer.repeat = repeat;
+  _timers.push_back(timer);
+  push_heap(_timers.begin(), _timers.end(), LUITimerCompare());
+}
+
+/**
+ * @brief Internal method to remove timers
+ * @details This removes the timer of the given event of the element, or all
+ *   timers of the element if the event id is -1. This gets called when timers
+ *   get stopped, or the element gets detached.
+ *
+ * @param elem Element to remove the timers for
+ * @param event_id Id of the event, or -1 to remove all timers of the element
+ */
+void LUIRoot::remove_timers(LUIBaseElement* elem, int event_id) {
+  auto matches = [elem, event_id](const LUITimer& timer) {
+    return timer.element == elem && (event_id < 0 || timer.event_id == event_id);
+  };
+
+  _timers.erase(remove_if(_timers.begin(), _timers.end(), matches), _timers.end());
+  make_heap(_timers.begin(), _timers.end(), LUITimerCompare());
+
+  // Timers which are currently getting triggered should not fire anymore
+  for (auto it = _due_timers.begin(); it != _due_timers.end(); ++it) {
+    if (matches(*it)) {
+      it->element = nullptr;
+    }
+  }
+}
+
+/**
+ * @brief Triggers all due timers
+ * @details This triggers the events of all timers which are due at the
+ *   current frame time, and reschedules repeating timers. Timers which are not
+ *   due are not touched at all. This gets called once per frame by the
+ *   LUIRegion, see set_frame_time().
+ */
+void LUIRoot::update_timers() {
+  double time = _frame_time;
+  if (time == _last_timer_update) {
+    return;
+  }
+  _last_timer_update = time;
+
+  // Collect all due timers first, since the event handlers might add or
+  // remove timers
+  _due_timers.clear();
+  while (!_timers.empty() && _timers.front().due_time <= time) {
+    pop_heap(_timers.begin(), _timers.end(), LUITimerCompare());
+    _due_timers.push_back(_timers.back());
+    _timers.pop_back();
+  }
+
+  // Reschedule repeating timers. In case the frame took longer than the
+  // interval, missed events are skipped instead of being triggered at once.
+  for (auto it = _due_timers.begin(); it != _due_timers.end(); ++it) {
+    if (it->repeat) {
+      LUITimer timer = *it;
+      timer.due_time += timer.interval;
+      if (timer.due_time <= time && timer.interval > 0.0f) {
+        timer.due_time = time + timer.interval;
+      }
+      _timers.push_back(timer);
+      push_heap(_timers.begin(), _timers.end(), LUITimerCompare());
+    }
+  }
+
+  for (size_t i = 0; i < _due_timers.size(); ++i) {
+    // Copy the timer, since the handlers can cause the vector to reallocate
+    LUITimer timer = _due_timers[i];
+    if (timer.element == nullptr) {
+      continue;
+    }
+
+    PT(LUIBaseElement) elem = timer.element;
+    if (elem->has_event(timer.event_id)) {
+      PT(LUIEventData) data = LUIEventData::make_event_data(elem, timer.event_id, wstring());
+      elem->trigger_event(data);
+      LUIEventData::recycle_event_data(data);
+    }
+  }
+
+  // Expired timeouts are removed from their element afterwards, so that
+  // detaching the element while handling the events still clears them from
+  // the due timers. Timeouts which got restarted by a handler were cleared
+  // from the due timers already.
+  for (auto it = _due_timers.begin(); it != _due_timers.end(); ++it) {
+    if (!it->repeat && it->element != nullptr) {
+      it->element->_timers.erase(it->event_id);
+    }
+  }
+
+  _due_timers.clear();
+}
+
+/**
+ * @brief Internal method to compact the sprite slots
+ * @details This moves all sprites to the front of the vertex pool, and shrinks
+ *   the vertex pool to the amount of sprites. The sprites rendered in the last
+ *   frame are stored in render order, followed by all other sprites in their
+ *   previous order, so consecutively rendered sprites share their vertex chunk.
+ *   Moved sprites get their new index assigned, and rewrite their vertices on
+ *   the next render.
+ */
+void LUIRoot::compact_sprites() {
+  if (lui_cat.is_debug()) {
+    lui_cat.debug() << "Compacting " << _sprites.size() << " sprite slots, "
+                    << _free_sprite_slots.size() << " are unused" << endl;
+  }
+
+  LUISpriteVector sprites;
+  sprites.reserve(_sprites.size() - _free_sprite_slots.size());
+
+  // Slots may have been reused since the last frame, which only affects the
+  // order of the sprites. Taken sprites are cleared, so every sprite is only
+  // stored once.
+  for (size_t i = 0; i < _render_order.size(); ++i) {
+    int slot = _render_order[i];
+    if (slot < (int)_sprites.size() && _sprites[slot] != nullptr) {
+      sprites.push_back(_sprites[slot]);
+      _sprites[slot] = nullptr;
+    }
+  }
+
+  for (size_t i = 0; i < _sprites.size(); ++i) {
+    if (_sprites[i] != nullptr) {
+      sprites.push_back(_sprites[i]);
+    }
+  }
+
+  for (size_t i = 0; i < sprites.size(); ++i) {
+    LUISprite* sprite = sprites[i];
+    if (sprite->_sprite_index != (int)i) {
+      sprite->_sprite_index = i;
+      sprite->invalidate_vertices();
+    }
+  }
+
+  _sprites.swap(sprites);
+  _free_sprite_slots.clear();
+  _render_order.clear();
+  _reorder_sprites = false;
+  resize_vertex_chunks(_sprites.size());
+  mark_scene_changed();
+}
+
+/**
+ * @brief Internal method to resize the vertex chunks
+ * @details This makes sure there are exactly as many vertex chunks as required
+ *   to store the given amount of sprites. Each chunk always stores
+ *   LUI_SPRITES_PER_CHUNK sprites, so adding sprites to a chunk does not
+ *   require resizing its vertex data.
+ *
+ * @param num_sprites Amount of sprites to store
+ */
+void LUIRoot::resize_vertex_chunks(size_t num_sprites) {
+  size_t num_chunks = (num_sprites + LUI_SPRITES_PER_CHUNK - 1) / LUI_SPRITES_PER_CHUNK;
+
+  while (_vertex_chunks.size() < num_chunks) {
+    if (lui_cat.is_debug()) {
+      lui_cat.debug() << "Allocating vertex chunk " << _vertex_chunks.size() << endl;
+    }
+
+    LUIVertexChunkData chunk;
+    chunk.vertex_data = new GeomVertexData("VertexPool", _vertex_format, Geom::UH_dynamic);
+    chunk.vertex_data->set_num_rows(LUI_SPRITES_PER_CHUNK * 4);
+    chunk.handle = nullptr;
+    chunk.write_pointer = nullptr;
+    _vertex_chunks.push_back(chunk);
+  }
+
+  if (_vertex_chunks.size() > num_chunks) {
+    _vertex_chunks.resize(num_chunks);
   }
 }
 
@@ -115,6 +510,13 @@ LUIRoot::~LUIRoot() {
 
 
 PT(Shader) LUIRoot::create_object_shader() {
+
+  // The compact vertex format stores 2D positions (x and z), and texcoords
+  // which are not normalized yet
+  string texcoord_input = _compact_vertex_format ? "lui_texcoord" : "p3d_MultiTexCoord0";
+  string texcoord = _compact_vertex_format ? "lui_texcoord / 65535.0" : "p3d_MultiTexCoord0";
+  string position = _compact_vertex_format ? "vec4(p3d_Vertex.x, 0.0, p3d_Vertex.y, 1.0)" : "p3d_Vertex";
+
   if (_use_glsl_130) {
     return Shader::make(Shader::SL_GLSL,
       // Vertex
@@ -123,15 +525,15 @@ PT(Shader) LUIRoot::create_object_shader() {
       "in vec4 p3d_Vertex;\n"
       "in uint texindex;\n"
       "in vec4 color;\n"
-      "in vec2 p3d_MultiTexCoord0;\n"
+      "in vec2 " + texcoord_input + ";\n"
       "out vec2 texcoord;\n"
       "flat out uint vtx_texindex;\n"
       "out vec4 color_scale;\n"
       "void main() {\n"
-      "  texcoord = p3d_MultiTexCoord0;\n"
+      "  texcoord = " + texcoord + ";\n"
       "  color_scale = color;\n"
       "  vtx_texindex = texindex;\n"
-      "  gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;\n"
+      "  gl_Position = p3d_ModelViewProjectionMatrix * " + position + ";\n"
       "}\n"
       ,
       // Fragment
@@ -147,10 +549,11 @@ PT(Shader) LUIRoot::create_object_shader() {
       "uniform sampler2D lui_texture_5;\n"
       "uniform sampler2D lui_texture_6;\n"
       "uniform sampler2D lui_texture_7;\n"
+      "uniform float lui_texture_offset;\n"
       "out vec4 color;\n"
       "void main() {\n"
       "  vec4 texcolor = vec4(0,0,0,1);\n"
-      "  switch(vtx_texindex) {\n"
+      "  switch(vtx_texindex - uint(lui_texture_offset)) {\n"
       "    case 0u: texcolor = texture(lui_texture_0, texcoord); break;\n"
       "    case 1u: texcolor = texture(lui_texture_1, texcoord); break;\n"
       "    case 2u: texcolor = texture(lui_texture_2, texcoord); break;\n"
@@ -171,15 +574,15 @@ PT(Shader) LUIRoot::create_object_shader() {
       "attribute vec4 p3d_Vertex;\n"
       "attribute float texindex;\n"
       "attribute vec4 color;\n"
-      "attribute vec2 p3d_MultiTexCoord0;\n"
+      "attribute vec2 " + texcoord_input + ";\n"
       "varying vec2 texcoord;\n"
       "varying float vtx_texindex;\n"
       "varying vec4 color_scale;\n"
       "void main() {\n"
-      "  texcoord = p3d_MultiTexCoord0;\n"
+      "  texcoord = " + texcoord + ";\n"
       "  color_scale = color;\n"
       "  vtx_texindex = texindex;\n"
-      "  gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;\n"
+      "  gl_Position = p3d_ModelViewProjectionMatrix * " + position + ";\n"
       "}\n"
       ,
       // Fragment
@@ -196,21 +599,168 @@ PT(Shader) LUIRoot::create_object_shader() {
       "uniform sampler2D lui_texture_5;\n"
       "uniform sampler2D lui_texture_6;\n"
       "uniform sampler2D lui_texture_7;\n"
+      "uniform float lui_texture_offset;\n"
       "void main() {\n"
       "  vec4 texcolor = vec4(0.1, 0.0, 0.0, 1.0);\n"
+      "  float local_texindex = vtx_texindex - lui_texture_offset;\n"
 
       // We can't even properly use defines with the GLES compiler .. that sucks
-      "  if (vtx_texindex > -0.5 && vtx_texindex < 0.5) texcolor = texture2D(lui_texture_0, texcoord); \n"
-      "  if (vtx_texindex >  0.5 && vtx_texindex < 1.5) texcolor = texture2D(lui_texture_1, texcoord); \n"
-      "  if (vtx_texindex >  1.5 && vtx_texindex < 2.5) texcolor = texture2D(lui_texture_2, texcoord); \n"
-      "  if (vtx_texindex >  2.5 && vtx_texindex < 3.5) texcolor = texture2D(lui_texture_3, texcoord); \n"
-      "  if (vtx_texindex >  3.5 && vtx_texindex < 4.5) texcolor = texture2D(lui_texture_4, texcoord); \n"
-      "  if (vtx_texindex >  4.5 && vtx_texindex < 5.5) texcolor = texture2D(lui_texture_5, texcoord); \n"
-      "  if (vtx_texindex >  5.5 && vtx_texindex < 6.5) texcolor = texture2D(lui_texture_6, texcoord); \n"
-      "  if (vtx_texindex >  6.5 && vtx_texindex < 7.5) texcolor = texture2D(lui_texture_7, texcoord); \n"
+      "  if (local_texindex > -0.5 && local_texindex < 0.5) texcolor = texture2D(lui_texture_0, texcoord); \n"
+      "  if (local_texindex >  0.5 && local_texindex < 1.5) texcolor = texture2D(lui_texture_1, texcoord); \n"
+      "  if (local_texindex >  1.5 && local_texindex < 2.5) texcolor = texture2D(lui_texture_2, texcoord); \n"
+      "  if (local_texindex >  2.5 && local_texindex < 3.5) texcolor = texture2D(lui_texture_3, texcoord); \n"
+      "  if (local_texindex >  3.5 && local_texindex < 4.5) texcolor = texture2D(lui_texture_4, texcoord); \n"
+      "  if (local_texindex >  4.5 && local_texindex < 5.5) texcolor = texture2D(lui_texture_5, texcoord); \n"
+      "  if (local_texindex >  5.5 && local_texindex < 6.5) texcolor = texture2D(lui_texture_6, texcoord); \n"
+      "  if (local_texindex >  6.5 && local_texindex < 7.5) texcolor = texture2D(lui_texture_7, texcoord); \n"
 
       "  gl_FragColor = vec4(texcolor * color_scale);\n"
       "}\n"
       );
   }
 }
+
+/**
+ * @brief Internal method to add an element to the tab order
+ * @details This adds the element to the tab order, based on its tab index
+ *   and position in the tree. This gets called by the element, see
+ *   LUIBaseElement::set_tab_index.
+ *
+ * @param elem Element to add
+ */
+void LUIRoot::register_tab_stop(LUIBaseElement* elem) {
+  update_tab_order();
+  _tab_order.insert(elem);
+}
+
+/**
+ * @brief Internal method to remove an element from the tab order
+ * @details This removes the element from the tab order. This gets called by
+ *   the element when it got detached, or its tab index changed.
+ *
+ * @param elem Element to remove
+ */
+void LUIRoot::unregister_tab_stop(LUIBaseElement* elem) {
+  update_tab_order();
+  _tab_order.erase(elem);
+}
+
+/**
+ * @brief Internal method to rebuild the tab order
+ * @details This re-sorts all elements of the tab order in case the document
+ *   order changed since the last time, see LUIRoot::invalidate_tab_order.
+ */
+void LUIRoot::update_tab_order() {
+  if (!_tab_order_dirty)
+    return;
+
+  _tab_order_dirty = false;
+  pvector<LUIBaseElement*> elements(_tab_order.begin(), _tab_order.end());
+  _tab_order.clear();
+  _tab_order.insert(elements.begin(), elements.end());
+}
+
+/**
+ * @brief Internal method to move the focus along the tab order
+ * @details This requests focus for the element following or preceding the
+ *   current focused element in the tab order. If a focus request is pending,
+ *   the requested element is used as the current element instead, so moving
+ *   the focus multiple times in one frame works as expected. The tab order
+ *   wraps around at both ends. Elements which are hidden, or have a hidden
+ *   parent, are skipped.
+ *
+ * @param forward Whether to move to the next or to the previous element
+ * @return true if an element got focused, false if the tab order contains no
+ *   visible element
+ */
+bool LUIRoot::focus_tab_stop(bool forward) {
+  update_tab_order();
+  if (_tab_order.empty())
+    return false;
+
+  LUIBaseElement* current = _requested_focus;
+  if (current == nullptr) {
+    current = _focused_element.p();
+  }
+
+  // Elements which got detached can't be located in the tree anymore
+  if (current != nullptr && (current->_root != this || current->_parent == nullptr)) {
+    current = nullptr;
+  }
+
+  LUITabOrderSet::iterator it;
+  if (current == nullptr) {
+    it = forward ? _tab_order.begin() : --_tab_order.end();
+  } else if (forward) {
+    it = _tab_order.upper_bound(current);
+    if (it == _tab_order.end())
+      it = _tab_order.begin();
+  } else {
+    it = _tab_order.lower_bound(current);
+    if (it == _tab_order.begin())
+      it = _tab_order.end();
+    --it;
+  }
+
+  // Skip hidden elements, but visit each element at most once, so this
+  // terminates even if all elements are hidden
+  for (size_t i = 0; i < _tab_order.size(); ++i) {
+    LUIBaseElement* elem = *it;
+    if (elem == current)
+      return true;
+
+    if (elem->is_visible_in_tree()) {
+      // Replace any pending request, the previously requested element did not
+      // get the focus yet.
+      if (_requested_focus != nullptr && _requested_focus != _focused_element.p()) {
+        _requested_focus->set_focus(false);
+      }
+
+      set_requested_focus(elem);
+      elem->set_focus(true);
+      return true;
+    }
+
+    if (forward) {
+      ++it;
+      if (it == _tab_order.end())
+        it = _tab_order.begin();
+    } else {
+      if (it == _tab_order.begin())
+        it = _tab_order.end();
+      --it;
+    }
+  }
+
+  return false;
+}
+
+/**
+ * @brief Focuses the next element in the tab order
+ * @details This requests focus for the element following the currently focused
+ *   element in the tab order, see LUIBaseElement::set_tab_index. If no element
+ *   is focused, or the last element of the tab order is focused, the first
+ *   element gets focused. Hidden elements are skipped. Like
+ *   LUIBaseElement::request_focus, the focus and blur events get triggered
+ *   with the next processed input.
+ *
+ * @return true if an element got focused, false if no visible element has a
+ *   tab index
+ */
+bool LUIRoot::focus_next() {
+  return focus_tab_stop(true);
+}
+
+/**
+ * @brief Focuses the previous element in the tab order
+ * @details This requests focus for the element preceding the currently focused
+ *   element in the tab order. If no element is focused, or the first element
+ *   of the tab order is focused, the last element gets focused.
+ *   See LUIRoot::focus_next for further information.
+ *
+ * @return true if an element got focused, false if no visible element has a
+ *   tab index
+ */
+bool LUIRoot::focus_prev() {
+  return focus_tab_stop(false);
+}
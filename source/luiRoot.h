@@ -12,8 +12,10 @@
 #include "config_lui.h"
 #include "luiBaseElement.h"
 #include "luiObject.h"
-#include "luiVertexPool.h"
+#include "luiVertexData.h"
 #include "luiAtlas.h"
+#include "luiSpatialIndex.h"
+#include "luiElementList.h"
 
 #include "geomVertexFormat.h"
 #include "geomVertexData.h"
@@ -23,6 +25,13 @@
 #include "omniBoundingVolume.h"
 #include "geom.h"
 
+// Amount of textures which can be bound to a single batch. Sprites using
+// textures beyond this limit are rendered in additional batches.
+#define LUI_TEXTURES_PER_BATCH 8
+
+// Amount of sprites stored per vertex chunk. Each chunk is uploaded on its
+// own, so only chunks containing changed sprites have to be uploaded.
+#define LUI_SPRITES_PER_CHUNK 1024
 
 class LUIObject;
 class LUIBaseElement;
@@ -43,6 +52,39 @@ PUBLISHED:
   INLINE PT(LUIObject) node();
 
   static INLINE void set_use_glsl_130(bool use_glsl_130);
+  static INLINE void set_use_compact_vertex_format(bool use_compact_format);
+
+  INLINE int get_num_layout_visits() const;
+  INLINE int get_num_modified_vertex_chunks() const;
+  INLINE int get_scene_generation() const;
+
+  INLINE void set_mousemove_rate(float rate);
+  INLINE float get_mousemove_rate() const;
+  INLINE void set_keyrepeat_rate(float rate);
+  INLINE float get_keyrepeat_rate() const;
+
+  PT(LUIElementList) elements_at(float x, float y);
+  PT(LUIElementList) elements_in_rect(const LUIRect& rect);
+
+  bool focus_next();
+  bool focus_prev();
+  INLINE int get_num_tab_stops() const;
+
+  INLINE int get_num_batches() const;
+  INLINE Geom* get_batch_geom(int n) const;
+  MAKE_SEQ(get_batch_geoms, get_num_batches, get_batch_geom);
+  INLINE int get_num_vertex_chunks() const;
+  INLINE int get_num_sprite_slots() const;
+
+  MAKE_PROPERTY(num_layout_visits, get_num_layout_visits);
+  MAKE_PROPERTY(num_modified_vertex_chunks, get_num_modified_vertex_chunks);
+  MAKE_PROPERTY(scene_generation, get_scene_generation);
+  MAKE_PROPERTY(mousemove_rate, get_mousemove_rate, set_mousemove_rate);
+  MAKE_PROPERTY(keyrepeat_rate, get_keyrepeat_rate, set_keyrepeat_rate);
+  MAKE_PROPERTY(num_tab_stops, get_num_tab_stops);
+  MAKE_PROPERTY(num_batches, get_num_batches);
+  MAKE_PROPERTY(num_vertex_chunks, get_num_vertex_chunks);
+  MAKE_PROPERTY(num_sprite_slots, get_num_sprite_slots);
 
 public:
 
@@ -50,11 +92,27 @@ public:
 
   INLINE void register_event_object(LUIBaseElement* event_object);
   INLINE void unregister_event_object(LUIBaseElement* event_object);
+  INLINE void update_event_object(LUIBaseElement* event_object);
+  INLINE const pvector<LUIBaseElement*>& get_event_objects_at(float x, float y) const;
+
+  void add_timer(LUIBaseElement* elem, int event_id, float interval, bool repeat);
+  void remove_timers(LUIBaseElement* elem, int event_id = -1);
+  void update_timers();
+
+  INLINE void set_frame_time(double time);
+  INLINE double get_frame_time() const;
 
   INLINE bool request_focus(LUIBaseElement* elem);
   INLINE LUIBaseElement* get_requested_focus() const;
   INLINE void set_requested_focus(LUIBaseElement* elem);
 
+  INLINE void set_focused_element(LUIBaseElement* elem);
+  INLINE LUIBaseElement* get_focused_element() const;
+
+  void register_tab_stop(LUIBaseElement* elem);
+  void unregister_tab_stop(LUIBaseElement* elem);
+  INLINE void invalidate_tab_order();
+
   INLINE void request_explicit_blur();
   INLINE void clear_explicit_blur();
   INLINE bool get_explicit_blur() const;
@@ -65,12 +123,16 @@ public:
   INLINE int register_sprite(LUISprite* sprite);
   INLINE void unregister_sprite(int position);
 
-  INLINE void* get_sprite_vertex_pointer(int position) const;
-  INLINE void add_sprite_to_render_list(int position);
+  INLINE void* get_sprite_vertex_pointer(int position);
+  INLINE bool has_compact_vertex_format() const;
+  INLINE void add_sprite_to_render_list(int position, int texture_index);
 
   INLINE int allocate_render_index();
+  INLINE void defer_topmost(LUIBaseElement* elem);
+  INLINE void count_layout_visit();
+  INLINE void mark_scene_changed();
 
-  INLINE Geom* get_geom() const;
+  INLINE int get_batch_texture_group(int n) const;
 
   void prepare_render();
   INLINE int get_frame_index() const;
@@ -82,31 +144,79 @@ public:
 private:
 
   static bool _use_glsl_130;
+  static bool _use_compact_vertex_format;
+
+  // Whether this root uses the compact vertex format, this can't change
+  // after construction
+  bool _compact_vertex_format;
+
+  CPT(GeomVertexFormat) _vertex_format;
 
-  PT(GeomVertexData) _vertex_data;
-  PT(GeomTriangles) _triangles;
-  PT(Geom) _geom;
+  // The vertices of all sprites are stored in chunks of LUI_SPRITES_PER_CHUNK
+  // sprites. A write handle is only requested for chunks which actually get
+  // modified, so unchanged chunks don't have to be uploaded again.
+  struct LUIVertexChunkData {
+    PT(GeomVertexData) vertex_data;
+    PT(GeomVertexArrayDataHandle) handle;
+    void* write_pointer;
+  };
+
+  pvector<LUIVertexChunkData> _vertex_chunks;
+
+  void resize_vertex_chunks(size_t num_sprites);
+
+  // Geoms are kept between frames, there is one geom per batch
+  pvector<PT(GeomTriangles)> _triangles;
+  pvector<PT(Geom)> _geoms;
 
   LUISpriteVector _sprites;
   LUITextureVector _textures;
 
+  // Indices of all unused slots in _sprites
+  pvector<int> _free_sprite_slots;
+
+  // Slots of the sprites rendered in the last frame, in render order. When
+  // consecutively rendered sprites often switch between vertex chunks, the
+  // sprites get compacted in this order, so each chunk stores a range of
+  // consecutively rendered sprites.
+  pvector<int> _render_order;
+  int _chunk_switches;
+  bool _reorder_sprites;
+
+  void compact_sprites();
+
   int _sprites_rendered;
   int _frame_count;
   int _render_index;
-
-  struct LUITriangleIndex {
-    uint16_t vertices[3];
+  int _layout_visits;
+  int _chunks_modified;
+  int _scene_generation;
+
+  // A batch is a range of consecutively rendered sprites which all use
+  // textures of the same texture group, and are stored in the same vertex
+  // chunk. Since the sprites are kept in render order, only the texture
+  // groups and the capacity of the chunks split batches. The texture group n contains the textures n * LUI_TEXTURES_PER_BATCH
+  // up to (n + 1) * LUI_TEXTURES_PER_BATCH - 1.
+  struct LUIRenderBatch {
+    int texture_group;
+    int vertex_chunk;
+    int first_sprite;
+    int num_sprites;
+    int min_vertex;
+    int max_vertex;
   };
 
-  void* _sprite_vertex_pointer;
-
-  int _min_rendered_vertex;
-  int _max_rendered_vertex;
+  pvector<LUIRenderBatch> _batches;
 
-  LUITriangleIndex* _triangle_index_buffer;
-  int _index_buffer_size;
+  // Triangle indices of all rendered sprites, relative to the vertex chunk
+  // of each sprite. Since a chunk contains less than 65536 vertices, 16 bit
+  // indices are sufficient. The buffer grows on demand and keeps its capacity
+  // between frames.
+  pvector<uint16_t> _index_buffer;
 
-  vector<int> _topmost_sprites;
+  // Topmost elements found while rendering, which get rendered after all
+  // other elements
+  pvector<LUIBaseElement*> _topmost_elements;
 
   // We store a private root node.
   // With this, we don't have to inherit from LUIObject, but
@@ -118,12 +228,71 @@ private:
   // LUIBaseElement unregisters before destruction.
   LUIEventObjectSet _event_objects;
 
+  // Event objects by their absolute rect, used for hit testing
+  LUISpatialIndex _event_index;
+
+  // Queries of elements_at and elements_in_rect walk the tree, skipping all
+  // subtrees whose bounds don't overlap the queried area
+  void collect_elements_at(LUIObject* parent, float x, float y);
+  void collect_elements_in_rect(LUIObject* parent, const LUIRect& rect);
+  PT(LUIElementList) make_element_list();
+  pvector<LUIBaseElement*> _query_elements;
+
+  // Scheduled timers, stored as binary heap so the next due timer is always
+  // in front
+  struct LUITimer {
+    double due_time;
+    LUIBaseElement* element;
+    int event_id;
+    float interval;
+    bool repeat;
+  };
+
+  struct LUITimerCompare {
+    bool operator()(const LUITimer& a, const LUITimer& b) const {
+      return a.due_time > b.due_time;
+    }
+  };
+
+  pvector<LUITimer> _timers;
+  pvector<LUITimer> _due_timers;
+  double _last_timer_update;
+
+  // Time of the current frame, used for timers and event rates
+  double _frame_time;
+
   // Store the focus requests
   LUIBaseElement* _requested_focus;
 
+  // Element which currently has the focus, as set by the input handler
+  PT(LUIBaseElement) _focused_element;
+
+  // All elements with a tab index, ordered by tab index and document order.
+  // When the children of an element get reordered, the set is rebuilt the
+  // next time it is used.
+  struct LUITabOrderCompare {
+    bool operator()(const LUIBaseElement* a, const LUIBaseElement* b) const {
+      if (a->get_tab_index() != b->get_tab_index())
+        return a->get_tab_index() < b->get_tab_index();
+      return LUIBaseElement::compare_document_order(a, b);
+    }
+  };
+
+  typedef set<LUIBaseElement*, LUITabOrderCompare> LUITabOrderSet;
+  LUITabOrderSet _tab_order;
+  bool _tab_order_dirty;
+
+  void update_tab_order();
+  bool focus_tab_stop(bool forward);
+
   // Explicit blur requests
   bool _explicit_blur;
 
+  // Maximum amount of mousemove and keyrepeat events per second, or 0 to
+  // deliver every event
+  float _mousemove_rate;
+  float _keyrepeat_rate;
+
 };
 
 #include "luiRoot.I"
@@ -0,0 +1,143 @@
+
+#include "luiSpatialIndex.h"
+
+LUISpatialIndex::LUISpatialIndex(float cell_size) :
+  _cell_size(cell_size),
+  _width(0),
+  _height(0),
+  _num_cells_x(0),
+  _num_cells_y(0) {
+}
+
+/**
+ * @brief Sets the area covered by the index
+ * @details This sets the size of the area covered by the index, usually the
+ *   size of the region. Elements outside of this area are still stored, but
+ *   can't be found by queries. When the size changed, all elements are
+ *   distributed to the new cells.
+ *
+ * @param width Width of the area in pixels
+ * @param height Height of the area in pixels
+ */
+void LUISpatialIndex::set_bounds(float width, float height) {
+  if (width == _width && height == _height) {
+    return;
+  }
+
+  _width = width;
+  _height = height;
+  _num_cells_x = max(1, (int)ceil(width / _cell_size));
+  _num_cells_y = max(1, (int)ceil(height / _cell_size));
+
+  _cells.clear();
+  _cells.resize(_num_cells_x * _num_cells_y);
+
+  for (auto it = _entries.begin(); it != _entries.end(); ++it) {
+    compute_cells(it->second);
+    add_to_cells(it->first, it->second);
+  }
+}
+
+/**
+ * @brief Inserts or updates an element
+ * @details This stores the element with the given absolute rect. If the
+ *   element is already stored, its rect gets updated.
+ *
+ * @param elem Element to store
+ * @param rect Absolute rect of the element
+ */
+void LUISpatialIndex::insert(LUIBaseElement* elem, const LUIRect& rect) {
+  auto it = _entries.find(elem);
+
+  if (it != _entries.end()) {
+    if (it->second.rect == rect) {
+      return;
+    }
+    LUIIndexEntry entry = it->second;
+    entry.rect = rect;
+    compute_cells(entry);
+
+    // Only touch the cells in case the covered cells changed
+    if (entry.x0 != it->second.x0 || entry.y0 != it->second.y0 ||
+        entry.x1 != it->second.x1 || entry.y1 != it->second.y1) {
+      remove_from_cells(elem, it->second);
+      add_to_cells(elem, entry);
+    }
+    it->second = entry;
+    return;
+  }
+
+  LUIIndexEntry entry;
+  entry.rect = rect;
+  compute_cells(entry);
+  add_to_cells(elem, entry);
+  _entries[elem] = entry;
+}
+
+/**
+ * @brief Removes an element
+ * @details This removes the element from the index. Does nothing if the
+ *   element is not stored.
+ *
+ * @param elem Element to remove
+ */
+void LUISpatialIndex::remove(LUIBaseElement* elem) {
+  auto it = _entries.find(elem);
+  if (it != _entries.end()) {
+    remove_from_cells(elem, it->second);
+    _entries.erase(it);
+  }
+}
+
+/**
+ * @brief Removes all elements
+ * @details This removes all elements from the index, while keeping the bounds.
+ */
+void LUISpatialIndex::clear() {
+  _entries.clear();
+  for (auto it = _cells.begin(); it != _cells.end(); ++it) {
+    it->clear();
+  }
+}
+
+void LUISpatialIndex::compute_cells(LUIIndexEntry& entry) const {
+  float x1 = entry.rect.get_x();
+  float y1 = entry.rect.get_y();
+  float x2 = x1 + entry.rect.get_w();
+  float y2 = y1 + entry.rect.get_h();
+
+  // Rects outside of the bounds, or without area, cover no cells
+  if (_cells.empty() || x2 < 0 || y2 < 0 || x1 > _width || y1 > _height ||
+      x2 < x1 || y2 < y1) {
+    entry.x0 = entry.y0 = 0;
+    entry.x1 = entry.y1 = -1;
+    return;
+  }
+
+  entry.x0 = get_cell_x(x1);
+  entry.y0 = get_cell_y(y1);
+  entry.x1 = get_cell_x(x2);
+  entry.y1 = get_cell_y(y2);
+}
+
+void LUISpatialIndex::add_to_cells(LUIBaseElement* elem, const LUIIndexEntry& entry) {
+  for (int y = entry.y0; y <= entry.y1; ++y) {
+    for (int x = entry.x0; x <= entry.x1; ++x) {
+      _cells[y * _num_cells_x + x].push_back(elem);
+    }
+  }
+}
+
+void LUISpatialIndex::remove_from_cells(LUIBaseElement* elem, const LUIIndexEntry& entry) {
+  for (int y = entry.y0; y <= entry.y1; ++y) {
+    for (int x = entry.x0; x <= entry.x1; ++x) {
+      pvector<LUIBaseElement*>& cell = _cells[y * _num_cells_x + x];
+      auto it = std::find(cell.begin(), cell.end(), elem);
+      if (it != cell.end()) {
+        // Order within a cell does not matter
+        *it = cell.back();
+        cell.pop_back();
+      }
+    }
+  }
+}
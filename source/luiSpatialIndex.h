@@ -0,0 +1,71 @@
+// Filename: luiSpatialIndex.h
+//
+
+#ifndef LUI_SPATIAL_INDEX_H
+#define LUI_SPATIAL_INDEX_H
+
+#include "pandabase.h"
+#include "pandasymbols.h"
+#include "luse.h"
+#include "config_lui.h"
+#include "luiRect.h"
+
+class LUIBaseElement;
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUISpatialIndex
+// Description : Uniform grid which stores elements by their absolute
+//               rectangle. It is used to quickly find the elements
+//               at a given point, without having to check every
+//               element. Only the area of the region is stored, since
+//               nothing outside of it can be hit.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUISpatialIndex {
+
+public:
+
+  LUISpatialIndex(float cell_size = 64.0f);
+
+  void set_bounds(float width, float height);
+
+  void insert(LUIBaseElement* elem, const LUIRect& rect);
+  void remove(LUIBaseElement* elem);
+  void clear();
+  INLINE bool contains(LUIBaseElement* elem) const;
+  INLINE size_t get_num_elements() const;
+
+  INLINE const pvector<LUIBaseElement*>& query_point(float x, float y) const;
+
+private:
+
+  struct LUIIndexEntry {
+    LUIRect rect;
+
+    // Range of cells covered by the rect, empty if x1 < x0 or y1 < y0
+    int x0, y0, x1, y1;
+  };
+
+  INLINE int get_cell_x(float x) const;
+  INLINE int get_cell_y(float y) const;
+
+  void compute_cells(LUIIndexEntry& entry) const;
+  void add_to_cells(LUIBaseElement* elem, const LUIIndexEntry& entry);
+  void remove_from_cells(LUIBaseElement* elem, const LUIIndexEntry& entry);
+
+  float _cell_size;
+  float _width;
+  float _height;
+  int _num_cells_x;
+  int _num_cells_y;
+
+  pvector<pvector<LUIBaseElement*> > _cells;
+  pmap<LUIBaseElement*, LUIIndexEntry> _entries;
+
+  // Returned for points outside of the index
+  pvector<LUIBaseElement*> _empty_cell;
+
+};
+
+#include "luiSpatialIndex.I"
+
+#endif
@@ -54,6 +54,7 @@ void LUISprite::init(LUIObject* parent, float x, float y, const LColor& color) {
   _last_frame_visible = -1;
   _texture_index = -1;
   _sprite_index = -1;
+  _vertices_valid = false;
   _instance_count ++;
 
   if (luiSprite_cat.is_spam()) {
@@ -101,10 +102,14 @@ void LUISprite::set_root(LUIRoot* root) {
 
     // Unregister from old root
     unregister_events();
+    unregister_timers();
+    unregister_tab_stop();
     _root = root;
 
     // Register to new root
     register_events();
+    register_timers();
+    register_tab_stop();
     assign_sprite_index();
   }
 
@@ -119,6 +124,8 @@ void LUISprite::assign_sprite_index() {
 
   _sprite_index = _root->register_sprite(this);
 
+  // The new slot does not contain our vertices yet
+  invalidate_vertices();
   fetch_texture_index();
 
   if (luiSprite_cat.is_spam()) {
@@ -143,7 +150,15 @@ void LUISprite::update_vertex_pool() {
       luiSprite_cat.spam() << "Memcopying to " << write_pointer << endl;
     }
 
-    memcpy(write_pointer, &_data, sizeof(LUIVertexData) * 4);
+    if (_root->has_compact_vertex_format()) {
+      LUICompactVertexData compact_data[4];
+      for (int i = 0; i < 4; i++) {
+        pack_compact_vertex(_data[i], compact_data[i]);
+      }
+      memcpy(write_pointer, &compact_data, sizeof(LUICompactVertexData) * 4);
+    } else {
+      memcpy(write_pointer, &_data, sizeof(LUIVertexData) * 4);
+    }
   }
 }
 
@@ -245,28 +260,48 @@ void LUISprite::recompute_vertices() {
 
 void LUISprite::fetch_texture_index() {
   if (_tex != nullptr) {
-    _texture_index = _root->alloc_index_by_texture(_tex);
+    int texture_index = _root->alloc_index_by_texture(_tex);
+    if (texture_index != _texture_index) {
+      _texture_index = texture_index;
+      invalidate_vertices();
+    }
   }
 }
 
-void LUISprite::render_recursive(bool is_topmost_pass, bool render_anyway) {
+void LUISprite::render_recursive(bool is_topmost_pass) {
 
   if (!_visible) return;
 
-  bool do_render = render_anyway || is_topmost_pass == _topmost;
-  if (!do_render) return;
-
-  _last_render_index = -1;
-
   // We should have a root
   nassertv(_root != nullptr);
+
+  // Topmost sprites are rendered after all other elements
+  if (_topmost && !is_topmost_pass) {
+    _root->defer_topmost(this);
+    return;
+  }
+
+  _last_render_index = -1;
   // We also should have a index
   nassertv(_sprite_index >= 0);
 
   fetch_render_index();
-  recompute_vertices();
-  update_vertex_pool();
+
+  // The vertices stay valid in the vertex pool, so we only have to update
+  // them in case anything changed since the last frame
+  if (has_outdated_vertices()) {
+    recompute_vertices();
+    update_vertex_pool();
+
+    // Remember the inputs, so we can skip recomputing the vertices as long
+    // as they don't change
+    _vertex_abs_position = _abs_position;
+    _vertex_size = _effective_size;
+    _vertex_clip_bounds = _abs_clip_bounds;
+    _vertex_color = _composed_color;
+    _vertices_valid = true;
+  }
 
   _last_frame_visible  = _root->get_frame_index();
-  _root->add_sprite_to_render_list(_sprite_index);
+  _root->add_sprite_to_render_list(_sprite_index, _texture_index);
 }
@@ -14,16 +14,11 @@
 #include "luiBaseElement.h"
 #include "luiAtlasDescriptor.h"
 #include "luiAtlasPool.h"
-#include "luiVertexPool.h"
 #include "luiVertexData.h"
-#include "luiVertexChunk.h"
-#include "luiChunkDescriptor.h"
 #include "luiColorable.h"
 #include "texturePool.h"
 
-class LUIVertexPool;
 class LUIObject;
-class LUIChunkDescriptor;
 class LUIText;
 
 NotifyCategoryDecl(luiSprite, EXPCL_LUI, EXPTP_LUI);
@@ -31,13 +26,15 @@ NotifyCategoryDecl(luiSprite, EXPCL_LUI, EXPTP_LUI);
 ////////////////////////////////////////////////////////////////////
 //       Class : LUISprite
 // Description : A LUISprite stores a single card, including position,
-//               scale, and uv coordinates. It also notifies the
-//               LUIVertexPool when any scalar or texture got changed.
+//               scale, and uv coordinates. It writes its vertices to
+//               the vertex pool of the LUIRoot when any scalar or
+//               texture got changed.
 ////////////////////////////////////////////////////////////////////
 class EXPCL_LUI LUISprite : public LUIBaseElement  {
 
   friend class LUIObject;
   friend class LUIText;
+  friend class LUIRoot;
 
   // Initialize empty with just a parent this is for the LUIText
   explicit LUISprite(LUIText* parent_text);
@@ -84,6 +81,8 @@ protected:
   INLINE void init_size(float w, float h);
 
   void recompute_vertices();
+  INLINE bool has_outdated_vertices() const;
+  INLINE void invalidate_vertices();
   void update_vertex_pool();
   void assign_sprite_index();
   void unassign_sprite_index();
@@ -92,7 +91,7 @@ protected:
   INLINE void on_detached();
   void set_root(LUIRoot* root);
 
-  virtual void render_recursive(bool is_topmost_pass, bool render_anyway);
+  virtual void render_recursive(bool is_topmost_pass);
 
   void fetch_texture_index();
 
@@ -118,6 +117,14 @@ protected:
   int _texture_index;
   int _sprite_index;
 
+  // Stores the inputs the vertices were last computed from. As long as they
+  // do not change, the vertices in the vertex pool are still valid.
+  bool _vertices_valid;
+  LPoint2 _vertex_abs_position;
+  LVector2 _vertex_size;
+  LUIRect _vertex_clip_bounds;
+  LColor _vertex_color;
+
   string _debug_source;
 
 public:
@@ -1,6 +1,5 @@
 
 #include "luiText.h"
-#include "pandaVersion.h"
 
 TypeHandle LUIText::_type_handle;
 
@@ -10,7 +9,8 @@ LUIText::LUIText(PyObject* self, LUIObject* parent, const wstring& text,
   LUIObject(self, parent, x, y, parent->get_parent_width(), parent->get_parent_width()),
   _text(text),
   _font_size(font_size),
-  _wordwrap(wordwrap) {
+  _wordwrap(wordwrap),
+  _wrap_width(0.0f) {
   set_font(font_name);
 }
 
@@ -18,21 +18,46 @@ LUIText::~LUIText() {
 
 }
 
-void LUIText::update_text() {
+/**
+ * @brief Internal method to lay out the text
+ * @details This positions the glyph sprites of all characters starting at the
+ *   given index. The layout of the characters in front of it is kept, so these
+ *   characters have to be unchanged since the last call.
+ *   Wrapped text is laid out starting at the last space or newline in front of
+ *   the index, since the line breaks behind it may change, but the layout up
+ *   to it does not depend on the following words.
+ *
+ * @param first_char Index of the first changed character
+ */
+void LUIText::update_text(int first_char) {
   int len = _text.size();
 
-  nassertv(_font != nullptr);
+  nassertv(_font != nullptr && _font_metrics != nullptr);
 
   if (lui_cat.is_spam()) {
     lui_cat.spam() << "Current text is '" << _text.c_str() << "'" << endl;
   }
 
-  // Remove all sprites which aren't required
-  while (_children.size() > len) {
-    if (lui_cat.is_spam()) {
-      lui_cat.spam() << "Removing sprite .. " << endl;
+  // Only characters which were laid out before can be kept. When the available
+  // width changed, all lines have to be wrapped again.
+  first_char = max(0, min(first_char, min(len, (int)_placements.size())));
+  if (_wordwrap && get_parent_width() != _wrap_width) {
+    first_char = 0;
+  }
+
+  // Remove all sprites which aren't required. Since all sprites behind the first
+  // changed character get updated anyways, the sprites are removed from the back.
+  if (_children.size() > len) {
+    while (_children.size() > len) {
+      if (lui_cat.is_spam()) {
+        lui_cat.spam() << "Removing sprite .. " << endl;
+      }
+      PT(LUIBaseElement) sprite = _children.back();
+      _children.pop_back();
+      sprite->on_detached();
+      sprite->do_set_parent(nullptr);
     }
-    remove_child(*_children.begin());
+    mark_dirty(DF_layout);
   }
 
   // Allocate as many sprites as required
@@ -50,63 +75,65 @@ void LUIText::update_text() {
   // Pixels per unit, used to convert betweeen coordinate spaces
   float ppu = _font_size;
   float line_height = _font->get_line_height();
+  float max_width = get_parent_width();
+  _wrap_width = max_width;
+
+  _char_advances.resize(len + 1);
+  _char_advances[0] = 0.0f;
 
-  vector<int> line_breaks = get_line_breaks();
+  // Find the character to continue the layout at. Single lines continue at the
+  // changed character. Wrapped text continues at the last word start in front
+  // of it, using the cursor stored there, since the line break in front of the
+  // word containing the changed character may change.
+  int start = first_char;
+  LUITextCursor cursor = {0, 0.0f, 0.0f};
+
+  if (_wordwrap) {
+    start = max(0, first_char - 1);
+    while (start > 0 && !LUIFontMetrics::is_word_start(_text, start, _placements)) {
+      --start;
+    }
+    if (start > 0) {
+      cursor = _placements[start].cursor;
+    }
+  } else {
+    cursor.x_pos = _char_advances[start];
+  }
 
-  // Unreference all current glyphs
-  _glyphs.clear();
+  _font_metrics->layout_text(_text, start, ppu, _wordwrap, max_width, cursor, _placements);
 
-  // Iterate over the sprites
-  int char_idx = 0;
-  float current_x_pos = 0.0f;
-  float current_y_pos = 0.0f;
+  // Position the sprites. The advances are accumulated without line breaks,
+  // for get_char_pos and get_char_index.
+  float line_step = floor(line_height * ppu);
 
-  for (auto it = _children.begin(); it != _children.end(); ++it, ++char_idx)
+  for (int char_idx = start; char_idx < len; ++char_idx)
   {
-    LUIBaseElement* child = *it;
+    LUIBaseElement* child = _children[char_idx];
     LUISprite* sprite = DCAST(LUISprite, child);
 
     // A lui text should have only sprites contained, otherwise something went wrong
     nassertv(sprite != nullptr);
 
-    int char_code = (int)_text.at(char_idx);
-
-#if PANDA_MAJOR_VERSION > 1 || PANDA_MINOR_VERSION >= 10
-    CPT(TextGlyph) const_glyph;
-#else
-    const TextGlyph* const_glyph;
-#endif
+    const LUIGlyphPlacement& placement = _placements[char_idx];
+    const LUIGlyphMetrics* glyph = placement.glyph;
+    _char_advances[char_idx + 1] = _char_advances[char_idx];
 
     // Newline
-    if (_wordwrap && char_code == 10) {
-      current_x_pos = 0;
-      current_y_pos += floor(line_height * ppu);
+    if (_wordwrap && _text[char_idx] == 10) {
       continue;
     }
 
-    if (_wordwrap) {
-      if(find(line_breaks.begin(), line_breaks.end(), char_idx) != line_breaks.end()) {
-        current_x_pos = 0;
-        current_y_pos += floor(line_height * ppu);
-      }
-    }
-
-    if (!_font->get_glyph(char_code, const_glyph)) {
+    if (glyph == nullptr) {
+      lui_cat.error() << "Font does not support character with char code " << (int)_text[char_idx] << ", ignoring .. target = " << _debug_name << endl;
       sprite->set_texture(nullptr);
-      lui_cat.error() << "Font does not support character with char code " << char_code << ", ignoring .. target = " << _debug_name << endl;
       continue;
     }
 
-    CPT(DynamicTextGlyph) dynamic_glyph = DCAST(DynamicTextGlyph, const_glyph);
-
-    // If this gets executed, a non-dynamic font got loaded.
-    nassertv(dynamic_glyph != nullptr);
-
-    _glyphs.push_back(dynamic_glyph);
+    _char_advances[char_idx + 1] += glyph->advance * ppu;
 
     // Some characters have no texture (like space)
-    if (dynamic_glyph->get_page() == nullptr) {
-      lui_cat.debug() << "Character '" << (char)char_code << "' (Code: " << char_code << ") has no texture page!" << endl;
+    if (glyph->page == nullptr) {
+      lui_cat.debug() << "Character '" << (char)_text[char_idx] << "' (Code: " << (int)_text[char_idx] << ") has no texture page!" << endl;
       sprite->hide();
 
     } else {
@@ -114,200 +141,137 @@ void LUIText::update_text() {
 
       // LUISprite has a check if the texture is the same, so if the atlas didn't
       // change, this is quite efficient.
-      sprite->set_texture(dynamic_glyph->get_page());
+      sprite->set_texture(glyph->page);
 
       // Position the glyph.
       sprite->set_pos(
-        current_x_pos + dynamic_glyph->get_left() * ppu,
-        (0.85 - dynamic_glyph->get_top()) * ppu + 1 + current_y_pos);
+        placement.x_pos + glyph->left * ppu,
+        (0.85 - glyph->top) * ppu + 1 + placement.line * line_step);
 
       // The V coordinate is inverted, as panda stores the textures flipped
       sprite->set_uv_range(
-        dynamic_glyph->get_uv_left(),
-        1 - dynamic_glyph->get_uv_top(),
-        dynamic_glyph->get_uv_right(),
-        1 - dynamic_glyph->get_uv_bottom());
+        glyph->uv_left,
+        1 - glyph->uv_top,
+        glyph->uv_right,
+        1 - glyph->uv_bottom);
 
       // Determine size from coordinates
       sprite->set_size(
-         (dynamic_glyph->get_right() - dynamic_glyph->get_left()) * ppu,
-         (dynamic_glyph->get_top() - dynamic_glyph->get_bottom()) * ppu);
-
-      sprite->set_color(_color);
+         (glyph->right - glyph->left) * ppu,
+         (glyph->top - glyph->bottom) * ppu);
     }
-
-    // Break word wrapping
-    if (_wordwrap && current_x_pos + dynamic_glyph->get_advance() * ppu > get_parent_width()) {
-      // glyph length longer then width, force to next line
-      current_x_pos = 0;
-      current_y_pos += floor(line_height * ppu);
-    }
-    else {
-
-      // Trim left
-      if (_wordwrap && current_x_pos == 0 && dynamic_glyph->get_page() == nullptr) {
-        continue;
-      }
-
-      // Move *cursor* by glyph length
-      current_x_pos += dynamic_glyph->get_advance() * ppu;
-
-    }
-
-
   }
 
   if (_wordwrap) {
-    set_size( get_parent_width(), floor(current_y_pos + line_height * ppu));
+    set_size( get_parent_width(), floor(cursor.line * line_step + line_height * ppu));
   }
   else {
-    set_size( floor(current_x_pos), floor(line_height * ppu));
+    set_size( floor(cursor.x_pos), floor(line_height * ppu));
   }
 }
 
+/**
+ * @brief Appends text
+ * @details This appends the given text to the current text. Only the glyphs of
+ *   the appended characters get laid out, unless the text is wrapped, in which
+ *   case the last word in front of them gets laid out again, since its line
+ *   break may change.
+ *
+ * @param text Text to append
+ */
+void LUIText::append_text(const wstring& text) {
+  if (text.empty())
+    return;
+
+  int first_char = _text.size();
+  _text += text;
+  update_text(first_char);
+}
+
+/**
+ * @brief Inserts text
+ * @details This inserts the given text in front of the character with the given
+ *   index. The glyphs in front of the index keep their layout, only the inserted
+ *   characters and the characters behind them get laid out again.
+ *
+ * @param index Index to insert the text at, from 0 up to the length of the text
+ * @param text Text to insert
+ */
+void LUIText::insert_text(int index, const wstring& text) {
+  nassertv(index >= 0 && index <= (int)_text.size());
+  if (text.empty())
+    return;
+
+  _text.insert(index, text);
+  update_text(index);
+}
+
+/**
+ * @brief Removes a range of characters
+ * @details This removes count characters, starting at the given index. The
+ *   glyphs in front of the index keep their layout, only the characters behind
+ *   the removed range get laid out again. The range gets clamped to the end of
+ *   the text.
+ *
+ * @param index Index of the first character to remove
+ * @param count Amount of characters to remove
+ */
+void LUIText::erase_text(int index, int count) {
+  nassertv(index >= 0 && index <= (int)_text.size());
+  nassertv(count >= 0);
+  if (count == 0 || index == (int)_text.size())
+    return;
+
+  _text.erase(index, count);
+  update_text(index);
+}
+
 void LUIText::ls(int indent) {
   cout << string(indent, ' ')  << "[" << _debug_name << "] pos = " << get_abs_pos().get_x() << ", " << get_abs_pos().get_y()
        << "; size = " << get_width() << " x " << get_height() << "; text = u'" << _text << "'; color = "
        << _color << " / " << _composed_color << "; z = " << _z_offset << endl;
 }
 
+/**
+ * @brief Returns the character at a position
+ * @details This returns the index of the character at the given x-position,
+ *   relative to the start of the text. Line breaks are not taken into account.
+ *   The position is looked up with a binary search in the cumulative advances
+ *   of the characters, which get computed whenever the text changes.
+ *
+ * @param pos Position in pixels
+ * @return Index of the character, or the length of the text if the position
+ *   is behind the last character
+ */
 int LUIText::get_char_index(float pos) const {
   if (lui_cat.is_spam()) {
     lui_cat.spam() << "Trying to resolve " << pos << " into a character index .." << endl;
   }
   nassertr(_font != nullptr, 0);
+  nassertr(_char_advances.size() == _text.size() + 1, 0);
 
-  float cursor = 0.0f;
-
-  for (int i = 0; i < _text.size(); ++i) {
-    int char_code = (int)_text.at(i);
-
-#if PANDA_MAJOR_VERSION > 1 || PANDA_MINOR_VERSION >= 10
-    CPT(TextGlyph) glyph;
-#else
-    const TextGlyph* glyph;
-#endif
-    if (!_font->get_glyph(char_code, glyph)) {
-      lui_cat.error() << "Font does not support character with char code " << char_code << ", ignoring .. target = " << _debug_name << endl;
-      continue;
-    }
-
-    nassertr(glyph != nullptr, 0);
-    cursor += glyph->get_advance() * _font_size;
-
-    if (cursor > pos) {
-      return i;
-    }
-  }
-  return _text.size();
+  // Find the first character which ends behind the position
+  auto it = upper_bound(_char_advances.begin() + 1, _char_advances.end(), pos);
+  return it - (_char_advances.begin() + 1);
 }
 
+/**
+ * @brief Returns the position of a character
+ * @details This returns the x-position of the character with the given index,
+ *   relative to the start of the text. Line breaks are not taken into account.
+ *   Indices outside of the text are clamped to the text bounds.
+ *
+ * @param char_index Index of the character
+ * @return Position in pixels
+ */
 float LUIText::get_char_pos(int char_index) const {
   if (lui_cat.is_spam()) {
     lui_cat.spam() << "Trying to resolve " << char_index << " into a character position .." << endl;
   }
   nassertr(_font != nullptr, 0);
+  nassertr(_char_advances.size() == _text.size() + 1, 0);
 
-  // Make sure we don't iterate over the text bounds
-  int iterate_max = min(char_index, (int)_text.size());
-
-  float cursor = 0.0f;
-
-  for (int i = 0; i < iterate_max; i++) {
-    int char_code = (int)_text.at(i);
-
-#if PANDA_MAJOR_VERSION > 1 || PANDA_MINOR_VERSION >= 10
-    CPT(TextGlyph) glyph;
-#else
-    const TextGlyph* glyph;
-#endif
-    if (!_font->get_glyph(char_code, glyph)) {
-      lui_cat.error() << "Font does not support character with char code " << char_code << ", ignoring .. target = " << _debug_name << endl;
-      continue;
-    }
-    nassertr(glyph != nullptr, 0);
-    cursor += glyph->get_advance() * _font_size;
-  }
-
-  return cursor;
-}
-
-// Returns a list of character indexes where linebreaks should occur when wrapping.
-vector<int> LUIText::get_line_breaks() {
-
-  vector<int> result;
-
-  if (_wordwrap) {
-
-    // Unreference all current glyphs
-    _glyphs.clear();
-
-    int char_idx = 0;
-    int word_start = 0;
-    float word_start_pos = 0.0f;
-    float future_x_pos = 0.0f;
-    float line_start = 0.0f;
-    float ppu = _font_size;
-
-    for (auto it = _children.begin(); it != _children.end(); ++it, ++char_idx)
-    {
-      LUIBaseElement* child = *it;
-      LUISprite* sprite = DCAST(LUISprite, child);
-
-      // A lui text should have only sprites contained, otherwise something went wrong
-      nassertr(sprite != nullptr, result);
-
-      int char_code = (int)_text.at(char_idx);
-
-#if PANDA_MAJOR_VERSION > 1 || PANDA_MINOR_VERSION >= 10
-    CPT(TextGlyph) const_glyph;
-#else
-    const TextGlyph* const_glyph;
-#endif
-
-      // Character is a newline, so lets include this in our list.
-      if (char_code == 10) {
-        result.push_back(char_idx);
-        word_start = char_idx;
-        word_start_pos = future_x_pos;
-        line_start = future_x_pos;
-        continue;
-      }
-
-      if (!_font->get_glyph(char_code, const_glyph)) {
-        sprite->set_texture(nullptr);
-        lui_cat.error() << "Font does not support character with char code " << char_code << ", ignoring .. target = " << _debug_name << endl;
-        continue;
-      }
-
-      CPT(DynamicTextGlyph) dynamic_glyph = DCAST(DynamicTextGlyph, const_glyph);
-
-      // If this gets executed, a non-dynamic font got loaded.
-      nassertr(dynamic_glyph != nullptr, result);
-
-      _glyphs.push_back(dynamic_glyph);
-
-      // If a space, lets mark this as the start of the word.
-      if (dynamic_glyph->get_page() == nullptr) {
-        word_start = char_idx;
-        word_start_pos = future_x_pos + dynamic_glyph->get_advance() * ppu;
-      }
-
-      // If adding the glyph to the current position on this line will force it over
-      // the width of the label, put a new line at the start of the word.
-      if (((future_x_pos - line_start) + (dynamic_glyph->get_advance() * ppu))  > get_parent_width()) {
-        result.push_back(word_start);
-        // After the newline is added, we update the current lines start position.
-        line_start = word_start_pos;
-      }
-
-      // Move the cursor along by the glyph's width.
-      future_x_pos += dynamic_glyph->get_advance() * ppu;
-
-    }
-
-  }
-
-  return result;
-
+  // Make sure we don't access the text out of bounds
+  int index = max(0, min(char_index, (int)_text.size()));
+  return _char_advances[index];
 }
@@ -36,6 +36,10 @@ PUBLISHED:
   INLINE void set_text(const wstring& text);
   INLINE const wstring& get_text() const;
 
+  void append_text(const wstring& text);
+  void insert_text(int index, const wstring& text);
+  void erase_text(int index, int count);
+
   INLINE void set_font_size(float size);
   INLINE float get_font_size() const;
 
@@ -53,14 +57,24 @@ PUBLISHED:
 
 protected:
 
-  void update_text();
-  vector<int> get_line_breaks();
+  void update_text(int first_char = 0);
 
   DynamicTextFont* _font;
+  PT(LUIFontMetrics) _font_metrics;
   wstring _text;
   float _font_size;
   bool _wordwrap;
-  pvector<CPT(DynamicTextGlyph)> _glyphs;
+
+  // Cumulative advance of the characters, the n-th entry is the position of
+  // the n-th character in pixels, ignoring line breaks
+  pvector<float> _char_advances;
+
+  // Width the text was wrapped at during the last layout
+  float _wrap_width;
+
+  // Layout of each character computed by the font metrics, kept to continue
+  // the layout in front of the first changed character
+  pvector<LUIGlyphPlacement> _placements;
 
 
 public:
@@ -0,0 +1,82 @@
+// Filename: luiTextMetrics.h
+//
+
+#ifndef LUI_TEXT_METRICS_H
+#define LUI_TEXT_METRICS_H
+
+#include "pandabase.h"
+#include "pandasymbols.h"
+#include "referenceCount.h"
+#include "config_lui.h"
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUITextMetrics
+// Description : Size and line breaks of a text, as returned by
+//               LUIFontPool::measure. The size equals the size a
+//               LUIText with the same text, font and font size
+//               would get.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUITextMetrics : public ReferenceCount {
+
+PUBLISHED:
+
+  INLINE float get_width() const;
+  INLINE float get_height() const;
+  INLINE int get_num_lines() const;
+
+  INLINE size_t get_num_line_breaks() const;
+  INLINE int get_line_break(size_t n) const;
+  MAKE_SEQ(get_line_breaks, get_num_line_breaks, get_line_break);
+
+  MAKE_PROPERTY(width, get_width);
+  MAKE_PROPERTY(height, get_height);
+  MAKE_PROPERTY(num_lines, get_num_lines);
+
+public:
+
+  INLINE LUITextMetrics();
+
+  INLINE void set_size(float width, float height);
+  INLINE void add_line_break(int char_index);
+
+private:
+
+  float _width;
+  float _height;
+
+  // Index of the first character of every line except the first one
+  pvector<int> _line_breaks;
+
+};
+
+////////////////////////////////////////////////////////////////////
+//       Class : LUITextMetricsList
+// Description : Metrics of multiple texts, as returned by
+//               LUIFontPool::measure_batch.
+////////////////////////////////////////////////////////////////////
+class EXPCL_LUI LUITextMetricsList : public ReferenceCount {
+
+PUBLISHED:
+
+  INLINE size_t get_num_metrics() const;
+  INLINE LUITextMetrics* get_metrics(size_t n) const;
+  MAKE_SEQ(get_all_metrics, get_num_metrics, get_metrics);
+
+  INLINE size_t size() const;
+  INLINE LUITextMetrics* operator [] (size_t n) const;
+
+  MAKE_PROPERTY(num_metrics, get_num_metrics);
+
+public:
+
+  INLINE void add_metrics(LUITextMetrics* metrics);
+
+private:
+
+  pvector<PT(LUITextMetrics)> _metrics;
+
+};
+
+#include "luiTextMetrics.I"
+
+#endif
@@ -18,4 +18,24 @@ struct LUIVertexData {
   uint16_t texindex;
 };
 
+// Compact vertex layout, used when the compact vertex format is enabled.
+// Positions are stored as whole pixels, texcoords as unorm16.
+struct LUICompactVertexData {
+  int16_t x, z;
+  unsigned char color[4];
+  uint16_t u, v;
+  uint16_t texindex;
+  uint16_t padding;
+};
+
+INLINE void pack_compact_vertex(const LUIVertexData& src, LUICompactVertexData& dest) {
+  dest.x = (int16_t)max(-32768.0f, min(32767.0f, floor(src.x + 0.5f)));
+  dest.z = (int16_t)max(-32768.0f, min(32767.0f, floor(src.z + 0.5f)));
+  memcpy(dest.color, src.color, 4);
+  dest.u = (uint16_t)(max(0.0f, min(1.0f, src.u)) * 65535.0f + 0.5f);
+  dest.v = (uint16_t)(max(0.0f, min(1.0f, src.v)) * 65535.0f + 0.5f);
+  dest.texindex = src.texindex;
+  dest.padding = 0;
+}
+
 #endif